@@ -0,0 +1,253 @@
+"""Control-flow graph over basic blocks, without networkx.
+
+`CFG.build_cfg` used to build a `networkx.DiGraph` and materialize
+`list(nx.all_simple_paths(G, -1, -2))`, every path as its own Python list, and imported
+networkx and matplotlib to do it. A BlockGraph keeps the same node numbering (basic
+block indices, -1 for the dummy start, -2 for the dummy end) in integer-indexed
+adjacency arrays. Every edge carries the branch direction `CFG.compute_direction` used to
+recompute on each visit: 1 when it falls through to the next block (the then-branch),
+0 otherwise, or the index of the arm for the edges out of a case statement.
+
+`paths()` is a lazy depth-first iterator that yields each path as a tuple of block
+indices together with its directions, so a caller can stop early or keep only a sample.
+`count_paths()` and `path_stats()` count them in O(V+E) on a DAG. A CFG with a back
+edge falls back to enumerating simple paths, the only ones that were ever explored.
+
+A PathList is what a CFG hands to PathSource: the paths as a read-only sequence in
+`paths()` order. On a DAG it holds nothing but the number of paths from each node, and
+path k is unranked from those counts when it is asked for, so memory does not grow with
+the number of paths."""
+
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+START = -1
+END = -2
+
+
+class BlockGraph:
+    """Directed graph over basic blocks 0..num_blocks-1 plus the START and END dummies."""
+    __slots__ = ("num_blocks", "succ", "pred", "directions", "_order")
+
+    def __init__(self, num_blocks: int):
+        self.num_blocks = num_blocks
+        size = num_blocks + 2
+        # adjacency arrays indexed by slot(node); succ and directions are parallel
+        self.succ: List[List[int]] = [[] for _ in range(size)]
+        self.pred: List[List[int]] = [[] for _ in range(size)]
+        self.directions: List[List[int]] = [[] for _ in range(size)]
+        self._order = None
+
+    def slot(self, node: int) -> int:
+        """Array index of a node: blocks keep their index, START and END go last."""
+        if node >= 0:
+            return node
+        return self.num_blocks if node == START else self.num_blocks + 1
+
+    def node(self, slot: int) -> int:
+        if slot < self.num_blocks:
+            return slot
+        return START if slot == self.num_blocks else END
+
+    def add_edge(self, u: int, v: int, direction: Optional[int] = None) -> None:
+        su, sv = self.slot(u), self.slot(v)
+        if sv in self.succ[su]:
+            return
+        self.succ[su].append(sv)
+        self.directions[su].append(direction if direction is not None else 1 if v == u + 1 else 0)
+        self.pred[sv].append(su)
+        self._order = None
+
+    def nodes(self) -> List[int]:
+        return [self.node(s) for s in range(len(self.succ))]
+
+    def edges(self) -> List[Tuple[int, int]]:
+        return [(self.node(su), self.node(sv)) for su, targets in enumerate(self.succ) for sv in targets]
+
+    def labeled_edges(self) -> List[Tuple[int, int, int]]:
+        """(u, v, direction) of every edge, what add_edge needs to rebuild the graph."""
+        return [(self.node(su), self.node(sv), d) for su, targets in enumerate(self.succ)
+                for sv, d in zip(targets, self.directions[su])]
+
+    def successors(self, node: int) -> List[int]:
+        return [self.node(s) for s in self.succ[self.slot(node)]]
+
+    def predecessors(self, node: int) -> List[int]:
+        return [self.node(s) for s in self.pred[self.slot(node)]]
+
+    def topological_order(self):
+        """Slots in topological order (Kahn), or None if the graph has a cycle."""
+        if self._order is None:
+            indegree = [len(p) for p in self.pred]
+            ready = [s for s, d in enumerate(indegree) if d == 0]
+            order = []
+            while ready:
+                s = ready.pop()
+                order.append(s)
+                for t in self.succ[s]:
+                    indegree[t] -= 1
+                    if indegree[t] == 0:
+                        ready.append(t)
+            self._order = order if len(order) == len(self.succ) else False
+        return self._order or None
+
+    def is_dag(self) -> bool:
+        return self.topological_order() is not None
+
+    def paths(self, source: int = START, target: int = END) -> Iterator[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+        """Lazily yield (path, directions) for every simple source->target path, in the
+        order nx.all_simple_paths produced them for this graph. directions[k] is the
+        direction taken out of the k-th basic block of the path (path[k + 1])."""
+        src, dst = self.slot(source), self.slot(target)
+        if src == dst:
+            yield (source,), ()
+            return
+        path = [src]
+        dirs: List[int] = []
+        on_path = [False] * len(self.succ)
+        on_path[src] = True
+        # iterator over (successor, direction) of every node on the path
+        stack = [iter(zip(self.succ[src], self.directions[src]))]
+        while stack:
+            step = next(stack[-1], None)
+            if step is None:
+                stack.pop()
+                on_path[path.pop()] = False
+                if dirs:
+                    dirs.pop()
+                continue
+            nxt, direction = step
+            if on_path[nxt]:
+                continue
+            if nxt == dst:
+                # the first edge leaves the dummy start and carries no direction
+                yield tuple(self.node(s) for s in path) + (target,), tuple(dirs[1:]) + (direction,) if dirs else ()
+                continue
+            path.append(nxt)
+            dirs.append(direction)
+            on_path[nxt] = True
+            stack.append(iter(zip(self.succ[nxt], self.directions[nxt])))
+
+    def suffix_counts(self, target: int = END) -> Optional[List[int]]:
+        """Per slot, the number of paths from it to target; None if the graph has a cycle."""
+        order = self.topological_order()
+        if order is None:
+            return None
+        dst = self.slot(target)
+        count = [0] * len(self.succ)
+        count[dst] = 1
+        for s in reversed(order):
+            if s != dst:
+                count[s] = sum(count[t] for t in self.succ[s])
+        return count
+
+    def path_at(self, index: int, counts: List[int], source: int = START, target: int = END) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """(path, directions) of the index-th path paths() yields, unranked with the
+        suffix_counts of target. O(path length * out-degree)."""
+        s, dst = self.slot(source), self.slot(target)
+        if not 0 <= index < counts[s]:
+            raise IndexError(f"path index {index} out of range for {counts[s]} paths")
+        nodes = [source]
+        dirs: List[int] = []
+        while s != dst:
+            for t, direction in zip(self.succ[s], self.directions[s]):
+                if index < counts[t]:
+                    break
+                index -= counts[t]
+            nodes.append(self.node(t))
+            dirs.append(direction)
+            s = t
+        # as in paths(), the edge out of the dummy start carries no direction
+        return tuple(nodes), tuple(dirs[1:])
+
+    def path_directions(self, path: Tuple[int, ...]) -> Tuple[int, ...]:
+        """The directions paths() yields with path."""
+        out = []
+        for u, v in zip(path[1:], path[2:]):
+            su = self.slot(u)
+            out.append(self.directions[su][self.succ[su].index(self.slot(v))])
+        return tuple(out)
+
+    def path_stats(self, source: int = START, target: int = END) -> Tuple[int, int]:
+        """(number of source->target paths, total number of nodes over those paths)."""
+        order = self.topological_order()
+        if order is None:
+            # a back edge: only simple paths are taken, which have no closed form
+            count = length = 0
+            for path, _ in self.paths(source, target):
+                count += 1
+                length += len(path)
+            return count, length
+        src, dst = self.slot(source), self.slot(target)
+        count = [0] * len(self.succ)
+        length = [0] * len(self.succ)
+        count[dst] = length[dst] = 1
+        for s in reversed(order):
+            if s == dst:
+                continue
+            c = l = 0
+            for t in self.succ[s]:
+                c += count[t]
+                l += length[t] + count[t]
+            count[s] = c
+            length[s] = l
+        return count[src], length[src]
+
+    def count_paths(self, source: int = START, target: int = END) -> int:
+        return self.path_stats(source, target)[0]
+
+    def distances_to(self, targets: Iterable[int]) -> Dict[int, int]:
+        """Node -> number of edges on its shortest path to any of targets (BFS backwards)."""
+        dist = {self.slot(t): 0 for t in targets}
+        frontier = list(dist)
+        while frontier:
+            nxt = []
+            for s in frontier:
+                for p in self.pred[s]:
+                    if p not in dist:
+                        dist[p] = dist[s] + 1
+                        nxt.append(p)
+            frontier = nxt
+        return {self.node(s): d for s, d in dist.items()}
+
+    def to_networkx(self):
+        """networkx copy of the graph, for drawing it."""
+        import networkx as nx
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.nodes())
+        graph.add_edges_from(self.edges())
+        return graph
+
+
+class PathList(Sequence):
+    """START->END paths of a BlockGraph as a read-only sequence of block-index tuples, in
+    paths() order. Nothing is materialized on a DAG; with a back edge the simple paths are
+    listed once, as before."""
+    __slots__ = ("graph", "counts", "listed")
+
+    def __init__(self, graph: BlockGraph):
+        self.graph = graph
+        self.counts = graph.suffix_counts(END)
+        self.listed = [path for path, _ in graph.paths(START, END)] if self.counts is None else None
+
+    def __len__(self) -> int:
+        if self.listed is not None:
+            return len(self.listed)
+        return self.counts[self.graph.slot(START)]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self.listed is not None:
+            return self.listed[index]
+        if index < 0:
+            index += len(self)
+        return self.graph.path_at(index, self.counts)[0]
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        if self.listed is not None:
+            return iter(self.listed)
+        return (path for path, _ in self.graph.paths(START, END))
+
+    def __repr__(self) -> str:
+        return f"PathList({len(self)} paths)"
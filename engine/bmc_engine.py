@@ -0,0 +1,329 @@
+"""Bounded model checking, an alternative to path enumeration for assertion checking.
+
+`ExecutionEngine` enumerates CFG paths, which is exponential in the number of branches per
+cycle. The BMCEngine instead encodes each always block as guarded next-state functions:
+every assignment `x = e` under branch guard g defines a fresh frame variable
+`x' == If(g, e, x)`, so if/else and case arms are merged with ITEs instead of being split
+into paths. `num_cycles` cycles are unrolled into one solver, which grows linearly with the
+number of cycles, and every assertion met in a cycle is checked with a single solver call
+for that cycle.
+
+The store holds one Z3 term per signal, the current frame variable, so expressions go
+through the same `parse_expr_to_Z3` delegate (`visitor.expr_to_z3`) as the other engines.
+Frame variables are bit-vectors of the signal's declared width (`signal_width`, recorded in
+the manager's SignalTable), named `<instance>.<signal>@c<cycle>`, plus `#k` for intermediate
+values inside a cycle. Assigned values are fitted to that width, so wraparound and
+comparisons match symbolic execution. As in `execute_sv`, registers start unconstrained,
+parameters are their values (`initial_term`), signals no always block writes are fresh
+inputs every cycle, and ports between instances are not connected."""
+
+from __future__ import annotations
+import time
+from typing import Dict, List, Optional
+
+import pyslang as ps
+from z3 import And, BitVec, If, Not, Or, Solver, is_true, simplify
+
+from .execution_manager import ExecutionManager
+from .symbolic_state import SymbolicState
+from .store import Store
+from .cfg import CFG
+from .dependencies import block_writes, lhs_name
+from .slicing import ConeOfInfluence, slice_always_blocks
+from helpers.slang_helpers import (get_module_name, get_cond_expr, get_branches, get_case_item_body,
+                                   is_default_case_item, is_assertion_stmt)
+from helpers.rvalue_to_z3 import z3_to_bool, case_match, store_value_to_z3, fit, signal_width, initial_term
+
+
+class BMCEngine:
+    """Unrolls the design for num_cycles and checks assertions per cycle."""
+    debug: bool = False # Boolean flag to enable debug output
+    cache = None # Unused, kept so the command line options apply to either engine
+    manager = None # ExecutionManager of the last run
+    slice: bool = False # Drop always blocks outside the assertions' cone of influence
+
+    def __init__(self):
+        self.solver = Solver()
+        self.state = SymbolicState()
+        self.visitor = None
+        self.cycle = 0
+        # (module, signal, cycle) -> number of intermediate frame variables defined so far
+        self.versions: Dict[tuple, int] = {}
+        # pending non-blocking assignments of the current module and cycle: (signal, guard, value)
+        self.nba: List[tuple] = []
+        # assertions met in the current cycle: dicts with module, guard, cond, condition
+        self.cycle_assertions: List[dict] = []
+        # (counterexample key, frame variable) for initial values and per-cycle inputs
+        self.free_vars: List[tuple] = []
+        self.solver_calls = 0
+        self.unsupported = set()
+
+    def always_blocks_of(self, module) -> list:
+        """Always blocks that belong to this instance only, not to its children."""
+        if module.__class__.__name__ == "InstanceSymbol" and hasattr(module, "body"):
+            return [item.syntax for item in module.body
+                    if item.__class__.__name__ == "ProceduralBlockSymbol" and getattr(item, "syntax", None) is not None]
+        probe = CFG()
+        probe.get_always_sv(self.manager, self.state, module)
+        return probe.always_blocks
+
+    def signals_of(self, module, name: str) -> Dict[str, object]:
+        """Signal name -> pyslang symbol of an instance; their widths go to the SignalTable."""
+        self.visitor.symbolic_store.clear()
+        self.visitor.visited.clear()
+        self.visitor.dfs(module)
+        symbols = dict(self.visitor.symbolic_store)
+        self.manager.signals.add_instance(name, symbols, signal_width)
+        return symbols
+
+    def width(self, signal: str) -> int:
+        return self.manager.signals.width(self.manager.curr_module, signal)
+
+    def term(self, value):
+        """Z3 term for a store entry, or None if the signal has none yet."""
+        return store_value_to_z3(value) if value is not None else None
+
+    def to_z3(self, expr):
+        return self.visitor.expr_to_z3(self.manager, self.state, expr)
+
+    def guarded(self, guard, cond):
+        return cond if guard is None else And(guard, cond)
+
+    def frame_var(self, module: str, signal: str) -> str:
+        key = (module, signal, self.cycle)
+        k = self.versions.get(key, 0) + 1
+        self.versions[key] = k
+        return f"{module}.{signal}@c{self.cycle}#{k}"
+
+    def write(self, signal: str, guard, value) -> None:
+        """x' == If(guard, value, x): one new frame variable per assignment, value fitted to
+        the signal's declared width."""
+        module = self.manager.curr_module
+        store = self.state.store[module]
+        width = self.width(signal)
+        old = self.term(store.get(signal))
+        if old is None:
+            old = BitVec(f"{module}.{signal}@c{self.cycle}", width)
+        value, old = fit(value, width), fit(old, width)
+        new = BitVec(self.frame_var(module, signal), width)
+        self.solver.add(new == (value if guard is None else If(guard, value, old)))
+        store[signal] = new
+
+    def encode_assignment(self, expr, guard) -> None:
+        if expr.kind not in (ps.SyntaxKind.AssignmentExpression, ps.SyntaxKind.NonblockingAssignmentExpression):
+            return
+        signal = lhs_name(expr.left)
+        if signal is None:
+            self.warn(expr.left)
+            return
+        if getattr(expr.left, "selectors", None):
+            # partial writes are not modelled bit-precisely: the whole signal becomes unconstrained
+            value = BitVec(self.frame_var(self.manager.curr_module, signal) + "!havoc", self.width(signal))
+        else:
+            value = self.to_z3(expr.right)
+        if expr.kind == ps.SyntaxKind.NonblockingAssignmentExpression:
+            self.nba.append((signal, guard, value))
+        else:
+            self.write(signal, guard, value)
+
+    def collect_assertion(self, stmt, guard) -> None:
+        """Remember an assertion met in this cycle; it is checked once the cycle is encoded."""
+        expr = getattr(stmt, "expr", None)
+        if expr is None:
+            spec = getattr(stmt, "propertySpec", None)
+            expr = getattr(spec, "expr", None) if spec is not None else None
+            if expr is not None and expr.__class__.__name__ == "SimplePropertyExprSyntax":
+                expr = expr.expr
+        if expr is None:
+            # ConcurrentAssertionMemberSyntax wraps the statement
+            inner = getattr(stmt, "statement", None)
+            if inner is not None and inner is not stmt:
+                self.collect_assertion(inner, guard)
+            return
+        cond = z3_to_bool(self.to_z3(expr))
+        self.cycle_assertions.append({
+            "module": self.manager.curr_module,
+            "guard": guard,
+            "cond": cond,
+            "condition": str(expr),
+            "kind": str(getattr(stmt, "keyword", "")).strip() or "assert",
+        })
+
+    def encode_case(self, stmt, guard) -> None:
+        """First matching item wins, the default arm runs when none matches."""
+        selector = self.to_z3(stmt.expr)
+        earlier = []
+        default_body = None
+        for item in getattr(stmt, "items", []):
+            if is_default_case_item(item):
+                default_body = get_case_item_body(item)
+                continue
+            matches = [case_match(selector, self.to_z3(e)) for e in item.expressions]
+            if not matches:
+                continue
+            hit = Or(*matches) if len(matches) > 1 else matches[0]
+            if earlier:
+                hit = And(hit, Not(Or(*earlier)))
+            earlier += matches
+            self.encode_stmt(get_case_item_body(item), self.guarded(guard, hit))
+        if default_body is not None:
+            self.encode_stmt(default_body, self.guarded(guard, Not(Or(*earlier))) if earlier else guard)
+
+    def encode_stmt(self, stmt, guard) -> None:
+        """Turn one statement into guarded frame-variable definitions."""
+        if stmt is None:
+            return
+        if isinstance(stmt, ps.BlockStatementSyntax):
+            for sub in stmt.items:
+                self.encode_stmt(sub, guard)
+        elif stmt.__class__.__name__ in ("TimingControlStatementSyntax", "ProceduralBlockSyntax"):
+            self.encode_stmt(getattr(stmt, "statement", None), guard)
+        elif isinstance(stmt, ps.ConditionalStatementSyntax):
+            then_body, else_body = get_branches(stmt)
+            cond_expr = get_cond_expr(stmt)
+            if cond_expr is None:
+                self.warn(stmt)
+                return
+            cond = z3_to_bool(self.to_z3(cond_expr))
+            self.encode_stmt(then_body, self.guarded(guard, cond))
+            self.encode_stmt(else_body, self.guarded(guard, Not(cond)))
+        elif isinstance(stmt, ps.CaseStatementSyntax):
+            self.encode_case(stmt, guard)
+        elif is_assertion_stmt(stmt):
+            self.collect_assertion(stmt, guard)
+        elif isinstance(stmt, ps.ExpressionStatementSyntax):
+            self.encode_assignment(stmt.expr, guard)
+        elif hasattr(stmt, "__iter__") and not isinstance(stmt, ps.StatementSyntax):
+            for sub in stmt:
+                self.encode_stmt(sub, guard)
+        else:
+            self.warn(stmt)
+
+    def warn(self, node) -> None:
+        kind = node.__class__.__name__
+        if kind not in self.unsupported:
+            self.unsupported.add(kind)
+            print(f"[Warning] BMC does not encode {kind}, skipping it")
+
+    def check_cycle(self) -> bool:
+        """One solver call for every assertion of the cycle. True if one can fail."""
+        if not self.cycle_assertions:
+            return False
+        violations = [self.guarded(a["guard"], Not(a["cond"])) for a in self.cycle_assertions]
+        m = self.manager
+        self.solver.push()
+        self.solver.add(Or(*violations) if len(violations) > 1 else violations[0])
+        solver_start = time.process_time()
+        result = str(self.solver.check())
+        m.solver_time += time.process_time() - solver_start
+        self.solver_calls += 1
+        if result != "sat":
+            self.solver.pop()
+            return False
+
+        model = self.solver.model()
+        m.assertion_violation = True
+        m.violated_assertions = []
+        for a, violation in zip(self.cycle_assertions, violations):
+            if is_true(model.eval(violation, model_completion=True)):
+                m.violated_assertions.append({
+                    "condition": a["condition"],
+                    "z3_condition": str(a["cond"]),
+                    "path condition": str(simplify(a["guard"])) if a["guard"] is not None else "True",
+                    "kind": a["kind"],
+                    "cycle": self.cycle,
+                })
+        counterexample = {}
+        for key, term in self.free_vars:
+            counterexample[key] = model.eval(term, model_completion=True)
+        m.counterexample = counterexample
+        self.solver.pop()
+        return True
+
+    def report(self) -> None:
+        """Same output as ExecutionEngine.finish_path, plus the failing cycle."""
+        m = self.manager
+        print("Assertion violation")
+        print("Violated assertion details:")
+        for va in m.violated_assertions:
+            print(f"  - condition: {va.get('condition', 'N/A')}")
+            print(f"    z3_condition: {va.get('z3_condition', 'N/A')}")
+            print(f"    path condition: {va.get('path condition', 'N/A')}")
+            print(f"    kind: {va.get('kind', 'N/A')}")
+        print(f"Violated in cycle {self.cycle}")
+        print(m.counterexample)
+
+    def execute_sv(self, visitor, modules, manager: Optional[ExecutionManager], num_cycles) -> None:
+        """Entry point with the same signature as ExecutionEngine.execute_sv."""
+        num_cycles = int(num_cycles)
+        print(f"BMC for {num_cycles} clock cycles")
+        m = manager if manager is not None else ExecutionManager()
+        m.sv = True
+        m.debug = self.debug
+        m.assertion_violation = False
+        self.manager = m
+        self.visitor = visitor
+        self.state.store = Store()
+
+        cone = None
+        if self.slice:
+            cone = ConeOfInfluence(modules)
+            if not cone.assertions:
+                print("[Warning] No assertions found, nothing to slice against")
+                cone = None
+            m.assertions = cone.assertions if cone is not None else []
+            m.blocks_of_interest = []
+
+        blocks_by_name = {}
+        signals_by_name = {}
+        symbols_by_name = {}
+        assigned_by_name = {}
+        for module in modules:
+            name = get_module_name(module)
+            m.curr_module = name
+            blocks_by_name[name] = self.always_blocks_of(module)
+            if cone is not None:
+                # sliced-away signals become free inputs, which cannot matter to the assertions
+                blocks_by_name[name] = slice_always_blocks(m, cone, name, blocks_by_name[name])
+            # signals no always block writes are free inputs every cycle
+            assigned = set()
+            for ab in blocks_by_name[name]:
+                block_writes(ab, assigned)
+            assigned_by_name[name] = assigned
+            symbols_by_name[name] = self.signals_of(module, name)
+            signals_by_name[name] = sorted(set(symbols_by_name[name]) | assigned)
+            print(f"Module {name}: {len(blocks_by_name[name])} always blocks, {len(assigned)} state signals")
+
+        multi = len(blocks_by_name) > 1
+        cycles_checked = 0
+        for cycle in range(num_cycles):
+            self.cycle = cycle
+            self.cycle_assertions = []
+            for name, blocks in blocks_by_name.items():
+                m.curr_module = name
+                m.cycle = cycle
+                store = self.state.store.setdefault(name, {})
+                # registers carry over; inputs (and every signal in cycle 0) get a fresh variable
+                for signal in signals_by_name[name]:
+                    if cycle == 0 or signal not in assigned_by_name[name]:
+                        symbol = symbols_by_name[name].get(signal)
+                        if symbol is not None and symbol.kind == ps.SymbolKind.Parameter:
+                            store[signal] = initial_term(m, symbol)
+                            continue
+                        store[signal] = BitVec(f"{name}.{signal}@c{cycle}", self.width(signal))
+                        key = f"{name}.{signal}" if multi else signal
+                        self.free_vars.append((key if cycle == 0 else f"{key}@c{cycle}", store[signal]))
+                self.nba = []
+                for ab in blocks:
+                    self.encode_stmt(ab, None)
+                # non-blocking assignments land after every block of the cycle ran, in program order
+                for signal, guard, value in self.nba:
+                    self.write(signal, guard, value)
+            cycles_checked = cycle + 1
+            if self.check_cycle():
+                self.report()
+                break
+
+        print(f"Cycles checked: {cycles_checked}")
+        print(f"Solver calls: {self.solver_calls}")
+        print(f"Solver time: {m.solver_time}")
@@ -1,6 +1,5 @@
 """Converts PySlang AST (representing SystemVerilog) into executable CFG structure that enables path exploration"""
 from math import comb
-from operator import indexOf
 import z3
 from z3 import Solver, Int, BitVec, Context, BitVecSort, ExprRef, BitVecRef, If, BitVecVal, And
 from .execution_manager import ExecutionManager
@@ -15,10 +14,15 @@ from itertools import product, permutations, combinations
 import logging
 from helpers.utils import to_binary
 import sys
-import networkx as nx
-import matplotlib.pyplot as plt
 import pyslang as ps
 from pyslang import ConditionalStatementSyntax, DataDeclarationSyntax
+from .state_merging import MergedConditional, is_mergeable
+from .loop_unroll import LoopBinding, LoopSummary, elaborated_iterations, loop_iterations
+from .ternary import TernaryBranch, TernaryArm, ternary_assignment
+from .block_graph import BlockGraph, PathList, START, END
+from helpers.slang_helpers import case_arms, get_branches
+from helpers.rvalue_to_z3 import ternary_parts
+from bisect import bisect_right
 
 class CFG:
     """Represents the control flow graph of a module/always block"""
@@ -39,13 +43,19 @@ class CFG:
         # the edgelist will be a list of tuples of indices of the ast nodes blocks
         self.edgelist = []
 
+        # branch direction of an edgelist edge when it is not then/else: the arm index out of a case
+        self.edge_directions = {}
+
         # edges between basic blocks, determined by the above edgelist
         self.cfg_edges = []
 
+        # index in all_nodes of the first node of every basic block, set by partition
+        self.block_starts = []
+
         # indices of basic blocks that need to connect to dummy exit node
         self.leaves = set()
 
-        #paths... list of paths with start and end being the dummy nodes
+        #paths... sequence of paths with start and end being the dummy nodes (a PathList once enumerated)
         self.paths = []
 
         # name corresponding to the module. there could be multiple always blocks (or CFGS) per module
@@ -73,6 +83,32 @@ class CFG:
         #submodules defined
         self.submodules = []
 
+        # BlockGraph over basic block indices, set by build_cfg
+        self.graph = None
+
+        # merge mux-style if/else statements up to merge_size tokens instead of splitting them
+        self.merge = False
+        self.merge_size = 64
+
+        # statement predicate from the cone-of-influence slicer; statements it rejects are left out
+        self.keep = None
+
+        # for-loops with constant bounds are unrolled up to unroll_limit iterations (None: never)
+        self.unroll_limit = None
+        # syntax node -> (elaborated ForLoopStatement, scope) the loop bounds are evaluated from
+        self.loops = {}
+        # parameter values, for loops missing from self.loops (evaluated from their text)
+        self.params = {}
+
+        # key of this CFG in the on-disk path cache, if one is used
+        self.cache_key = None
+
+        # build from pyslang semantic statements (ProceduralBlockSymbol.body) instead of syntax
+        self.semantic = False
+
+        # split paths at assignments of ternaries (--ternary_mode split) instead of encoding them as If terms
+        self.split_ternaries = False
+
     def reset(self):
         """Return to defaults."""
         self.__init__()
@@ -91,7 +127,9 @@ class CFG:
         self.block_stmt_depth = 0"""
 
     def compute_direction(self, path):
-        """Given a path, figure out the direction"""
+        """Given a path, figure out the direction. Paths of the graph take theirs from its edges."""
+        if self.graph is not None and isinstance(path, tuple):
+            return self.graph.path_directions(path)
         directions = []
         for i in range(1, len(path)-1):
             if path[i] + 1 == path[i + 1]:
@@ -118,8 +156,11 @@ class CFG:
             if hasattr(ast, 'body'):
                 for item in ast.body:
                     if item.__class__.__name__ == "ProceduralBlockSymbol":
+                        if self.semantic:
+                            # the symbol itself; basic_blocks_semantic walks its body
+                            self.always_blocks.append(item)
                         # Get the syntax node from the symbol
-                        if hasattr(item, 'syntax') and item.syntax is not None:
+                        elif hasattr(item, 'syntax') and item.syntax is not None:
                             self.always_blocks.append(item.syntax)
                     elif item.__class__.__name__ == "InstanceSymbol":
                         # Recursively process child instances (submodules)
@@ -260,12 +301,123 @@ class CFG:
                 self.curr_idx += 1
             self.edgelist.append((parent_idx, else_start_idx))
 
+    def _process_conditional_semantic(self, m: ExecutionManager, s: SymbolicState, parent_idx: int, node) -> None:
+        """_process_conditional_sv for semantic ConditionalStatements (ifTrue/ifFalse)."""
+        then_body, else_body = get_branches(node)
+        for direction_body in (then_body, else_body):
+            start_idx = self.curr_idx
+            self.partition_points.add(self.curr_idx)
+            if direction_body is not None and direction_body is else_body and direction_body.kind == ps.StatementKind.Conditional:
+                # Nested else-if: its own branch node
+                self.all_nodes.append(else_body)
+                self.curr_idx += 1
+                self.edgelist.append((parent_idx, start_idx))
+                self._process_conditional_semantic(m, s, start_idx, else_body)
+                return
+            self.basic_blocks_semantic(m, s, direction_body)
+            if self.curr_idx == start_idx:
+                # Empty or missing branch: a dummy node so the edge has a destination
+                self.all_nodes.append(None)
+                self.curr_idx += 1
+            self.edgelist.append((parent_idx, start_idx))
+
+    def _process_case_sv(self, m: ExecutionManager, s: SymbolicState, parent_idx: int, node) -> None:
+        """Handle CaseStatementSyntax nodes (and semantic CaseStatements) as an n-way branch:
+        one successor per arm of case_arms(), and the arm index as the direction of the edge into it."""
+        walk = self.basic_blocks_semantic if self.semantic else self.basic_blocks_sv
+        for arm, (_, body) in enumerate(case_arms(node)):
+            arm_start_idx = self.curr_idx
+            self.partition_points.add(self.curr_idx)
+            walk(m, s, body)
+            if self.curr_idx == arm_start_idx:
+                # Empty arm (or no item matched): a dummy node so the edge has a destination
+                self.all_nodes.append(None)
+                self.curr_idx += 1
+            self.edgelist.append((parent_idx, arm_start_idx))
+            self.edge_directions[(parent_idx, arm_start_idx)] = arm
+
+    def _split_ternary(self, target: str, expr) -> None:
+        """Lay out `target = c ? a : b` as a branch on c (a TernaryBranch node) with one
+        TernaryArm per side; a side that is itself a ternary branches again. The split only
+        stands for one assignment, so every arm joins again at a dummy node and the
+        statements after it run on every arm."""
+        arms = self._ternary_arms(target, expr)
+        join_idx = self.curr_idx
+        self.all_nodes.append(None)
+        self.partition_points.add(join_idx)
+        self.curr_idx += 1
+        for arm_idx in arms:
+            self.edgelist.append((arm_idx, join_idx))
+
+    def _ternary_arms(self, target: str, expr) -> list:
+        """Branch and arm nodes of one (possibly chained) ternary; returns the arms' indices."""
+        parent_idx = self.curr_idx
+        self.all_nodes.append(TernaryBranch(target, expr))
+        self.partition_points.add(self.curr_idx)
+        self.curr_idx += 1
+        _, if_true, if_false = ternary_parts(expr)
+        arms = []
+        for value in (if_true, if_false):
+            start_idx = self.curr_idx
+            self.partition_points.add(self.curr_idx)
+            if ternary_parts(value) is not None:
+                arms += self._ternary_arms(target, value)
+            else:
+                self.all_nodes.append(TernaryArm(target, value))
+                self.partition_points.add(self.curr_idx)
+                arms.append(self.curr_idx)
+                self.curr_idx += 1
+            self.edgelist.append((parent_idx, start_idx))
+        return arms
+
+    def _unroll_for_loop_sv(self, m: ExecutionManager, s: SymbolicState, node) -> bool:
+        """Lay out a constant-bound for-loop once per iteration, or summarize it when it is over
+        the unroll limit. Returns False for loops that keep the old single-node treatment.
+        The bounds come from the loop's elaborated statement, or from its text without one."""
+        if self.unroll_limit is None:
+            return False
+        header = getattr(node, "syntax", None) if self.semantic else node
+        if header is None:
+            return False
+        elaborated = self.loops.get(header)
+        if elaborated is not None:
+            iterations = elaborated_iterations(*elaborated, self.unroll_limit)
+        else:
+            iterations = loop_iterations(header, self.params, self.unroll_limit)
+        if iterations is None:
+            return False
+        var, values, exit_value = iterations
+        if values is None:
+            print(f"Loop over the unroll limit of {self.unroll_limit}, summarizing it: {str(node)[:50]}")
+            self.all_nodes.append(LoopSummary(header, var))
+            self.curr_idx += 1
+            return True
+        for value in values:
+            self.all_nodes.append(LoopBinding(var, value))
+            self.curr_idx += 1
+            if self.semantic:
+                self.basic_blocks_semantic(m, s, node.body)
+            else:
+                # as a one-item list: a bare statement (no begin/end) would be walked as its children
+                self.basic_blocks_sv(m, s, [node.statement])
+        self.all_nodes.append(LoopBinding(var, exit_value))
+        self.curr_idx += 1
+        return True
+
     def basic_blocks_sv(self, m:ExecutionManager, s: SymbolicState, ast):
         """We want to get a list of AST nodes partitioned into basic blocks.
         Need to keep track of children/parent indices of each block in the list."""
         if hasattr(ast, '__iter__'):
             for item in ast:
-                if self.block_smt[self.block_stmt_depth] and (isinstance(item, ps.ConditionalStatementSyntax) or isinstance(item, ps.CaseStatementSyntax) or isinstance(item, ps.ForLoopStatementSyntax)):
+                if self.keep is not None and not self.keep(item):
+                    continue
+                if self.merge and isinstance(item, ps.ConditionalStatementSyntax) and is_mergeable(item, self.merge_size):
+                    # a single node: both arms run and are joined when the path is executed
+                    self.all_nodes.append(MergedConditional(item))
+                    self.curr_idx += 1
+                    continue
+                split = ternary_assignment(item) if self.split_ternaries else None
+                if self.block_smt[self.block_stmt_depth] and (isinstance(item, ps.ConditionalStatementSyntax) or isinstance(item, ps.CaseStatementSyntax) or isinstance(item, ps.ForLoopStatementSyntax) or split is not None):
                     if not self.block_stmt_depth in self.ind_branch_points:
                         self.ind_branch_points[self.block_stmt_depth] = set()
 
@@ -282,14 +434,13 @@ class CFG:
                 elif isinstance(item, ps.CaseStatementSyntax):
                     self.all_nodes.append(item)
                     self.partition_points.add(self.curr_idx)
+                    parent_idx = self.curr_idx
                     self.curr_idx += 1
-                    #self.basic_blocks_sv(m, s, item.caselist) 
-                    self.basic_blocks_sv(m, s, item.items)
-                elif isinstance(item, ps.CaseItemSyntax):
-                    body = getattr(item, "statements", getattr(item, "statement", None))
-                    self.basic_blocks_sv(m, s, body)
+                    self._process_case_sv(m, s, parent_idx, item)
 
 
+                elif isinstance(item, ps.ForLoopStatementSyntax) and self._unroll_for_loop_sv(m, s, item):
+                    pass
                 elif isinstance(item, ps.ForLoopStatementSyntax):
                     self.all_nodes.append(item)
                     #self.all_nodes.append(ast)
@@ -310,6 +461,8 @@ class CFG:
                         # No statement body, just add as a node
                         self.all_nodes.append(item)
                         self.curr_idx += 1
+                elif split is not None:
+                    self._split_ternary(*split)
                 # elif isinstance(item, ps.InitialConstructSyntax):
                 #     self.all_nodes.append(item)
                 #     self.curr_idx += 1
@@ -319,7 +472,12 @@ class CFG:
                     self.curr_idx += 1
 
         elif ast != None:
-            if isinstance(ast, ps.ConditionalStatementSyntax):
+            if self.keep is not None and not self.keep(ast):
+                return
+            if self.merge and isinstance(ast, ps.ConditionalStatementSyntax) and is_mergeable(ast, self.merge_size):
+                self.all_nodes.append(MergedConditional(ast))
+                self.curr_idx += 1
+            elif isinstance(ast, ps.ConditionalStatementSyntax):
                 self.partition_points.add(self.curr_idx)
                 self.all_nodes.append(ast)
                 parent_idx = self.curr_idx
@@ -329,11 +487,11 @@ class CFG:
             elif isinstance(ast, ps.CaseStatementSyntax):
                 self.all_nodes.append(ast)
                 self.partition_points.add(self.curr_idx)
+                parent_idx = self.curr_idx
                 self.curr_idx += 1
-                self.basic_blocks_sv(m, s, ast.items)
-            elif isinstance(ast, ps.CaseItemSyntax):
-                body = getattr(ast, "statements", getattr(ast, "statement", None))
-                self.basic_blocks_sv(m, s, body)
+                self._process_case_sv(m, s, parent_idx, ast)
+            elif isinstance(ast, ps.ForLoopStatementSyntax) and self._unroll_for_loop_sv(m, s, ast):
+                pass
             elif isinstance(ast, ps.ForLoopStatementSyntax):
                 self.all_nodes.append(ast)
                 self.partition_points.add(self.curr_idx)
@@ -359,10 +517,53 @@ class CFG:
                     # No statement body, just add as a node
                     self.all_nodes.append(ast)
                     self.curr_idx += 1
+            elif self.split_ternaries and ternary_assignment(ast) is not None:
+                self._split_ternary(*ternary_assignment(ast))
             else:
                 self.all_nodes.append(ast)
                 self.curr_idx += 1
 
+    def basic_blocks_semantic(self, m: ExecutionManager, s: SymbolicState, stmt):
+        """basic_blocks_sv over pyslang semantic statements (ProceduralBlockSymbol.body).
+        Their names are resolved to symbols, parameters are folded and types are known, so the
+        visitor never falls back to the syntax-node and string-lookup paths for them. The
+        statements are laid out exactly like their syntax counterparts."""
+        if stmt is None:
+            return
+        kind = stmt.kind
+        if kind == ps.StatementKind.List:
+            for sub in stmt.list:
+                self.basic_blocks_semantic(m, s, sub)
+        elif kind == ps.StatementKind.Block:
+            self.basic_blocks_semantic(m, s, stmt.body)
+        elif kind == ps.StatementKind.Timed:
+            # @(posedge clk) etc.: the timing control itself is not executed
+            self.basic_blocks_semantic(m, s, stmt.stmt)
+        elif kind == ps.StatementKind.Empty:
+            return
+        elif kind == ps.StatementKind.Conditional:
+            parent_idx = self.curr_idx
+            self.all_nodes.append(stmt)
+            self.partition_points.add(self.curr_idx)
+            self.curr_idx += 1
+            self._process_conditional_semantic(m, s, parent_idx, stmt)
+        elif kind == ps.StatementKind.Case:
+            parent_idx = self.curr_idx
+            self.all_nodes.append(stmt)
+            self.partition_points.add(self.curr_idx)
+            self.curr_idx += 1
+            self._process_case_sv(m, s, parent_idx, stmt)
+        elif kind == ps.StatementKind.ForLoop and self._unroll_for_loop_sv(m, s, stmt):
+            return
+        elif kind == ps.StatementKind.ForLoop:
+            # the body once, as for syntax loops that are not unrolled
+            self.basic_blocks_semantic(m, s, stmt.body)
+        elif self.split_ternaries and ternary_assignment(stmt) is not None:
+            self._split_ternary(*ternary_assignment(stmt))
+        else:
+            self.all_nodes.append(stmt)
+            self.curr_idx += 1
+
     def map_to_path(self):
         """Just return the paths"""
         return self.paths
@@ -370,77 +571,39 @@ class CFG:
     def partition(self):
         """Partitions all_nodes into basic blocks based on partition_points.
 
-        The partition_points mark branch points in the CFG:
-        - The first partition point (0) is the start of the first block
-        - Subsequent partition points mark the START of new blocks (branch targets)
+        A partition point is either a branch node (an if/else or case statement, the source
+        of edges in edgelist) or the first node of a branch target. A branch node ends its
+        basic block and a branch target starts one; other partition points (such as loops
+        kept as a single node) do not split the block they are in.
 
-        For partition_points = [0, 2, 3, 7, 10]:
-        - Block 0: nodes [0, 1, 2] (from 0 up to and including the conditional at 2)
-        - Block 1: nodes [3, 4, 5, 6] (then-branch: from 3 up to but not including 7)
-        - Block 2: nodes [7, 8, 9, 10] (else-branch: from 7 to the end)
+        For an if/else at index 2 with the then-branch at [3, 7) and the else-branch at [7, 11):
+        - Block 0: nodes [0, 1, 2] (up to and including the conditional)
+        - Block 1: nodes [3, 4, 5, 6] (then-branch)
+        - Block 2: nodes [7, 8, 9, 10] (else-branch)
 
-        The key insight is that partition_points[1] (the conditional) is the END of block 0,
-        while partition_points[2] and beyond are the START of new blocks.
+        Block 1 directly following block 0 is what makes the then-edge direction 1.
         """
-        self.partition_points.add(len(self.all_nodes)-1)
-        partition_list = sorted(list(self.partition_points))
-
-        # First block: from start to the first branch point (inclusive)
-        # This includes the conditional statement itself
-        if len(partition_list) >= 2:
-            first_block = self.all_nodes[partition_list[0]:partition_list[1]+1]
-            self.basic_block_list.append(first_block)
-
-            # Subsequent blocks: each starts at a partition point and ends before the next
-            for i in range(2, len(partition_list)):
-                start = partition_list[i-1] + 1  # Start after the previous partition point
-                end = partition_list[i]  # End at this partition point (exclusive for intermediate, inclusive for last)
-
-                if i == len(partition_list) - 1:
-                    # Last block: include up to and including the last node
-                    basic_block = self.all_nodes[start:end+1]
-                else:
-                    # Intermediate block: exclude the next partition point
-                    basic_block = self.all_nodes[start:end]
-
-                if basic_block:  # Only add non-empty blocks
-                    self.basic_block_list.append(basic_block)
-        else:
-            # Only one partition point: single block with all nodes
-            self.basic_block_list.append(self.all_nodes[:])
+        heads = {edge[0] for edge in self.edgelist}
+        targets = {edge[1] for edge in self.edgelist}
+        cuts = {0, len(self.all_nodes)}
+        for point in self.partition_points:
+            if point in heads:
+                cuts.add(point + 1)
+            if point in targets:
+                cuts.add(point)
+        bounds = sorted(c for c in cuts if 0 <= c <= len(self.all_nodes))
+        if len(bounds) < 2:
+            # empty always block: a single empty basic block
+            self.block_starts = [0]
+            self.basic_block_list.append([])
+            return
+        self.block_starts = bounds[:-1]
+        for start, end in zip(bounds, bounds[1:]):
+            self.basic_block_list.append(self.all_nodes[start:end])
 
     def find_basic_block(self, node_idx) -> int:
-        """Given a node index, find the index of the basic block that contains it.
-
-        Uses partition points to determine block membership:
-        - Block 0: nodes from partition_list[0] to partition_list[1] (inclusive)
-        - Block i (i > 0): nodes from partition_list[i] to partition_list[i+1]-1 (for branch targets)
-        """
-        partition_list = sorted(list(self.partition_points))
-
-        if len(partition_list) < 2:
-            return 0
-
-        # Check if in first block (includes the conditional)
-        if node_idx <= partition_list[1]:
-            return 0
-
-        # Check subsequent blocks (branch targets)
-        # Block 1 starts at partition_list[2], Block 2 starts at partition_list[3], etc.
-        for i in range(2, len(partition_list)):
-            block_start = partition_list[i]
-
-            if i == len(partition_list) - 1:
-                # Last block: from this partition point to the end
-                if node_idx >= block_start:
-                    return i - 1  # Block index is i-1 (since block 0 covers indices 0 and 1)
-            else:
-                block_end = partition_list[i + 1] - 1
-                if block_start <= node_idx <= block_end:
-                    return i - 1
-
-        # Fallback: return last block
-        return len(self.basic_block_list) - 1
+        """Given a node index, find the index of the basic block that contains it."""
+        return max(bisect_right(self.block_starts, node_idx) - 1, 0)
 
     def make_paths(self):
         """Map the edge between AST nodes to a path between basic blocks."""
@@ -458,12 +621,15 @@ class CFG:
 
     def display_cfg(self, graph):
         """Display CFG."""
+        import matplotlib.pyplot as plt
+        import networkx as nx
         subax1 = plt.subplot(121)
-        nx.draw(graph, with_labels=True, font_weight='bold')
+        nx.draw(graph.to_networkx(), with_labels=True, font_weight='bold')
         plt.show()
 
-    def build_cfg(self, m: ExecutionManager, s: SymbolicState):
-        """Build networkx digraph."""
+    def build_cfg(self, m: ExecutionManager, s: SymbolicState, enumerate_paths: bool = True):
+        """Build the BlockGraph. With enumerate_paths=False only the graph is built, so path
+        counts can be planned before committing to materializing them (see enumerate_paths())."""
         print(f"[DEBUG build_cfg] all_nodes count: {len(self.all_nodes)}, edgelist count: {len(self.edgelist)}")
         print(f"[DEBUG build_cfg] partition_points: {sorted(self.partition_points)}")
         print(f"[DEBUG build_cfg] edgelist: {self.edgelist}")
@@ -473,39 +639,56 @@ class CFG:
         # print(self.basic_block_list)
         # print(self.cfg_edges)
 
-        G = nx.DiGraph()
-        for block in self.basic_block_list:
-            # converts the list into a tuple. Needs to be hashable type
-            G.add_node(indexOf(self.basic_block_list, block), data=tuple(block))
-
-        G.add_node(-1, data="Dummy Start")
-        G.add_node(-2, data="Dummy End")
+        G = BlockGraph(len(self.basic_block_list))
 
-        for edge in self.cfg_edges:
-            start = edge[0]
-            end = edge[1]
-            G.add_edge(start, end)
+        for edge, (start, end) in zip(self.edgelist, self.cfg_edges):
+            G.add_edge(start, end, self.edge_directions.get((edge[0], edge[1])))
 
         # edgecase lol
         if self.edgelist == []:
-            G.add_edge(0, -2)
+            G.add_edge(0, END)
 
         # link up dummy start
-        G.add_edge(-1, 0)
+        G.add_edge(START, 0)
         self.find_leaves()
 
         # link of dummy exit
         for leaf in self.leaves:
-            G.add_edge(leaf, -2)
+            G.add_edge(leaf, END)
 
         #print(G.edges())
 
         #self.display_cfg(G)
 
         #traversed = nx.edge_dfs(G, source=-1)
-        self.paths = list(nx.all_simple_paths(G, source=-1, target=-2))
+        self.graph = G
+        if enumerate_paths:
+            self.enumerate_paths()
+
+    def cached_form(self) -> dict:
+        """What the path cache keeps of this CFG: the graph build_cfg computes. The paths are
+        unranked from it again, which is cheaper than storing them."""
+        return {"nodes": len(self.all_nodes), "blocks": len(self.basic_block_list), "edges": self.graph.labeled_edges()}
+
+    def restore(self, entry: dict) -> bool:
+        """Take the graph and paths from a path cache entry instead of build_cfg. Only valid
+        after basic_blocks_sv and partition laid out the same nodes; returns False otherwise."""
+        if entry.get("nodes") != len(self.all_nodes) or entry.get("blocks") != len(self.basic_block_list):
+            return False
+        G = BlockGraph(len(self.basic_block_list))
+        for start, end, direction in entry["edges"]:
+            G.add_edge(start, end, direction)
+        self.graph = G
+        self.paths = PathList(G)
+        return True
+
+    def enumerate_paths(self):
+        """Index the paths from the dummy start to the dummy end. On a DAG this counts them
+        per node and unranks each one on demand (see PathList), so nothing grows with the
+        number of paths; a graph with a back edge still lists its simple paths."""
+        self.paths = PathList(self.graph)
         print(f"[DEBUG build_cfg] paths computed: {len(self.paths)} paths")
         if len(self.paths) <= 5:
-            print(f"[DEBUG build_cfg] paths: {self.paths}")
+            print(f"[DEBUG build_cfg] paths: {list(self.paths)}")
         #print(list(traversed))
         #print(list(self.paths))
\ No newline at end of file
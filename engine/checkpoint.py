@@ -0,0 +1,74 @@
+"""Checkpoints of the serial exploration, so long runs survive preemption (`--resume`).
+
+A 24h `--explore_time` run used to lose everything when it was killed. The serial loop
+now keeps a small progress record: which PathSource it is in, how many ranks of it have
+run, the search strategy's own state, the counters (`path_count`, `branch_count`,
+`solver_time`, infeasible paths) and the violation, if one was found. The record is
+written as JSON every `interval` seconds, when the time limit hits, and at the end of
+the run. It is written to a temporary file first and renamed over the old one, so a
+kill in the middle of a write leaves the previous checkpoint intact.
+
+Strategies are deterministic given their state, so resuming replays no path: static
+orders restart at the saved rank and adaptive ones restore what they learned. A
+checkpoint only applies to the same path space. Its fingerprint holds the number of
+cycles, the strategy, the shard and the radices of every PathSource; on a mismatch the
+run starts over."""
+
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+CHECKPOINT_VERSION = 1
+DEFAULT_INTERVAL = 60.0
+
+
+class Checkpoint:
+    """Progress record of one exploration, saved to `path`."""
+
+    def __init__(self, path: str, interval: float = DEFAULT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.data = None
+        self.last_save = time.monotonic()
+        # the --explore_time timer saves from its own thread
+        self.lock = threading.Lock()
+
+    def load(self, fingerprint: dict) -> Optional[dict]:
+        """The saved progress, or None if there is none for this path space."""
+        if not os.path.exists(self.path):
+            print(f"No checkpoint at {self.path}, starting from scratch")
+            return None
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[Warning] Unreadable checkpoint {self.path} ({e}), starting from scratch")
+            return None
+        if data.get("version") != CHECKPOINT_VERSION or data.get("fingerprint") != fingerprint:
+            print(f"[Warning] Checkpoint {self.path} is for a different design or configuration, starting from scratch")
+            return None
+        print(f"Resuming from {self.path}: source {data['source']}, {data['done']} ranks done, {data['paths']} paths")
+        return data
+
+    def update(self, data, force: bool = False) -> None:
+        """Record the latest progress; it is written out once the interval has passed. data is
+        the record or a callable building it, which is only called when the record is written,
+        so progress can be reported after every path without building a record each time."""
+        with self.lock:
+            self.data = data
+        if force or time.monotonic() - self.last_save >= self.interval:
+            self.save()
+
+    def save(self) -> None:
+        with self.lock:
+            if self.data is None:
+                return
+            if callable(self.data):
+                self.data = self.data()
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self.last_save = time.monotonic()
@@ -0,0 +1,174 @@
+"""Read/write-set analysis of always blocks, used to split the path product.
+
+`execute_sv` combines the CFG paths of every always block, of every cycle and of every
+module instance with one big product. Two always blocks that touch disjoint signals
+multiply each other's path counts for no reason: whatever path one takes cannot change
+what the other computes or asserts. Here each always block gets a write set (assignment
+targets) and a touch set (every identifier in it, which over-approximates its reads).
+Blocks are dependent when one writes a signal the other touches. Signals joined through
+instance port connections or continuous assigns count as the same signal. The connected components of that
+relation are independent groups. Each group can be explored on its own, so the number of
+paths becomes the sum of the group products instead of one product over everything."""
+
+import re
+from typing import Dict, List, Tuple
+
+import pyslang as ps
+
+from .execution_manager import ExecutionManager
+from .path_source import PathSource
+from helpers.slang_helpers import get_module_name, get_branches, get_case_item_body
+
+# identifiers, but not the base letter of a literal such as 8'hFF
+IDENTIFIER = re.compile(r"(?<![\w$'])[A-Za-z_][\w$]*")
+
+
+def identifiers(node) -> set:
+    if node is None:
+        return set()
+    return set(IDENTIFIER.findall(str(node)))
+
+
+def lhs_name(lhs):
+    ident = getattr(lhs, "identifier", None)
+    if ident is None:
+        return None
+    return getattr(ident, "valueText", None) or getattr(ident, "value", None)
+
+
+def block_writes(stmt, out: set) -> set:
+    """Names assigned anywhere in an always block."""
+    if stmt is None:
+        return out
+    if isinstance(stmt, ps.ExpressionStatementSyntax):
+        expr = stmt.expr
+        if expr.kind in (ps.SyntaxKind.AssignmentExpression, ps.SyntaxKind.NonblockingAssignmentExpression):
+            name = lhs_name(expr.left)
+            if name is not None:
+                out.add(name)
+            else:
+                # concatenation targets and the like: count every name on the left
+                out.update(identifiers(expr.left))
+    elif isinstance(stmt, ps.BlockStatementSyntax):
+        for sub in stmt.items:
+            block_writes(sub, out)
+    elif isinstance(stmt, ps.ConditionalStatementSyntax):
+        for body in get_branches(stmt):
+            block_writes(body, out)
+    elif isinstance(stmt, ps.CaseStatementSyntax):
+        for item in getattr(stmt, "items", []):
+            block_writes(get_case_item_body(item), out)
+    elif stmt.__class__.__name__ in ("TimingControlStatementSyntax", "ProceduralBlockSyntax") or hasattr(stmt, "statement"):
+        block_writes(getattr(stmt, "statement", None), out)
+    elif hasattr(stmt, "__iter__") and not isinstance(stmt, ps.StatementSyntax):
+        for sub in stmt:
+            block_writes(sub, out)
+    return out
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a, b) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[ra] = rb
+
+
+def port_aliases(modules) -> UnionFind:
+    """(instance, port) and the parent signals connected to it are the same signal."""
+    aliases = UnionFind()
+    for parent in modules:
+        parent_name = get_module_name(parent)
+        for child in getattr(parent, "body", None) or []:
+            if getattr(child, "kind", None) != ps.SymbolKind.Instance:
+                continue
+            for conn in getattr(child, "portConnections", None) or []:
+                port_name = getattr(getattr(conn, "port", None), "name", None)
+                expr = getattr(conn, "expression", None)
+                if port_name is None or expr is None:
+                    continue
+                for ident in identifiers(getattr(expr, "syntax", None) or expr):
+                    aliases.union((child.name, port_name), (parent_name, ident))
+    return aliases
+
+
+def assign_aliases(aliases: UnionFind, modules) -> None:
+    """A continuous assign carries dataflow between every name it mentions: a block reading
+    `y` in `assign y = x;` depends on the blocks writing `x`."""
+    for module in modules:
+        name = get_module_name(module)
+        for item in getattr(module, "body", None) or []:
+            if item.__class__.__name__ != "ContinuousAssignSymbol":
+                continue
+            names = sorted(identifiers(getattr(item, "syntax", None)))
+            for sig in names[1:]:
+                aliases.union((name, names[0]), (name, sig))
+
+
+def analyze_dependencies(manager: ExecutionManager, modules, always_blocks_by_name) -> List[List[Tuple[str, int]]]:
+    """Fill manager.dependencies / intermodule_dependencies and return the independent groups.
+
+    manager.dependencies[module][k] is the set of always blocks of the same module that
+    block k shares dataflow with; manager.intermodule_dependencies[module][k] holds the
+    (module, block) pairs of other instances. Groups are lists of (module, block index)."""
+    aliases = port_aliases(modules)
+    assign_aliases(aliases, modules)
+    writes = {}
+    touches = {}
+    for name in manager.names_list:
+        for k, ab in enumerate(always_blocks_by_name.get(name, [])):
+            block = (name, k)
+            writes[block] = {aliases.find((name, sig)) for sig in block_writes(ab, set())}
+            touches[block] = {aliases.find((name, sig)) for sig in identifiers(ab)} | writes[block]
+
+    writers: Dict[tuple, List[tuple]] = {}
+    for block, signals in writes.items():
+        for sig in signals:
+            writers.setdefault(sig, []).append(block)
+
+    groups = UnionFind()
+    for name in manager.names_list:
+        manager.dependencies[name] = {}
+        manager.intermodule_dependencies[name] = {}
+    for block, signals in touches.items():
+        groups.find(block)
+        name, k = block
+        manager.dependencies[name].setdefault(k, set())
+        manager.intermodule_dependencies[name].setdefault(k, set())
+        for sig in signals:
+            for writer in writers.get(sig, []):
+                if writer == block:
+                    continue
+                groups.union(block, writer)
+                for a, b in ((block, writer), (writer, block)):
+                    if a[0] == b[0]:
+                        manager.dependencies[a[0]].setdefault(a[1], set()).add(b[1])
+                    else:
+                        manager.intermodule_dependencies[a[0]].setdefault(a[1], set()).add(b)
+
+    by_root = {}
+    for block in touches:
+        by_root.setdefault(groups.find(block), []).append(block)
+    return list(by_root.values())
+
+
+def group_sources(groups, mapped_paths, module_names, num_cycles: int) -> List[PathSource]:
+    """One PathSource per independent group, covering only that group's always blocks."""
+    sources = []
+    for group in groups:
+        sub = {}
+        for name, k in group:
+            sub.setdefault(name, {})[k] = mapped_paths[name][k]
+        sources.append(PathSource(sub, [n for n in module_names if n in sub], num_cycles))
+    return sources
@@ -0,0 +1,336 @@
+"""Multi-node exploration: a coordinator leases path-prefix work units to workers.
+
+For 24-hour `--explore_time` runs one machine is not enough. The coordinator splits the path
+space into work units that each fix a prefix of (module, cycle, always block) choices, so a
+unit is a contiguous, prefix-aligned PathSource index range. Workers connect over TCP
+(`host:port`) or a Unix socket (`unix:/path`), lease one unit at a time and report counters
+back when it is done. If a worker disconnects or holds a lease past `lease_timeout`, the unit
+is leased to someone else; a unit is counted once, whoever finishes it first. A coordinator
+that spawned its own workers gives up once all of them have exited with work left and no
+other worker is connected, instead of waiting for connections that will never come.
+
+The protocol is newline-delimited JSON:
+    worker -> coordinator  {"type": "hello", "worker": id, "radices": [...], "total": n}
+    coordinator -> worker  {"type": "lease", "unit": u, "start": a, "stop": b} | {"type": "stop"}
+    worker -> coordinator  {"type": "done", "unit": u, "paths": .., "branches": .., "solver_time": ..}
+    worker -> coordinator  {"type": "violation", "unit": u, ...shard summary...}
+
+The coordinator does not need pyslang: the shape of the path space comes from the first
+worker's hello. With `local_workers` it spawns worker processes itself, so the whole setup
+runs (and can be tested) on a single Linux box."""
+
+import json
+import multiprocessing as mp
+import os
+import selectors
+import socket
+import sys
+import time
+from collections import deque
+
+from .parallel import shard_summary, print_summary
+
+# number of work units to aim for; the prefix length is the shortest one giving at least this many
+DEFAULT_UNITS = 256
+DEFAULT_LEASE_TIMEOUT = 3600.0
+
+
+def parse_address(address: str):
+    """'unix:/path' -> (AF_UNIX, '/path'); 'host:port' -> (AF_INET, (host, port))."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def connect(address: str, retries: int = 50, delay: float = 0.2) -> socket.socket:
+    """Connect to the coordinator, retrying while it is still starting up."""
+    family, addr = parse_address(address)
+    for attempt in range(retries):
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.connect(addr)
+            return sock
+        except OSError:
+            sock.close()
+            if attempt == retries - 1:
+                raise
+            time.sleep(delay)
+
+
+def send_msg(sock: socket.socket, msg: dict) -> None:
+    sock.sendall((json.dumps(msg) + "\n").encode())
+
+
+def prefix_units(radices, target_units: int):
+    """Split the path space into prefix-aligned [start, stop) ranges.
+    Fixing the first L digits leaves a block of prod(radices[L:]) consecutive indices."""
+    total = 1
+    for r in radices:
+        total *= r
+    if total == 0:
+        return []
+    prefixes = 1
+    level = 0
+    while level < len(radices) and prefixes < target_units:
+        prefixes *= radices[level]
+        level += 1
+    suffix = total // prefixes
+    return [(p * suffix, (p + 1) * suffix) for p in range(prefixes)]
+
+
+class LeaseClient:
+    """Worker side of the protocol. Plugs into ExecutionEngine.work_source."""
+
+    def __init__(self, address: str, worker_id: str):
+        self.address = address
+        self.worker_id = worker_id
+        self.sock = None
+        self.rfile = None
+        self.unit = None
+
+    def recv(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    def leases(self, manager, total_paths):
+        """Yield leased (start, stop) ranges until the coordinator says stop.
+        Completion of a range is reported when the engine asks for the next one."""
+        self.sock = connect(self.address)
+        self.rfile = self.sock.makefile("r")
+        send_msg(self.sock, {"type": "hello", "worker": self.worker_id,
+                             "radices": total_paths.radices, "total": total_paths.total})
+        while True:
+            msg = self.recv()
+            if msg is None or msg["type"] == "stop":
+                return
+            before = (manager.path_count, manager.branch_count, manager.solver_time)
+            self.unit = msg["unit"]
+            yield msg["start"], msg["stop"]
+            try:
+                send_msg(self.sock, {"type": "done", "unit": self.unit,
+                                     "paths": manager.path_count - before[0],
+                                     "branches": manager.branch_count - before[1],
+                                     "solver_time": manager.solver_time - before[2]})
+            except OSError:
+                # the coordinator already finished (someone else completed this unit)
+                return
+            self.unit = None
+
+    def report_violation(self, manager) -> None:
+        msg = shard_summary(manager)
+        msg.update({"type": "violation", "unit": self.unit})
+        send_msg(self.sock, msg)
+
+    def close(self) -> None:
+        if self.sock is not None:
+            self.sock.close()
+
+
+class Coordinator:
+    """Hands out work units, re-issues lost leases and aggregates results."""
+
+    def __init__(self, address: str, lease_timeout: float = DEFAULT_LEASE_TIMEOUT, target_units: int = DEFAULT_UNITS):
+        self.address = address
+        self.lease_timeout = lease_timeout
+        self.target_units = target_units
+        self.radices = None
+        self.units = []
+        self.pending = deque()
+        # unit -> (connection, deadline)
+        self.leased = {}
+        self.completed = set()
+        self.idle = []
+        self.conns = {}
+        self.summary = shard_summary(None)
+        self.finished = False
+        self.server = None
+        self.sel = selectors.DefaultSelector()
+        # worker processes spawned on this machine (local_workers)
+        self.local = []
+
+    def listen(self) -> socket.socket:
+        family, addr = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(addr):
+            os.unlink(addr)
+        server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(addr)
+        server.listen()
+        server.setblocking(False)
+        self.sel.register(server, selectors.EVENT_READ, None)
+        self.server = server
+        return server
+
+    def assign(self, conn) -> None:
+        """Lease the next pending unit to conn, or park it until one frees up."""
+        while self.pending and self.pending[0] in self.completed:
+            self.pending.popleft()
+        if not self.pending:
+            if conn not in self.idle:
+                self.idle.append(conn)
+            return
+        unit = self.pending.popleft()
+        self.leased[unit] = (conn, time.monotonic() + self.lease_timeout)
+        start, stop = self.units[unit]
+        send_msg(conn, {"type": "lease", "unit": unit, "start": start, "stop": stop})
+
+    def requeue(self, units) -> None:
+        """Put lost units back at the front and hand them to idle workers."""
+        for unit in units:
+            if unit not in self.completed:
+                self.pending.appendleft(unit)
+        while self.idle and self.pending:
+            self.assign(self.idle.pop(0))
+
+    def drop(self, conn) -> None:
+        """A worker went away: its leases go back to the queue."""
+        self.sel.unregister(conn)
+        self.conns.pop(conn, None)
+        if conn in self.idle:
+            self.idle.remove(conn)
+        lost = [u for u, (c, _) in self.leased.items() if c is conn]
+        for u in lost:
+            del self.leased[u]
+        if lost:
+            print(f"[Coordinator] worker lost, re-issuing units {lost}")
+        conn.close()
+        self.requeue(lost)
+
+    def handle(self, conn, msg: dict) -> None:
+        kind = msg["type"]
+        if kind == "hello":
+            if self.radices is None:
+                self.radices = msg["radices"]
+                self.units = prefix_units(self.radices, self.target_units)
+                self.pending = deque(range(len(self.units)))
+                print(f"[Coordinator] {msg['total']} paths split into {len(self.units)} work units")
+                if not self.units:
+                    self.finished = True
+            elif msg["radices"] != self.radices:
+                print(f"[Coordinator] worker {msg['worker']} has a different path space, rejecting it")
+                send_msg(conn, {"type": "stop"})
+                return
+            self.conns[conn]["worker"] = msg["worker"]
+            self.assign(conn)
+        elif kind == "done":
+            unit = msg["unit"]
+            if self.leased.get(unit, (None,))[0] is conn:
+                del self.leased[unit]
+            if unit not in self.completed:
+                self.completed.add(unit)
+                self.summary["paths"] += msg["paths"]
+                self.summary["branches"] += msg["branches"]
+                self.summary["solver_time"] += msg["solver_time"]
+            if len(self.completed) == len(self.units):
+                self.finished = True
+            else:
+                self.assign(conn)
+        elif kind == "violation":
+            self.summary["paths"] += msg["paths"]
+            self.summary["branches"] += msg["branches"]
+            self.summary["solver_time"] += msg["solver_time"]
+            self.summary.update({k: msg[k] for k in ("violation", "violated_assertions", "counterexample")})
+            self.finished = True
+
+    def expire(self) -> None:
+        now = time.monotonic()
+        late = [u for u, (_, deadline) in self.leased.items() if deadline < now]
+        for u in late:
+            del self.leased[u]
+        if late:
+            print(f"[Coordinator] leases expired, re-issuing units {late}")
+            self.requeue(late)
+
+    def orphaned(self) -> bool:
+        """True when every local worker has exited and no worker is connected: nobody is left
+        to finish the pending units. Always False without local workers, since remote ones
+        may still connect."""
+        if not self.local or self.conns or any(p.is_alive() for p in self.local):
+            return False
+        left = len(self.units) - len(self.completed) if self.radices is not None else "all"
+        codes = [p.exitcode for p in self.local]
+        print(f"[Warning] every local worker exited (exit codes {codes}) with {left} work units left, giving up")
+        return True
+
+    def serve(self) -> dict:
+        """Run until every unit is done or a violation is reported; returns the merged summary."""
+        server = self.server if self.server is not None else self.listen()
+        while not self.finished:
+            for key, _ in self.sel.select(timeout=1.0):
+                if key.data is None:
+                    conn, _ = server.accept()
+                    self.conns[conn] = {"buf": b"", "worker": None}
+                    self.sel.register(conn, selectors.EVENT_READ, "worker")
+                    continue
+                conn = key.fileobj
+                try:
+                    data = conn.recv(65536)
+                except OSError:
+                    data = b""
+                if not data:
+                    self.drop(conn)
+                    continue
+                state = self.conns[conn]
+                state["buf"] += data
+                while b"\n" in state["buf"] and not self.finished:
+                    line, state["buf"] = state["buf"].split(b"\n", 1)
+                    self.handle(conn, json.loads(line))
+            self.expire()
+            if not self.finished and self.orphaned():
+                break
+
+        for conn in list(self.conns):
+            try:
+                send_msg(conn, {"type": "stop"})
+            except OSError:
+                pass
+            conn.close()
+        server.close()
+        return self.summary
+
+
+def run_worker(address, explore, configure_engine, options, filelist, num_cycles, worker_id=None) -> None:
+    """Connect to a coordinator and explore leased units until told to stop."""
+    from engine.execution_engine import ExecutionEngine
+
+    engine = ExecutionEngine()
+    configure_engine(engine, options)
+    client = LeaseClient(address, worker_id or f"{socket.gethostname()}:{os.getpid()}")
+    engine.work_source = client
+    try:
+        explore(engine, options, filelist, num_cycles)
+        if engine.manager is not None and engine.manager.assertion_violation:
+            client.report_violation(engine.manager)
+    finally:
+        client.close()
+
+
+def _local_worker(address, explore, configure_engine, options, filelist, num_cycles, k) -> None:
+    sys.stdout = open(os.devnull, "w")
+    run_worker(address, explore, configure_engine, options, filelist, num_cycles, worker_id=f"local-{k}")
+
+
+def run_coordinator(address, explore=None, configure_engine=None, options=None, filelist=None, num_cycles=None,
+                    local_workers: int = 0, lease_timeout: float = DEFAULT_LEASE_TIMEOUT) -> dict:
+    """Serve work units on address. local_workers > 0 also spawns that many worker processes
+    on this machine, standing in for remote nodes."""
+    coordinator = Coordinator(address, lease_timeout)
+    # listen before spawning so local workers connect on the first try
+    coordinator.listen()
+    workers = []
+    if local_workers > 0:
+        ctx = mp.get_context("fork")
+        for k in range(local_workers):
+            p = ctx.Process(target=_local_worker, args=(address, explore, configure_engine, options, filelist, num_cycles, k))
+            p.start()
+            workers.append(p)
+    coordinator.local = workers
+    summary = coordinator.serve()
+    for p in workers:
+        p.join()
+    print_summary({0: summary})
+    return summary
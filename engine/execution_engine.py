@@ -5,6 +5,20 @@ from z3 import Solver, Int, BitVec, Context, BitVecSort, ExprRef, BitVecRef, If,
 from .execution_manager import ExecutionManager
 from .symbolic_state import SymbolicState
 from .cfg import CFG
+from .path_source import PathSource
+from .prefix_executor import PrefixSharingExecutor
+from .forking_executor import ForkingExecutor
+from .search_strategy import SearchStrategy, DFSStrategy, RandomStrategy
+from .state_merging import MergedConditional, merge_conditional, count_block_paths
+from .dependencies import analyze_dependencies, group_sources
+from .slicing import ConeOfInfluence, slice_always_blocks
+from .planner import PathPlan, format_count
+from .checkpoint import Checkpoint, CHECKPOINT_VERSION
+from .parallel import shard_summary, print_summary
+from .memo import StateMemo, state_digest, boundary_levels
+from .loop_unroll import LoopBinding, LoopSummary, elaborated_loops, parameter_values, run_loop_node
+from .ternary import TernaryBranch, TernaryArm, run_ternary_node
+from .path_cache import block_key
 import re
 import os
 from optparse import OptionParser
@@ -13,12 +27,14 @@ import random, string
 import time
 import gc
 from itertools import product
+from functools import partial
 import logging
-from helpers.utils import to_binary, init_symbol
+from helpers.utils import to_binary
 import sys
 from copy import deepcopy
 import pyslang as ps
 from helpers.slang_helpers import get_module_name, init_state
+from helpers.rvalue_to_z3 import initial_term, signal_width
 
 # Tuple of PySlang AST node types that represent conditional/loop statements
 CONDITIONALS = (
@@ -35,6 +51,38 @@ class ExecutionEngine:
     debug: bool = True # Boolean flag to enable debug output
     done: bool = False # Boolean flag indicating if execution is complete
     cache = None # Optional Redis cache for Z3 solver results TODO
+    prefix_sharing: bool = False # Explore paths as a trie that shares cycle prefixes
+    forking: bool = False # Fork the state at branches instead of enumerating CFG paths up front
+    shard = None # (index, count): only explore this worker's share of the path space
+    progress_callback = None # Called with the manager after each path; returning True stops exploration
+    manager = None # ExecutionManager of the last run, read back by --jobs workers
+    work_source = None # Lease client handing out path-index ranges (distributed workers)
+    search_strategy = None # SearchStrategy ordering the serial path loop; None runs product order
+    merge: bool = False # Merge mux-style if/else statements into ITEs instead of splitting paths
+    merge_paths: int = 1 # Only merge always blocks that would otherwise split into more paths than this
+    merge_size: int = 64 # Largest if/else (in tokens) that is merged
+    decompose: bool = False # Explore independent always-block groups separately instead of their product
+    slice: bool = False # Drop always blocks and statements outside the assertions' cone of influence
+    cone = None # ConeOfInfluence of the current run when slicing
+    plan: bool = False # Only count the paths and report them, without exploring
+    max_paths: int = 0 # Path budget checked before exploring; 0 means no budget
+    over_budget: str = "refuse" # What to do over max_paths: refuse, merge or sample
+    path_limit = None # Stop the serial loop after this many paths (set when sampling)
+    seed = None # Seed of the random sample taken over max_paths
+    checkpoint_path = None # File the serial loop saves its progress to
+    checkpoint_interval: float = 60.0 # Seconds between checkpoints
+    resume: bool = False # Continue from the checkpoint at checkpoint_path
+    checkpointer = None # Checkpoint of the current run, also saved when the time limit hits
+    checkpoint_fingerprint = None # Path space the checkpoint belongs to
+    memoize: bool = False # Skip path suffixes from cycle-boundary states that were already explored
+    memo_size: int = 100000 # Most states the memo table keeps (LRU)
+    unroll_limit: int = 0 # Unroll constant-bound for-loops up to this many iterations, summarize longer ones; 0 (default) disables
+    loop_params = None # Module name -> integer parameter values, keying CFGs and bounding loops without an elaborated statement
+    loop_statements = None # Module name -> elaborated for-loops, by syntax node (loop_unroll.elaborated_loops)
+    cfg_cache = None # (definition, parameter values, cone) -> (always blocks, CFGs), shared by every instance
+    path_cache = None # PathCache with the CFGs of earlier runs on the same sources
+    semantic_cfg: bool = False # Build CFGs from pyslang semantic statements instead of syntax nodes
+    ternary_mode: str = "ite" # "ite": ternaries are If terms; "split": paths split at assignments of ternaries
 
     def check_pc_SAT(self, s: Solver, constraint: ExprRef) -> bool:
         """Check if pc is satisfiable before taking path."""
@@ -197,12 +245,30 @@ class ExecutionEngine:
             manager: ExecutionManager = ExecutionManager()
             manager.cache = self.cache
             manager.sv = True
+            self.manager = manager
             modules_dict = {}
             # a dictionary keyed by module name, that gives the list of cfgs
             cfgs_by_module = {}
             cfg_count_by_module = {}
+            # always-block syntax per module/instance name, for executors that walk statements directly
+            always_blocks_by_name = {}
+            # instance name -> module name the slicing cone is keyed by, when they differ
+            cone_names = {}
+            self.cone = None
+            if self.slice:
+                self.cone = ConeOfInfluence(modules)
+                if not self.cone.assertions:
+                    print("[Warning] No assertions found, nothing to slice against")
+                    self.cone = None
+                manager.assertions = self.cone.assertions if self.cone is not None else []
+                manager.blocks_of_interest = []
+            self.loop_params = {}
+            self.loop_statements = {}
+            self.cfg_cache = {}
             for module in modules:
                 sv_module_name = get_module_name(module)
+                self.loop_params[sv_module_name] = parameter_values(module)
+                self.loop_statements[sv_module_name] = elaborated_loops(module)
                 #print(sv_module_name)
                 #modules_dict[sv_module_name] = sv_module_name
                 modules_dict[sv_module_name] = module
@@ -225,19 +291,12 @@ class ExecutionEngine:
                         manager.names_list.append(instance_name)
                         cfgs_by_module[instance_name] = []
 
-                         # 1) discover always blocks once
-                        probe = CFG()
-                        probe.get_always_sv(manager, state, module)
-
-                        # 2) build a fresh CFG per always block (SV walker)
-                        for ab in probe.always_blocks:
-                            ab_body = getattr(ab, "statement", getattr(ab, "members", ab))
-                            c = CFG()
-                            c.module_name = instance_name
-                            c.basic_blocks_sv(manager, state, ab_body)
-                            c.partition()
-                            c.build_cfg(manager, state)
-                            cfgs_by_module[instance_name].append(c)
+                        # always blocks and CFGs are built for the first instance and shared by the others;
+                        # execute_path binds them to the instance through manager.curr_module
+                        always_blocks, cfgs = self.definition_cfgs(manager, state, module, sv_module_name)
+                        always_blocks_by_name[instance_name] = always_blocks
+                        cone_names[instance_name] = sv_module_name
+                        cfgs_by_module[instance_name] = list(cfgs)
 
 
                         """# build X CFGx for the particular module 
@@ -296,22 +355,14 @@ class ExecutionEngine:
                     modules_dict[sv_module_name] = module                 # store AST
                     
 
-                    # discover always blocks once
-                    probe = CFG()
-                    probe.get_always_sv(manager, state, module)
-                    always_blocks_by_module[sv_module_name] = probe.always_blocks
+                    # discover always blocks and build a CFG per always block (SV walker), unless
+                    # another instance of the same definition already did
+                    always_blocks, cfgs = self.definition_cfgs(manager, state, module, sv_module_name)
+                    always_blocks_by_module[sv_module_name] = always_blocks
+                    always_blocks_by_name[sv_module_name] = always_blocks
                     #print(probe.always_blocks)
 
-                    # fresh CFG per always (SV walker)
-                    cfgs_by_module[sv_module_name] = []
-                    for ab in always_blocks_by_module[sv_module_name]:
-                        ab_body = getattr(ab, "statement", getattr(ab, "members", ab))
-                        c = CFG()
-                        c.module_name = sv_module_name
-                        c.basic_blocks_sv(manager, state, ab_body)
-                        c.partition()
-                        c.build_cfg(manager, state)
-                        cfgs_by_module[sv_module_name].append(c)
+                    cfgs_by_module[sv_module_name] = list(cfgs)
 
 
                     state.store[sv_module_name] = {}
@@ -383,190 +434,450 @@ class ExecutionEngine:
                 mapped_paths[module_name][curr_cfg] = cfg.paths
                 curr_cfg += 1
             curr_cfg = 0"""
+        if (self.plan or self.max_paths) and not self.plan_budget(manager, state, cfgs_by_module, always_blocks_by_name, cone_names, int(num_cycles)):
+            return
+
         for module_name, cfg_list in cfgs_by_module.items():
             for i, cfg in enumerate(cfg_list):
+                # CFGs are built without their paths, so the planner can run first
+                if not cfg.paths:
+                    cfg.enumerate_paths()
+                    if cfg.cache_key is not None:
+                        self.path_cache.store_cfg(cfg.cache_key, cfg.cached_form())
                 mapped_paths[module_name][i] = cfg.paths
+        if self.path_cache is not None:
+            self.path_cache.save()
 
 
         #stride_length = cfg_count
-        # Single-cycle path combination: Use generators (OOM fix - this is the main fix)
-        # Multi-cycle and cross-module: Reverted to list-based for explanation purposes
-        single_paths_by_module = {}
-        total_paths_by_module = {}
         for module_name in cfgs_by_module:
             print(f"Module {module_name} has {len(cfgs_by_module[module_name])} always blocks")
-            # Single-cycle path combination: Use generator (lazy evaluation - prevents OOM)
-            single_paths_by_module[module_name] = product(*mapped_paths[module_name].values())
-            # NOTE: This will consume the generator above, so we need to recreate it
-            total_paths_by_module[module_name] = list(tuple(product(product(*mapped_paths[module_name].values()), repeat=int(num_cycles))))
-        # {total_paths_by_module}")
-        #print(f"single paths by module: {total_paths_by_module}")
-        if not total_paths_by_module:
-            total_paths = []
+
+        # Multi-cycle, cross-module path combinations are enumerated lazily (OOM fix):
+        # total_paths[i] still gives "path i of N", but nothing is materialized up front.
+        total_paths = PathSource(mapped_paths, list(cfgs_by_module.keys()), int(num_cycles))
+        print(f"Total paths to explore: {total_paths.total}")
+
+        # with --decompose, always blocks that share no signals are explored as separate groups
+        sources = [total_paths]
+        if self.decompose and not self.forking and self.work_source is None:
+            groups = analyze_dependencies(manager, modules, always_blocks_by_name)
+            if len(groups) > 1:
+                sources = group_sources(groups, mapped_paths, list(cfgs_by_module.keys()), int(num_cycles))
+                print(f"Independent always-block groups: {len(groups)}, "
+                      f"{sum(src.total for src in sources)} paths instead of {total_paths.total}")
+
+        if self.forking:
+            # fork at every branch and keep only feasible successors instead of enumerating CFG paths
+            executor = ForkingExecutor(self, visitor, manager, state, modules_dict, cfgs_by_module, module, always_blocks_by_name)
+            if executor.run(int(num_cycles)):
+                return
+            print(f"Infeasible branches pruned: {executor.infeasible_branches}")
+        elif self.prefix_sharing:
+            # trie-shaped exploration: siblings resume from the shared cycle/always-block prefix
+            executor = PrefixSharingExecutor(self, visitor, manager, state, modules_dict, cfgs_by_module, module)
+            if self.memoize:
+                executor.memo = StateMemo(self.memo_size)
+            for source in sources:
+                if executor.run(source, self.shard):
+                    return
+                state.pc.reset()
+                for name in manager.names_list:
+                    state.store[name] = {}
+            print(f"Paths pruned with their prefix: {executor.pruned_paths}")
+            if executor.memo is not None:
+                executor.memo.report()
+                print(f"Paths reused from explored states: {executor.reused_paths}")
         else:
-            keys = list(total_paths_by_module.keys())
-            values = []
-            for key in keys:
-                module_paths = total_paths_by_module[key]
-                if not module_paths:
-                    module_paths = [tuple(() for _ in range(int(num_cycles)))]
-                values.append(module_paths)
-            #print(f"Module {key} paths: {module_paths}")
-            # build total_paths as a list of dicts where each dict picks one path (possibly multi-cycle)
-            # from each module. This takes the Cartesian product across modules, selecting a single
-            # path entry for every module in each combination.
-
-            total_paths = []
-            for path_combo in product(*values):
-                # ensure each module value is a list (so iteration like `for complete_single_cycle_path in curr_path[module_name]` works)
-                total_paths.append({k: list(p) for k, p in zip(keys, path_combo)})
-        
-        #single_paths = list(product(*mapped_paths[manager.curr_module].values()))
-        #total_paths = list(tuple(product(single_paths, repeat=int(num_cycles))))
-
-        # for each combinatoin of multicycle paths
-
-        #print(f"total_paths: {total_paths}")
-
-        for i in range(len(total_paths)):
-            manager.prev_store = state.store
-            init_state(state, manager.prev_store, module, visitor)
-            # initalize inputs with symbols for all submodules too
-            for module_name in manager.names_list:
-                manager.curr_module = module_name
-                # actually want to terminate this part after the decl and comb part
-                #compilation.getRoot().visit(my_visitor_for_symbol.visit)
-                # Clear visitor state before processing each module to avoid mixing variables
-                visitor.symbolic_store.clear() #TODO:clear is a waste
-                visitor.visited.clear()
-                visitor.dfs(modules_dict[module_name])
-                # Transfer discovered variables to state.store with fresh symbols
-                for var_name in visitor.symbolic_store:
-                    if var_name not in state.store[module_name]:
-                        state.store[module_name][var_name] = init_symbol()
-                #self.search_strategy.visit_module(manager, state, ast, modules_dict)
-                
-            """for cfg_idx in range(cfg_count):
-                for node in cfgs_by_module[manager.curr_module][cfg_idx].decls:
-                    visitor.dfs(node)
-                    #self.search_strategy.visit_stmt(manager, state, node, modules_dict, None)
-                for node in cfgs_by_module[manager.curr_module][cfg_idx].comb:
-                    visitor.dfs(node)
-                    #self.search_strategy.visit_stmt(manager, state, node, modules_dict, None) """
-            for c in cfgs_by_module[manager.curr_module]:
-                for node in c.decls:
-                    visitor.dfs(node)
-                for node in c.comb:
-                    visitor.dfs(node)
-
-   
-            manager.curr_module = manager.names_list[0]
-            # makes assumption top level module is first in line
-            # ! no longer path code as in bit string, but indices
-
-             
-            print(f"461 checking states Executing path {i+1} / {len(total_paths)}")
-            self.check_state(manager, state)
-
-            curr_path = total_paths[i]
-            modules_seen = 0
-            for module_name in curr_path:
-                manager.curr_module = manager.names_list[modules_seen]
-                manager.cycle = 0
-                for complete_single_cycle_path in curr_path[module_name]:
-                    #for cfg_path in complete_single_cycle_path:
-                    for cfg_idx, cfg_path in enumerate(complete_single_cycle_path):
-                        directions = cfgs_by_module[module_name][cfg_idx].compute_direction(cfg_path)
-                        if self.debug:
-                            print(f"DEBUG: cfg_path={cfg_path}, directions={directions}")
-                            print(f"DEBUG: basic_block_list has {len(cfgs_by_module[module_name][cfg_idx].basic_block_list)} blocks")
-                            #for bb_idx, bb in enumerate(cfgs_by_module[module_name][cfg_idx].basic_block_list):
-                                #print(f"DEBUG: basic_block[{bb_idx}] = {[str(s)[:50] if s else 'None' for s in bb]}")
-                        #directions = cfgs_by_module[module_name][complete_single_cycle_path.index(cfg_path)].compute_direction(cfg_path)
-                        k: int = 0
-                        for basic_block_idx in cfg_path:
-                            if basic_block_idx < 0: 
-                                print("Skipping dummy node in path")
-                                # dummy node
-                                continue
+            strategy = self.search_strategy if self.search_strategy is not None else SearchStrategy()
+            checkpoint, resume_from = self.open_checkpoint(manager, sources, strategy, int(num_cycles))
+            if resume_from is not None and (resume_from["violation"] is not None or resume_from["finished"]):
+                return
+            infeasible = resume_from["infeasible"] if resume_from is not None else 0
+            memo = None
+            reused_paths = 0
+            if self.memoize:
+                if type(strategy) in (SearchStrategy, DFSStrategy):
+                    memo = StateMemo(self.memo_size)
+                else:
+                    print(f"[Warning] state memoization needs product order, not --strategy {strategy.name}")
+            stop_requested = False
+            for k, source in enumerate(sources):
+                if stop_requested:
+                    break
+                if resume_from is not None and k < resume_from["source"]:
+                    # finished before the checkpoint
+                    continue
+                if self.work_source is not None:
+                    # leased from a coordinator, one prefix-aligned range at a time
+                    ranges = self.work_source.leases(manager, source)
+                elif self.shard is not None:
+                    ranges = [source.shard_range(*self.shard)]
+                    print(f"Exploring shard {self.shard[0]} of {self.shard[1]}: paths {ranges[0][0]} to {ranges[0][1]}")
+                else:
+                    ranges = [(0, source.total)]
+                strategy.prepare(source, cfgs_by_module)
+                done = 0
+                # paths of the first range a checkpoint says already ran; later ranges start at 0
+                resumed = 0
+                if memo is not None:
+                    memo_levels = {"levels": boundary_levels(source), "hit": None}
+                    subtree = [1] * len(source.radices)
+                    for level in range(len(source.radices) - 2, -1, -1):
+                        subtree[level] = subtree[level + 1] * source.radices[level + 1]
+                    skip_until = -1
+                if resume_from is not None and k == resume_from["source"]:
+                    strategy.restore(resume_from["strategy"])
+                    done = resumed = resume_from["done"]
+                for first, last in ranges:
+                    if stop_requested:
+                        break
+                    order = strategy.resume(source, first, last, resumed) if resumed else strategy.order(source, first, last)
+                    for i, path_index in enumerate(order, first + resumed):
+                        if memo is not None and path_index < skip_until:
+                            # same prefix as a path that reached an explored state
+                            reused = True
+                        else:
+                            curr_path = source[path_index]
+                            self.init_path_state(visitor, manager, state, modules_dict, cfgs_by_module, module)
+                            # makes assumption top level module is first in line
+                            # ! no longer path code as in bit string, but indices
+                            print(f"461 checking states Executing path {i+1} / {source.total}")
+                            self.check_state(manager, state)
+
+                            boundary = None
+                            if memo is not None:
+                                boundary = self.memo_boundary(memo, manager, state, source, k, path_index, memo_levels, subtree)
+                            reused = self.execute_path(visitor, manager, state, modules_dict, cfgs_by_module, curr_path, source.cfg_indices, boundary)
+                            if reused:
+                                # in product order the rest of this subtree follows, and it is explored already too
+                                level = memo_levels["hit"]
+                                skip_until = (path_index // subtree[level] + 1) * subtree[level]
                             else:
-                                direction = directions[k]
-                                k += 1
-                                basic_block = cfgs_by_module[module_name][cfg_idx].basic_block_list[basic_block_idx]
-                                print(f"visiting basic_block: {[str(s)[:50] if s else 'None' for s in basic_block]}")
-                                #basic_block = cfgs_by_module[module_name][complete_single_cycle_path.index(cfg_path)].basic_block_list[basic_block_idx]
-                                for stmt in basic_block:
-                                    # print(f"updating curr mod {manager.curr_module}")
-                                    #self.check_state(manager, state)
-                                    visitor.visit_stmt(manager, state, stmt, modules_dict, direction)
-                                    #self.search_strategy.visit_stmt(manager, state, stmt, modules_dict, direction)
-                    # only do once, and the last CFG 
-                    #for node in cfgs_by_module[module_name][complete_single_cycle_path.index(cfg_path)].comb:
-                        #self.search_strategy.visit_stmt(manager, state, node, modules_dict, None)  
-                    manager.cycle += 1
-                modules_seen += 1
-            manager.cycle = 0
-            self.done = True
-            print(f"494 checking path {i+1} / {len(total_paths)}")
-            self.check_state(manager, state)
-            self.done = False
-
-            manager.curr_level = 0
-            for module_name in manager.instances_seen:
-                manager.instances_seen[module_name] = 0
-                manager.instances_loc[module_name] = ""
-            if self.debug:
-                print("------------------------")
-            if (manager.assertion_violation):
-                print("Assertion violation")
-                # Print violated assertions info (constraints stored here since solver uses push/pop)
-                if hasattr(manager, 'violated_assertions') and manager.violated_assertions:
-                    print("Violated assertion details:")
-                    for va in manager.violated_assertions:
-                        print(f"  - condition: {va.get('condition', 'N/A')}")
-                        print(f"    z3_condition: {va.get('z3_condition', 'N/A')}")
-                        print(f"    path condition: {va.get('path condition', 'N/A')}")
-                        print(f"    kind: {va.get('kind', 'N/A')}")
-                #manager.assertion_violation = False
-                counterexample = {}
-                symbols_to_values = {}
-                solver_start = time.process_time()
-                if self.solve_pc(state.pc):
-                    solver_end = time.process_time()
-                    manager.solver_time += solver_end - solver_start
-                    solved_model = state.pc.model()
-                    decls =  solved_model.decls()
-                    for item in decls:
-                        symbols_to_values[item.name()] = solved_model[item]
-
-                    # plug in phase
-                    for module in state.store:
-                        for signal in state.store[module]:
-                            for symbol in symbols_to_values:
-                                if state.store[module][signal] == symbol:
-                                    counterexample[signal] = symbols_to_values[symbol]
-
-                    print(counterexample)
+                                self.done = True
+                                print(f"494 checking path {i+1} / {source.total}")
+                                self.check_state(manager, state)
+                                self.done = False
+
+                                if self.finish_path(manager, state):
+                                    if checkpoint is not None:
+                                        checkpoint.update(self.checkpoint_record(manager, k, done, strategy, infeasible, violation=True), force=True)
+                                    return
+                                strategy.record(manager, source, path_index)
+                                if manager.abandon:
+                                    infeasible += 1
+                        if reused:
+                            reused_paths += 1
+
+                        state.pc.reset()
+
+                        for module in manager.dependencies:
+                            module = {}
+
+                        manager.ignore = False
+                        manager.abandon = False
+                        manager.reg_writes.clear()
+                        for name in manager.names_list:
+                            state.store[name] = {}
+                        manager.path_count += 1
+                        done += 1
+                        if checkpoint is not None:
+                            checkpoint.update(partial(self.checkpoint_record, manager, k, done, strategy, infeasible))
+                        if self.progress_callback is not None and self.progress_callback(manager):
+                            stop_requested = True
+                            break
+                        if self.path_limit is not None and manager.path_count >= self.path_limit:
+                            print(f"Sample of {self.path_limit} paths done")
+                            stop_requested = True
+                            break
+                    resumed = 0
+            if checkpoint is not None:
+                if stop_requested:
+                    # the last per-path record is where a resumed run picks up
+                    checkpoint.save()
                 else:
-                    print("UNSAT")
-                return
-            
-            state.pc.reset()
-
-            for module in manager.dependencies:
-                module = {}
-                
-            
-            manager.ignore = False
-            manager.abandon = False
-            manager.reg_writes.clear()
-            for name in manager.names_list:
-                state.store[name] = {}
-            manager.path_count += 1
+                    checkpoint.update(self.checkpoint_record(manager, len(sources), 0, strategy, infeasible, finished=True), force=True)
+                print(f"Checkpoint saved to {checkpoint.path}")
+            if infeasible:
+                print(f"Infeasible paths: {infeasible}")
+            if memo is not None:
+                memo.report()
+                print(f"Paths reused from explored states: {reused_paths}")
         print(f"Branch points explored: {manager.branch_count}")
         print(f"Paths explored: {manager.path_count}")
         self.module_depth -= 1
 
+    def open_checkpoint(self, manager: ExecutionManager, sources, strategy: SearchStrategy, num_cycles: int):
+        """(Checkpoint, saved progress) for the serial loop. The progress is only loaded with
+        resume set; counters are restored from it, and a finished run is reported again."""
+        if self.checkpoint_path is None or self.work_source is not None:
+            return None, None
+        path = self.checkpoint_path if self.shard is None else f"{self.checkpoint_path}.{self.shard[0]}"
+        checkpoint = Checkpoint(path, self.checkpoint_interval)
+        self.checkpointer = checkpoint
+        self.checkpoint_fingerprint = {
+            "num_cycles": num_cycles,
+            "strategy": strategy.name,
+            "shard": list(self.shard) if self.shard is not None else None,
+            "radices": [list(source.radices) for source in sources],
+        }
+        if not self.resume:
+            return checkpoint, None
+        saved = checkpoint.load(self.checkpoint_fingerprint)
+        if saved is None:
+            return checkpoint, None
+        manager.path_count = saved["paths"]
+        manager.branch_count = saved["branches"]
+        manager.solver_time = saved["solver_time"]
+        if saved["violation"] is not None:
+            print("Checkpoint holds an assertion violation found earlier:")
+            print_summary({0: saved["violation"]})
+        elif saved["finished"]:
+            print("Checkpoint says the exploration already finished")
+            print(f"Branch points explored: {manager.branch_count}")
+            print(f"Paths explored: {manager.path_count}")
+        return checkpoint, saved
+
+    def checkpoint_record(self, manager: ExecutionManager, source: int, done: int, strategy: SearchStrategy, infeasible: int,
+                          violation: bool = False, finished: bool = False) -> dict:
+        """Progress after `done` ranks of PathSource number `source` have run."""
+        return {
+            "version": CHECKPOINT_VERSION,
+            "fingerprint": self.checkpoint_fingerprint,
+            "source": source,
+            "done": done,
+            "strategy": strategy.state(),
+            "paths": manager.path_count,
+            "branches": manager.branch_count,
+            "solver_time": manager.solver_time,
+            "infeasible": infeasible,
+            "violation": shard_summary(manager) if violation else None,
+            "finished": finished,
+        }
+
+    def build_block_cfg(self, manager: ExecutionManager, state: SymbolicState, module_name: str, ab, cone_name: Optional[str] = None) -> CFG:
+        """Build the CFG of one always block, merging mux-style if/else statements when enabled.
+        With slicing, statements outside the cone of `cone_name` (default: module_name) are left out.
+        cone_name is also the module whose parameters bound the loops that are unrolled.
+        With semantic_cfg, ab is a ProceduralBlockSymbol and neither merging nor slicing applies."""
+        ab_body = getattr(ab, "statement", getattr(ab, "members", ab))
+        c = CFG()
+        c.semantic = self.semantic_cfg
+        c.split_ternaries = self.ternary_mode == "split"
+        c.module_name = module_name
+        if self.unroll_limit:
+            c.unroll_limit = self.unroll_limit
+            c.params = (self.loop_params or {}).get(cone_name or module_name, {})
+            c.loops = (self.loop_statements or {}).get(cone_name or module_name, {})
+        if self.cone is not None:
+            c.keep = self.cone.keep(cone_name or module_name)
+        if self.merge:
+            c.merge = count_block_paths(ab_body) > self.merge_paths
+            c.merge_size = self.merge_size
+        if c.semantic:
+            c.merge = False
+            c.basic_blocks_semantic(manager, state, ab.body)
+        else:
+            c.basic_blocks_sv(manager, state, ab_body)
+        c.partition()
+        if self.path_cache is not None:
+            layout = (c.merge, c.merge_size, c.unroll_limit, cone_name or module_name if self.cone is not None else None,
+                      c.semantic, c.split_ternaries)
+            c.cache_key = block_key(str(getattr(ab, "syntax", ab) if c.semantic else ab), c.params, layout)
+            entry = self.path_cache.cfg(c.cache_key)
+            if entry is not None and c.restore(entry):
+                return c
+        c.build_cfg(manager, state, enumerate_paths=False)
+        return c
+
+    def definition_cfgs(self, manager: ExecutionManager, state: SymbolicState, module, name: str):
+        """(always blocks, CFGs) of a module instance, built once per definition and parameter values.
+        CFGs only hold syntax and block indices, so instances can share them; the instance a
+        path runs in is bound at execution time (manager.curr_module)."""
+        definition = getattr(module, "definition", None)
+        params = self.loop_params.get(name, {})
+        key = (getattr(definition, "name", None) or name, tuple(sorted(params.items())),
+               name if self.cone is not None else None)
+        cached = self.cfg_cache.get(key)
+        if cached is not None:
+            print(f"Reusing the CFGs of {key[0]} for {name}")
+            return cached
+        probe = CFG()
+        probe.semantic = self.semantic_cfg
+        probe.get_always_sv(manager, state, module)
+        if self.cone is not None:
+            probe.always_blocks = slice_always_blocks(manager, self.cone, name, probe.always_blocks)
+        cfgs = [self.build_block_cfg(manager, state, name, ab) for ab in probe.always_blocks]
+        self.cfg_cache[key] = (probe.always_blocks, cfgs)
+        return self.cfg_cache[key]
+
+    def plan_budget(self, manager: ExecutionManager, state: SymbolicState, cfgs_by_module, always_blocks_by_name, cone_names, num_cycles: int) -> bool:
+        """Count paths analytically and report them (--plan), then enforce max_paths.
+        Returns False when exploration should not start."""
+        plan = PathPlan(cfgs_by_module, num_cycles)
+        plan.report()
+        if self.plan:
+            return False
+        if not self.max_paths or plan.total <= self.max_paths:
+            return True
+        print(f"Total paths {format_count(plan.total)} exceed the budget of {self.max_paths}")
+        if self.over_budget == "merge" and not self.merge:
+            print("Rebuilding the CFGs with state merging")
+            self.merge = True
+            # instances sharing a definition share their always-block list, and so their rebuilt CFGs
+            rebuilt = {}
+            for name, blocks in always_blocks_by_name.items():
+                if id(blocks) not in rebuilt:
+                    rebuilt[id(blocks)] = [self.build_block_cfg(manager, state, name, ab, cone_names.get(name)) for ab in blocks]
+                cfgs_by_module[name] = list(rebuilt[id(blocks)])
+            plan = PathPlan(cfgs_by_module, num_cycles)
+            plan.report()
+            if plan.total <= self.max_paths:
+                return True
+        elif self.over_budget == "sample" and not (self.forking or self.prefix_sharing):
+            # --jobs workers split the sample between them
+            self.path_limit = -(-self.max_paths // self.shard[1]) if self.shard is not None else self.max_paths
+            if self.search_strategy is None:
+                self.search_strategy = RandomStrategy(self.seed)
+            print(f"Exploring a sample of {self.max_paths} paths")
+            return True
+        print("Refusing to start, the design is over the path budget")
+        return False
+
+    def init_path_state(self, visitor, manager: ExecutionManager, state: SymbolicState, modules_dict, cfgs_by_module, module) -> None:
+        """Give every module fresh input symbols and run the decl/comb nodes before a path is executed."""
+        manager.prev_store = state.store
+        init_state(state, manager.prev_store, module, visitor)
+        # initalize inputs with symbols for all submodules too
+        for module_name in manager.names_list:
+            manager.curr_module = module_name
+            if module_name not in manager.signals:
+                # discover the instance's variables once, on the first path
+                visitor.symbolic_store.clear()
+                visitor.visited.clear()
+                visitor.dfs(modules_dict[module_name])
+                manager.signals.add_instance(module_name, visitor.symbolic_store, signal_width)
+            # fresh terms of their declared widths, parameters as their values
+            store = state.store[module_name]
+            for var_name, symbol in manager.signals.signals(module_name):
+                if var_name not in store:
+                    store[var_name] = initial_term(manager, symbol)
+
+        for c in cfgs_by_module[manager.curr_module]:
+            for node in c.decls:
+                visitor.dfs(node)
+            for node in c.comb:
+                visitor.dfs(node)
+        manager.curr_module = manager.names_list[0]
+
+    def execute_cfg_path(self, visitor, manager: ExecutionManager, state: SymbolicState, modules_dict, cfg: CFG, cfg_path) -> None:
+        """Visit the basic blocks of a single always block along one CFG path."""
+        directions = cfg.compute_direction(cfg_path)
+        if self.debug:
+            print(f"DEBUG: cfg_path={cfg_path}, directions={directions}")
+            print(f"DEBUG: basic_block_list has {len(cfg.basic_block_list)} blocks")
+        k: int = 0
+        for basic_block_idx in cfg_path:
+            if basic_block_idx < 0:
+                print("Skipping dummy node in path")
+                # dummy node
+                continue
+            direction = directions[k]
+            k += 1
+            basic_block = cfg.basic_block_list[basic_block_idx]
+            print(f"visiting basic_block: {[str(s)[:50] if s else 'None' for s in basic_block]}")
+            for stmt in basic_block:
+                if isinstance(stmt, MergedConditional):
+                    merge_conditional(visitor, manager, state, modules_dict, stmt.stmt)
+                elif isinstance(stmt, (LoopBinding, LoopSummary)):
+                    run_loop_node(manager, state, stmt)
+                elif isinstance(stmt, (TernaryBranch, TernaryArm)):
+                    run_ternary_node(visitor, manager, state, stmt, direction)
+                else:
+                    visitor.visit_stmt(manager, state, stmt, modules_dict, direction)
+
+    def execute_path(self, visitor, manager: ExecutionManager, state: SymbolicState, modules_dict, cfgs_by_module, curr_path, cfg_indices=None, boundary=None) -> bool:
+        """Execute one multi-cycle path combination ({module: [cycle paths]}) from PathSource.
+        cfg_indices maps a position in a cycle's tuple to the always block it belongs to, for
+        PathSources that only cover some of a module's always blocks (--decompose).
+        boundary(level) is called at the end of every cycle with the PathSource position just
+        run; if it returns True the rest of the path is skipped and True is returned."""
+        level = -1
+        for module_name in curr_path:
+            manager.curr_module = module_name
+            manager.cycle = 0
+            for complete_single_cycle_path in curr_path[module_name]:
+                for k, cfg_path in enumerate(complete_single_cycle_path):
+                    cfg_idx = cfg_indices[module_name][k] if cfg_indices is not None else k
+                    self.execute_cfg_path(visitor, manager, state, modules_dict, cfgs_by_module[module_name][cfg_idx], cfg_path)
+                manager.cycle += 1
+                level += len(complete_single_cycle_path)
+                if boundary is not None and boundary(level):
+                    manager.cycle = 0
+                    return True
+        manager.cycle = 0
+        return False
+
+    def memo_boundary(self, memo: StateMemo, manager: ExecutionManager, state: SymbolicState, source: PathSource, source_idx: int,
+                      path_index: int, memo_levels: dict, subtree) -> callable:
+        """Boundary callback for execute_path: stops the path once it reaches a state that a
+        path from another subtree already reached at the same position."""
+        def boundary(level: int) -> bool:
+            if level not in memo_levels["levels"] or manager.abandon or manager.ignore or manager.assertion_violation:
+                return False
+            owner = path_index // subtree[level]
+            if memo.seen((source_idx, level), state_digest(state, manager), owner):
+                memo_levels["hit"] = level
+                return True
+            return False
+        return boundary
+
+    def finish_path(self, manager: ExecutionManager, state: SymbolicState) -> bool:
+        """Bookkeeping at the end of a path. Reports the counterexample and returns True
+        when an assertion was violated, which ends the exploration."""
+        manager.curr_level = 0
+        for module_name in manager.instances_seen:
+            manager.instances_seen[module_name] = 0
+            manager.instances_loc[module_name] = ""
+        if self.debug:
+            print("------------------------")
+        if not manager.assertion_violation:
+            return False
+        print("Assertion violation")
+        # Print violated assertions info (constraints stored here since solver uses push/pop)
+        if hasattr(manager, 'violated_assertions') and manager.violated_assertions:
+            print("Violated assertion details:")
+            for va in manager.violated_assertions:
+                print(f"  - condition: {va.get('condition', 'N/A')}")
+                print(f"    z3_condition: {va.get('z3_condition', 'N/A')}")
+                print(f"    path condition: {va.get('path condition', 'N/A')}")
+                print(f"    kind: {va.get('kind', 'N/A')}")
+        #manager.assertion_violation = False
+        counterexample = {}
+        symbols_to_values = {}
+        solver_start = time.process_time()
+        if self.solve_pc(state.pc):
+            solver_end = time.process_time()
+            manager.solver_time += solver_end - solver_start
+            solved_model = state.pc.model()
+            decls =  solved_model.decls()
+            for item in decls:
+                symbols_to_values[item.name()] = solved_model[item]
+
+            # plug in phase
+            for module, signals in state.store.items():
+                for signal, term in signals.items():
+                    # a signal still holding a free variable takes the model's value for it
+                    value = str(term)
+                    if value in symbols_to_values:
+                        counterexample[signal] = symbols_to_values[value]
+
+            print(counterexample)
+            manager.counterexample = counterexample
+        else:
+            print("UNSAT")
+        return True
+
     def check_state(self, manager, state):
         """Checks the status of the execution and displays the state."""
         if self.done and manager.debug and not manager.is_child and not manager.init_run_flag and not manager.ignore and not manager.abandon:
@@ -4,7 +4,8 @@ a lot of this information will probably be useful when working in a specific sea
 
 from __future__ import annotations
 from .symbolic_state import SymbolicState
-from helpers.utils import init_symbol
+from .signal_table import SignalTable
+from helpers.utils import symbol_name
 from typing import Optional
 # import pkg_resources
 import pyslang as ps
@@ -23,73 +24,84 @@ CONDITIONALS = (
 class ExecutionManager:
     """The ExecutionManager class is responsible for managing the execution of the symbolic execution engine.
     It is responsible for counting the number of paths, merging states, and other bookkeeping tasks."""
-    num_paths: int = 1
-    curr_level: int = 0
-    path_code: str = "0" * 12
-    ast_str: str = ""
-    abandon: bool = False
-    assertion_violation: bool = False
-    in_always: bool = False
-    modules = {}
-    dependencies = {}
-    intermodule_dependencies = {}
-    updates = {}
-    seen = {}
-    final = False
-    completed = []
-    is_child: bool = False
-    # Map of module name to path nums for child module
-    child_num_paths = {}    
-    # Map of module name to path code for child module
-    child_path_codes = {}
-    paths = []
-    config = {}
-    names_list = []
-    instance_count = {}
-    seen_mod = {}
-    opt_1: bool = False
-    curr_module: str = ""
-    piece_wise: bool = False
-    child_range: range = None
-    always_writes = {}
-    curr_always = None
-    opt_2: bool = True
-    opt_3: bool = False
-    assertions = []
-    blocks_of_interest = []
-    init_run_flag: bool = False
-    ignore = False
-    branch: bool = False
-    cond_assigns = {}
-    cond_updates = []
-    reg_writes = set()
-    path = []
-    cycle = 0
-    prev_store = {}
-    reg_decls = set()
-    reg_widths = {}
-    curr_case = None
-    debug: bool = False
-    initial_store = {}
-    instances_seen = {}
-    instances_loc = {}
-    solver_time = 0
-    sv = False
-    cache = None
-    path_count = 0
-    branch_count = 0
+    def __init__(self):
+        self.num_paths: int = 1
+        self.curr_level: int = 0
+        self.path_code: str = "0" * 12
+        self.ast_str: str = ""
+        self.abandon: bool = False
+        self.assertion_violation: bool = False
+        self.in_always: bool = False
+        self.modules = {}
+        self.dependencies = {}
+        self.intermodule_dependencies = {}
+        self.updates = {}
+        self.seen = {}
+        self.final = False
+        self.completed = []
+        self.is_child: bool = False
+        # Map of module name to path nums for child module
+        self.child_num_paths = {}
+        # Map of module name to path code for child module
+        self.child_path_codes = {}
+        self.paths = []
+        self.config = {}
+        self.names_list = []
+        self.instance_count = {}
+        self.seen_mod = {}
+        self.opt_1: bool = False
+        self.curr_module: str = ""
+        self.piece_wise: bool = False
+        self.child_range: range = None
+        self.always_writes = {}
+        self.curr_always = None
+        self.opt_2: bool = True
+        self.opt_3: bool = False
+        self.assertions = []
+        self.blocks_of_interest = []
+        self.init_run_flag: bool = False
+        self.ignore = False
+        self.branch: bool = False
+        self.cond_assigns = {}
+        self.cond_updates = []
+        self.reg_writes = set()
+        self.path = []
+        self.cycle = 0
+        self.prev_store = {}
+        self.reg_decls = set()
+        self.reg_widths = {}
+        self.signals = SignalTable() # ids, declared widths and symbols of every (instance, signal), filled on the first path
+        self.curr_case = None
+        self.debug: bool = False
+        self.initial_store = {}
+        self.instances_seen = {}
+        self.instances_loc = {}
+        self.solver_time = 0
+        self.sv = False
+        self.cache = None
+        self.path_count = 0
+        self.branch_count = 0
+        self.symbol_counts = {} # symbol_name() -> fresh symbols minted under it, for the #k suffix of the later ones
+
+    def symbol_name(self, signal: str, module: str = None) -> str:
+        """Deterministic name of a fresh symbol for a signal of the current (or given) instance
+        in the current cycle. The k-th symbol minted under the same name gets a #k suffix."""
+        name = symbol_name(module or self.curr_module, signal, self.cycle)
+        count = self.symbol_counts.get(name, 0)
+        self.symbol_counts[name] = count + 1
+        return f"{name}#{count}" if count else name
 
     def merge_states(self, state: SymbolicState, store, flag, module_name=""):
         """Merges two states. The flag is for when we are just merging a particular module"""
+        # imported here: helpers.rvalue_to_z3 imports this module
+        from helpers.rvalue_to_z3 import same_term
         for key, val in state.store.items():
             if type(val) != dict:
                 continue
             else:
                 for key2, var in val.items():
-                    if var in store.values() and (key2 in self.reg_decls or key2.startswith("clk") or key2.startswith("rst")):
-                        prev_symbol = state.store[key][key2]
-                        new_symbol = store[key][key2]
-                        state.store[key][key2].replace(prev_symbol, new_symbol)
+                    if any(same_term(var, value) for value in store.values()) and (key2 in self.reg_decls or key2.startswith("clk") or key2.startswith("rst")):
+                        continue
                     else:
                         if flag:
                             state.store[module_name][key2] = store[key][key2]
@@ -116,9 +128,7 @@ class ExecutionManager:
 
         if module_body is not None:
             self.count_conditionals(m, module_body)
-        # these are for the COI opt
-        #self.lhs_signals(m, module.members)
-        #self.get_assertions(m, module.members)
+        # the COI opt (assertions, blocks_of_interest) is done by engine/slicing.py with --slice
         m.init_run_flag = False
 
     def count_conditionals(self, m: "ExecutionManager", items):
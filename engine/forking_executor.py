@@ -0,0 +1,192 @@
+"""Forking symbolic execution, an alternative to up-front CFG path enumeration.
+
+`CFG.build_cfg` enumerates every syntactic path with `nx.all_simple_paths`, and infeasible
+ones are only discovered while they are being visited. The ForkingExecutor walks the always
+block statements directly instead. At each if/else and case statement it checks every
+direction against the live path condition and keeps only the feasible successors on a
+worklist, so the work scales with feasible paths instead of syntactic ones. This matters on
+deep if/else chains such as the or1200 decoder."""
+
+from __future__ import annotations
+import time
+import pyslang as ps
+from z3 import And, Not, Or
+from .execution_manager import ExecutionManager
+from .symbolic_state import SymbolicState
+from helpers.slang_helpers import get_cond_expr, get_branches, is_default_case_item, case_arms, case_qualifier
+from helpers.rvalue_to_z3 import z3_to_bool, case_match
+
+
+class ForkState:
+    """One pending successor on the worklist."""
+    __slots__ = ("store", "constraints", "cont", "block")
+
+    def __init__(self, store, constraints, cont, block):
+        # symbolic store of this successor
+        self.store = store
+        # path condition as a tuple of Z3 Bools, shared with the parent as a prefix
+        self.constraints = constraints
+        # statements still to run in the current always block, as a (stmt, rest) cons list
+        self.cont = cont
+        # index into the (module, cycle, always block) schedule
+        self.block = block
+
+
+class ForkingExecutor:
+    """Explores the design by forking the SymbolicState at branch statements."""
+
+    def __init__(self, engine, visitor, manager: ExecutionManager, state: SymbolicState, modules_dict, cfgs_by_module, module, always_blocks_by_name):
+        self.engine = engine
+        self.visitor = visitor
+        self.manager = manager
+        self.state = state
+        self.modules_dict = modules_dict
+        self.cfgs_by_module = cfgs_by_module
+        self.module = module
+        self.always_blocks_by_name = always_blocks_by_name
+        self.schedule = []
+        # branch directions dropped because they contradict the path condition
+        self.infeasible_branches = 0
+
+    def build_schedule(self, num_cycles: int) -> None:
+        """Same order the CFG executors use: module-major, then cycle, then always block."""
+        self.schedule = []
+        for module_name in self.manager.names_list:
+            blocks = self.always_blocks_by_name.get(module_name, [])
+            for cycle in range(num_cycles):
+                for ab in blocks:
+                    body = getattr(ab, "statement", getattr(ab, "members", ab))
+                    self.schedule.append((module_name, cycle, body))
+
+    def copy_store(self):
+        return self.state.store.fork()
+
+    def load(self, item: ForkState) -> None:
+        """Make the worklist item the live state."""
+        self.state.store = item.store
+        self.state.pc.reset()
+        for c in item.constraints:
+            self.state.pc.add(c)
+        self.manager.abandon = False
+        self.manager.ignore = False
+
+    def feasible(self, guard) -> bool:
+        """Check a branch guard against the live path condition."""
+        solver_start = time.process_time()
+        self.state.pc.push()
+        self.state.pc.add(guard)
+        result = str(self.state.pc.check()) == "sat"
+        self.state.pc.pop()
+        self.manager.solver_time += time.process_time() - solver_start
+        return result
+
+    def fork(self, item: ForkState, guarded_bodies):
+        """Build one successor per feasible (guard, body) pair. A None guard is unconstrained."""
+        successors = []
+        for guard, body in guarded_bodies:
+            if guard is not None and not self.feasible(guard):
+                self.infeasible_branches += 1
+                continue
+            cont = (body, item.cont) if body is not None else item.cont
+            constraints = item.constraints + (guard,) if guard is not None else item.constraints
+            successors.append(ForkState(self.copy_store(), constraints, cont, item.block))
+        return successors
+
+    def fork_conditional(self, item: ForkState, stmt):
+        m, s = self.manager, self.state
+        m.branch_count += 1
+        then_body, else_body = get_branches(stmt)
+        cond_expr = get_cond_expr(stmt)
+        if cond_expr is None:
+            return self.fork(item, [(None, then_body), (None, else_body)])
+        self.visitor.visit_expr(m, s, cond_expr)
+        cond = z3_to_bool(self.visitor.expr_to_z3(m, s, cond_expr))
+        return self.fork(item, [(cond, then_body), (Not(cond), else_body)])
+
+    def fork_case(self, item: ForkState, stmt):
+        """One successor per case arm (see case_arms): first match wins, except that the items
+        of a unique case do not overlap; then default or no-match."""
+        m, s = self.manager, self.state
+        m.branch_count += 1
+        self.visitor.visit_expr(m, s, stmt.expr)
+        selector = self.visitor.expr_to_z3(m, s, stmt.expr)
+        unique = case_qualifier(stmt) in ("unique", "unique0")
+        guarded_bodies = []
+        earlier = []
+        for case_item, body in case_arms(stmt):
+            if case_item is None or is_default_case_item(case_item):
+                guarded_bodies.append((Not(Or(*earlier)) if earlier else None, body))
+                continue
+            matches = []
+            for e in case_item.expressions:
+                self.visitor.visit_expr(m, s, e)
+                matches.append(case_match(selector, self.visitor.expr_to_z3(m, s, e)))
+            guard = Or(*matches) if len(matches) > 1 else matches[0]
+            if earlier and not unique:
+                guard = And(guard, Not(Or(*earlier)))
+            earlier += matches
+            guarded_bodies.append((guard, body))
+        return self.fork(item, guarded_bodies)
+
+    def finish_leaf(self) -> bool:
+        m = self.manager
+        m.cycle = 0
+        self.engine.done = True
+        print(f"checking path {m.path_count + 1}")
+        self.engine.check_state(m, self.state)
+        self.engine.done = False
+        if self.engine.finish_path(m, self.state):
+            return True
+        m.path_count += 1
+        return False
+
+    def step(self, item: ForkState, worklist) -> bool:
+        """Run one item until it completes, forks or turns infeasible.
+        Returns True when an assertion violation stops exploration."""
+        m, s = self.manager, self.state
+        while True:
+            while item.cont is None:
+                item.block += 1
+                if item.block >= len(self.schedule):
+                    return self.finish_leaf()
+                item.cont = (self.schedule[item.block][2], None)
+            m.curr_module, m.cycle, _ = self.schedule[item.block]
+
+            stmt, item.cont = item.cont
+            if stmt is None:
+                continue
+            if isinstance(stmt, ps.BlockStatementSyntax):
+                for sub in reversed(list(stmt.items)):
+                    item.cont = (sub, item.cont)
+            elif stmt.__class__.__name__ in ("TimingControlStatementSyntax", "ProceduralBlockSyntax"):
+                item.cont = (getattr(stmt, "statement", None), item.cont)
+            elif isinstance(stmt, ps.ConditionalStatementSyntax):
+                worklist.extend(reversed(self.fork_conditional(item, stmt)))
+                return False
+            elif isinstance(stmt, ps.CaseStatementSyntax):
+                worklist.extend(reversed(self.fork_case(item, stmt)))
+                return False
+            elif hasattr(stmt, "__iter__") and not isinstance(stmt, ps.StatementSyntax):
+                for sub in reversed(list(stmt)):
+                    item.cont = (sub, item.cont)
+            else:
+                self.visitor.visit_stmt(m, s, stmt, self.modules_dict, None)
+                if m.abandon:
+                    self.infeasible_branches += 1
+                    return False
+
+    def run(self, num_cycles: int) -> bool:
+        """Explore every feasible path. Returns True if an assertion violation was reported."""
+        m = self.manager
+        self.engine.init_path_state(self.visitor, m, self.state, self.modules_dict, self.cfgs_by_module, self.module)
+        self.engine.check_state(m, self.state)
+        self.build_schedule(num_cycles)
+
+        # LIFO worklist: depth-first, so only one branch's worth of siblings is pending at a time
+        worklist = [ForkState(self.copy_store(), (), None, -1)]
+        while worklist:
+            item = worklist.pop()
+            self.load(item)
+            if self.step(item, worklist):
+                return True
+        return False
@@ -0,0 +1,292 @@
+"""Unrolling of for-loops with elaboration-time bounds in the CFG builder.
+
+`CFG.basic_blocks_sv` used to keep a `for` loop as one node followed by its body, so the
+body ran exactly once, whatever the bounds. Designs like `sha512_w_mem.v` and the chacha
+cores in `designs/TrustHub` loop over constant ranges instead. Here pyslang evaluates the
+elaborated ForLoopStatement of the instance: its initializer, stop expression and steps
+run in an EvalContext where the loop variable is a local, so parameters, `$clog2` and every
+other constant function resolve as the compiler resolves them. The body is then laid out
+once per iteration. Each copy is preceded by a LoopBinding node that sets the loop variable to the
+iteration's value, so the body's statements (branches included) build the CFG exactly as
+if the loop had been written out.
+
+A loop with more than `unroll_limit` iterations becomes a LoopSummary node instead. It
+gives every signal the body writes (and the loop variable) a fresh symbol, a sound
+over-approximation of whatever the loop computes. Assertions inside a summarized loop are
+not checked. Loops whose bounds cannot be evaluated keep the old behaviour.
+
+A loop without an elaborated statement (a CFG built from a definition's syntax alone)
+falls back to `const_eval`, a small evaluator of the loop header's text over the
+instance's parameter values.
+
+Unrolling is opt-in (`--unroll_limit N`); with the default of 0 every loop keeps the single
+pass it always had."""
+
+import ast
+import re
+from typing import Dict, Optional
+
+import pyslang as ps
+from z3 import BitVecVal
+
+from .dependencies import block_writes
+from helpers.rvalue_to_z3 import fresh_term
+
+# sized or unsized based literals: 8'hFF, 'd10, 4'sb1010
+BASED_LITERAL = re.compile(r"(\d[\d_]*)?\s*'[sS]?([bBoOdDhH])\s*([0-9a-fA-F_]+)")
+BASES = {"b": 2, "o": 8, "d": 10, "h": 16}
+TYPE_KEYWORDS = r"(?:(?:automatic|static|const|var|int|integer|genvar|logic|reg|bit|byte|shortint|longint|unsigned|signed)\s+)*"
+INIT = re.compile(r"^\s*" + TYPE_KEYWORDS + r"([A-Za-z_]\w*)\s*=\s*(.+?)\s*$", re.S)
+STEP_ASSIGN = re.compile(r"^\s*([A-Za-z_]\w*)\s*(\+|-|\*|<<|>>)?=\s*(.+?)\s*$", re.S)
+STEP_INCR = re.compile(r"^\s*(?:(\+\+|--)\s*([A-Za-z_]\w*)|([A-Za-z_]\w*)\s*(\+\+|--))\s*$")
+
+
+class LoopBinding:
+    """CFG node that sets a loop variable to a constant before an unrolled iteration."""
+    __slots__ = ("var", "value")
+
+    def __init__(self, var: str, value: int):
+        self.var = var
+        self.value = value
+
+    def __str__(self):
+        return f"{self.var} = {self.value}"
+
+
+class LoopSummary:
+    """CFG node standing in for a loop over the unroll limit: havocs what the loop writes."""
+    __slots__ = ("stmt", "var")
+
+    def __init__(self, stmt, var: Optional[str]):
+        self.stmt = stmt
+        self.var = var
+
+    def __str__(self):
+        return f"summary of {self.stmt}"
+
+
+def to_python(text: str) -> str:
+    """Rewrite a Verilog constant expression into Python syntax."""
+    text = BASED_LITERAL.sub(lambda m: str(int(m.group(3).replace("_", ""), BASES[m.group(2).lower()])), text)
+    text = re.sub(r"(?<=\d)_(?=\d)", "", text)
+    text = text.replace("&&", " and ").replace("||", " or ")
+    text = re.sub(r"!(?!=)", " not ", text)
+    text = text.replace("$clog2", "clog2")
+    return text
+
+
+def clog2(n: int) -> int:
+    return max(n - 1, 0).bit_length()
+
+
+def evaluate(node, env: Dict[str, int]) -> int:
+    if isinstance(node, ast.Expression):
+        return evaluate(node.body, env)
+    if isinstance(node, ast.Constant) and isinstance(node.value, int):
+        return node.value
+    if isinstance(node, ast.Name):
+        return env[node.id]
+    if isinstance(node, ast.UnaryOp):
+        operand = evaluate(node.operand, env)
+        if isinstance(node.op, ast.USub):
+            return -operand
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        if isinstance(node.op, ast.Invert):
+            return ~operand
+        if isinstance(node.op, ast.Not):
+            return int(not operand)
+    if isinstance(node, ast.BinOp):
+        a, b = evaluate(node.left, env), evaluate(node.right, env)
+        op = node.op
+        if isinstance(op, (ast.Div, ast.FloorDiv, ast.Mod)) and b == 0:
+            raise ValueError("division by zero")
+        if isinstance(op, (ast.Div, ast.FloorDiv, ast.Mod)):
+            # Verilog truncates towards zero
+            q = abs(a) // abs(b)
+            q = q if (a >= 0) == (b >= 0) else -q
+            return a - b * q if isinstance(op, ast.Mod) else q
+        ops = {ast.Add: lambda: a + b, ast.Sub: lambda: a - b, ast.Mult: lambda: a * b,
+               ast.LShift: lambda: a << b, ast.RShift: lambda: a >> b,
+               ast.BitAnd: lambda: a & b, ast.BitOr: lambda: a | b, ast.BitXor: lambda: a ^ b,
+               ast.Pow: lambda: a ** b}
+        if type(op) in ops:
+            return ops[type(op)]()
+    if isinstance(node, ast.BoolOp):
+        values = [evaluate(v, env) for v in node.values]
+        return int(all(values)) if isinstance(node.op, ast.And) else int(any(values))
+    if isinstance(node, ast.Compare):
+        left = evaluate(node.left, env)
+        for op, right_node in zip(node.ops, node.comparators):
+            right = evaluate(right_node, env)
+            ok = {ast.Lt: left < right, ast.LtE: left <= right, ast.Gt: left > right, ast.GtE: left >= right,
+                  ast.Eq: left == right, ast.NotEq: left != right}.get(type(op))
+            if not ok:
+                return 0
+            left = right
+        return 1
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "clog2" and len(node.args) == 1:
+        return clog2(evaluate(node.args[0], env))
+    raise ValueError(f"not a constant expression: {ast.dump(node)}")
+
+
+def const_eval(text, env: Dict[str, int]) -> Optional[int]:
+    """Value of a Verilog constant expression over env, or None if it is not one."""
+    if text is None:
+        return None
+    try:
+        return evaluate(ast.parse(to_python(str(text)).strip(), mode="eval"), env)
+    except (SyntaxError, ValueError, KeyError, TypeError, RecursionError, OverflowError):
+        return None
+
+
+def constant_int(value) -> Optional[int]:
+    """Integer held by a pyslang ConstantValue, None for anything else (reals, strings of
+    unknown width, values with X or Z bits)."""
+    if value is None or not isinstance(value.value, ps.SVInt) or value.hasUnknown():
+        return None
+    return int(value.value)
+
+
+def parameter_values(module) -> Dict[str, int]:
+    """Integer parameters and localparams of an instance, by name."""
+    params = {}
+    for item in getattr(module, "body", None) or []:
+        if item.__class__.__name__ != "ParameterSymbol":
+            continue
+        value = constant_int(item.value)
+        if value is not None:
+            params[item.name] = value
+    return params
+
+
+def elaborated_loops(module) -> Dict[object, tuple]:
+    """Syntax node -> (elaborated ForLoopStatement, scope) of every for-loop in the always
+    blocks of an instance and of the instances nested in it, as CFG.get_always_sv collects them."""
+    loops = {}
+
+    def collect(stmt):
+        if getattr(stmt, "kind", None) == ps.StatementKind.ForLoop and stmt.syntax is not None:
+            loops[stmt.syntax] = (stmt, scope)
+        return True
+
+    for item in getattr(module, "body", None) or []:
+        if item.kind == ps.SymbolKind.ProceduralBlock:
+            scope = item.parentScope
+            item.body.visit(collect)
+        elif item.kind == ps.SymbolKind.Instance:
+            loops.update(elaborated_loops(item))
+    return loops
+
+
+def next_value(step: str, var: str, value: int, env: Dict[str, int]) -> Optional[int]:
+    m = STEP_INCR.match(step)
+    if m:
+        name = m.group(2) or m.group(3)
+        op = m.group(1) or m.group(4)
+        if name != var:
+            return None
+        return value + 1 if op == "++" else value - 1
+    m = STEP_ASSIGN.match(step)
+    if not m or m.group(1) != var:
+        return None
+    rhs = const_eval(m.group(3), {**env, var: value})
+    if rhs is None:
+        return None
+    op = m.group(2)
+    if op is None:
+        return rhs
+    return {"+": value + rhs, "-": value - rhs, "*": value * rhs, "<<": value << rhs, ">>": value >> rhs}[op]
+
+
+def loop_header(stmt):
+    """(loop variable, initializer text, stop expression, step texts) of a for-loop, or None."""
+    inits = [str(i) for i in getattr(stmt, "initializers", None) or []]
+    steps = [str(st) for st in getattr(stmt, "steps", None) or []]
+    stop = getattr(stmt, "stopExpr", None)
+    if len(inits) != 1 or len(steps) != 1 or stop is None:
+        return None
+    m = INIT.match(inits[0])
+    if not m:
+        return None
+    return m.group(1), m.group(2), str(stop), steps[0]
+
+
+def elaborated_iterations(stmt, scope, limit: int):
+    """loop_iterations for an elaborated ForLoopStatement, evaluated by pyslang in scope."""
+    context = ps.EvalContext(ps.ASTContext(scope, ps.LookupLocation.max))
+    context.pushEmptyFrame()
+    if len(stmt.loopVars) == 1 and not stmt.initializers:
+        var = stmt.loopVars[0]
+        initial = var.initializer.eval(context) if var.initializer is not None else None
+        if constant_int(initial) is None:
+            return None
+        context.createLocal(var, initial)
+    elif not stmt.loopVars and len(stmt.initializers) == 1:
+        init = stmt.initializers[0]
+        var = getattr(getattr(init, "left", None), "symbol", None)
+        if init.kind != ps.ExpressionKind.Assignment or var is None:
+            return None
+        context.createLocal(var, ps.ConstantValue(0))
+        if constant_int(init.eval(context)) is None:
+            return None
+    else:
+        return None
+    if stmt.stopExpr is None or not stmt.steps:
+        return None
+    values = []
+    while True:
+        value = constant_int(context.findLocal(var))
+        if value is None:
+            return None
+        cond = stmt.stopExpr.eval(context)
+        if cond.isFalse():
+            return var.name, values, value
+        if not cond.isTrue():
+            return None
+        if len(values) >= limit:
+            return var.name, None, None
+        values.append(value)
+        for step in stmt.steps:
+            step.eval(context)
+
+
+def loop_iterations(stmt, params: Dict[str, int], limit: int):
+    """For a for-loop with constant bounds: (variable, [values], exit value), or (variable, None, None)
+    when it runs more than `limit` times. None when the bounds are not constant.
+    This is the text fallback of elaborated_iterations, for loops given only as syntax."""
+    header = loop_header(stmt)
+    if header is None:
+        return None
+    var, init, stop, step = header
+    value = const_eval(init, params)
+    if value is None:
+        return None
+    values = []
+    while True:
+        cond = const_eval(stop, {**params, var: value})
+        if cond is None:
+            return None
+        if not cond:
+            return var, values, value
+        if len(values) >= limit:
+            return var, None, None
+        values.append(value)
+        value = next_value(step, var, value, params)
+        if value is None:
+            return None
+
+
+def run_loop_node(m, s, node) -> None:
+    """Execute a LoopBinding or LoopSummary node against the current module's store."""
+    if m.ignore:
+        return
+    store = s.store[m.curr_module]
+    if isinstance(node, LoopBinding):
+        # loop variables are ints (or genvars): 32 bits
+        store[node.var] = BitVecVal(node.value & 0xFFFFFFFF, 32)
+        return
+    for name in block_writes(getattr(node.stmt, "statement", None), set()):
+        store[name] = fresh_term(m, name, m.signals.width(m.curr_module, name))
+    if node.var is not None:
+        store[node.var] = fresh_term(m, node.var, 32)
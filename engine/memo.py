@@ -0,0 +1,76 @@
+"""State memoization at cycle boundaries.
+
+Many multi-cycle paths reach the same symbolic store and path condition at the end of a
+cycle, for example when the reset branch of `test_2.v` is taken in different cycles.
+Whatever follows from such a state has already been explored once, so the rest of the
+path (and, in depth-first order, every path sharing its prefix) can be skipped: it would
+reach the same results.
+
+States are compared in a canonical form: store terms and the path condition as
+s-expressions, which, unlike `str()`, are never elided. Fresh symbols
+(`<instance>.<signal>@c<cycle>`, see `ExecutionManager.symbol_name`) are renamed in order
+of first appearance by `helpers.utils.canonicalize`, walking the store in sorted order and
+then the path condition. Assertion-tracking literals (`p<n>`) lose their counter. Two
+states that only differ in the names of their fresh symbols therefore hash the same. The
+table holds 16-byte digests keyed by position in the path space and evicts the least
+recently used entry past `max_entries`, so memory stays bounded on long runs."""
+
+import hashlib
+from collections import OrderedDict
+
+from helpers.utils import canonicalize
+
+DEFAULT_MAX_ENTRIES = 100000
+
+
+def state_digest(state, manager) -> bytes:
+    """Canonical hash of the store, pending register writes and path condition."""
+    names = {}
+    parts = []
+    for module, signals in sorted(state.store.items()):
+        for signal in sorted(signals):
+            value = signals[signal]
+            text = value.sexpr() if hasattr(value, "sexpr") else str(value)
+            parts.append(f"{module}.{signal}={canonicalize(text, names)}")
+    parts.append(";".join(sorted(str(w) for w in manager.reg_writes)))
+    for assertion in state.pc.assertions():
+        parts.append(canonicalize(assertion.sexpr(), names, tracked=True))
+    return hashlib.blake2b("\n".join(parts).encode(), digest_size=16).digest()
+
+
+def boundary_levels(source) -> set:
+    """PathSource positions that end a cycle of a module, except the last position."""
+    layout = source.layout
+    return {level for level in range(len(layout) - 1) if layout[level + 1][:2] != layout[level][:2]}
+
+
+class StateMemo:
+    """LRU table of states already explored, keyed by (position, digest)."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def seen(self, level, digest: bytes, owner) -> bool:
+        """True if this state was reached at this level by a different owner (subtree) before.
+        Otherwise the state is recorded for `owner` and False is returned."""
+        key = (level, digest)
+        prev = self.table.get(key)
+        if prev is None:
+            self.misses += 1
+            self.table[key] = owner
+            if len(self.table) > self.max_entries:
+                self.table.popitem(last=False)
+                self.evictions += 1
+            return False
+        self.table.move_to_end(key)
+        if prev == owner:
+            return False
+        self.hits += 1
+        return True
+
+    def report(self) -> None:
+        print(f"State memo: {self.hits} hits, {self.misses} states recorded, {self.evictions} evicted")
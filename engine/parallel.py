@@ -0,0 +1,117 @@
+"""Process-pool parallel exploration (`--jobs N`).
+
+`execute_sv` explores every path serially in one process with one Z3 solver. Here the path
+space is split into N disjoint shards: contiguous path-index ranges for the serial executor,
+or first-always-block choices for the prefix-sharing executor. Each worker process rebuilds
+the pyslang compilation and CFGs once (pyslang symbols cannot be pickled), explores its shard
+with its own Z3 context, and streams path counts, branch counts, solver time and violations
+back to the parent, which merges them into the usual `execute_sv` summary."""
+
+import multiprocessing as mp
+import os
+import sys
+import queue as queue_mod
+
+# workers report their counters every this many paths
+PROGRESS_INTERVAL = 100
+
+
+def shard_summary(manager) -> dict:
+    """The counters a worker sends back. Plain types only, so they pickle."""
+    if manager is None:
+        return {"paths": 0, "branches": 0, "solver_time": 0.0, "violation": False,
+                "violated_assertions": [], "counterexample": {}}
+    return {
+        "paths": manager.path_count,
+        "branches": manager.branch_count,
+        "solver_time": manager.solver_time,
+        "violation": bool(manager.assertion_violation),
+        "violated_assertions": [{k: str(v) for k, v in va.items()} for va in getattr(manager, "violated_assertions", [])],
+        "counterexample": {str(k): str(v) for k, v in getattr(manager, "counterexample", {}).items()},
+    }
+
+
+def _worker(explore, configure_engine, options, filelist, num_cycles, shard, results, stop_event):
+    """Explore one shard. Runs in a child process."""
+    from engine.execution_engine import ExecutionEngine
+
+    # per-path chatter from the executors would interleave across workers; results come back on the queue
+    sys.stdout = open(os.devnull, "w")
+    engine = ExecutionEngine()
+    configure_engine(engine, options)
+    engine.shard = shard
+
+    def progress(manager):
+        if manager.path_count % PROGRESS_INTERVAL == 0:
+            results.put(("progress", shard[0], shard_summary(manager)))
+        return stop_event.is_set()
+
+    engine.progress_callback = progress
+    try:
+        explore(engine, options, filelist, num_cycles)
+    except SystemExit:
+        # explore() exits on compilation errors; report whatever was done
+        pass
+    summary = shard_summary(engine.manager)
+    if summary["violation"]:
+        stop_event.set()
+    results.put(("done", shard[0], summary))
+
+
+def print_summary(summaries) -> None:
+    """Merge the per-shard counters into the summary `execute_sv` prints."""
+    violations = [s for s in summaries.values() if s["violation"]]
+    for s in violations[:1]:
+        print("Assertion violation")
+        if s["violated_assertions"]:
+            print("Violated assertion details:")
+            for va in s["violated_assertions"]:
+                print(f"  - condition: {va.get('condition', 'N/A')}")
+                print(f"    z3_condition: {va.get('z3_condition', 'N/A')}")
+                print(f"    path condition: {va.get('path condition', 'N/A')}")
+                print(f"    kind: {va.get('kind', 'N/A')}")
+        print(s["counterexample"])
+    print(f"Branch points explored: {sum(s['branches'] for s in summaries.values())}")
+    print(f"Paths explored: {sum(s['paths'] for s in summaries.values())}")
+    print(f"Solver time: {sum(s['solver_time'] for s in summaries.values())}")
+
+
+def run_parallel(explore, configure_engine, options, filelist, num_cycles, jobs: int) -> dict:
+    """Explore the design with `jobs` worker processes and print the merged summary.
+
+    `explore(engine, options, filelist, num_cycles)` and `configure_engine(engine, options)`
+    are the same functions main uses for a single-process run."""
+    # fork keeps the already-imported modules; workers still compile the design themselves
+    ctx = mp.get_context("fork")
+    results = ctx.Queue()
+    stop_event = ctx.Event()
+    workers = []
+    for k in range(jobs):
+        p = ctx.Process(target=_worker, args=(explore, configure_engine, options, filelist, num_cycles, (k, jobs), results, stop_event))
+        p.start()
+        workers.append(p)
+    print(f"Started {jobs} workers")
+
+    summaries = {}
+    done = set()
+    while len(done) < jobs:
+        try:
+            kind, shard_index, summary = results.get(timeout=1)
+        except queue_mod.Empty:
+            # a worker that died without reporting would otherwise hang the parent
+            for k, p in enumerate(workers):
+                if k not in done and not p.is_alive() and p.exitcode not in (0, None):
+                    print(f"[Warning] worker {k} exited with code {p.exitcode}")
+                    done.add(k)
+            continue
+        summaries[shard_index] = summary
+        if kind == "done":
+            done.add(shard_index)
+            print(f"Shard {shard_index} finished: {summary['paths']} paths")
+        elif options.showdebug:
+            print(f"Shard {shard_index}: {summary['paths']} paths so far")
+
+    for p in workers:
+        p.join()
+    print_summary(summaries)
+    return summaries
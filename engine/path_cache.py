@@ -0,0 +1,186 @@
+"""On-disk cache of CFGs across runs (`--path_cache DIR`).
+
+Every run rebuilds the CFG of every always block and enumerates its paths again, even
+when only `num_cycles` or an exploration option changed. Path enumeration is the
+exponential part of that setup. This is not a cache of the design: pyslang symbols and
+syntax nodes cannot be pickled, and the executors visit them directly, so the sources are
+parsed and elaborated on every run, and `basic_blocks_sv` and `partition` still lay out
+the basic blocks (they hold syntax nodes). What is cached, per always block, is what is
+computed on top of the blocks: node and basic-block counts and the edges of its BlockGraph,
+each with its branch direction. The paths themselves are not stored: a PathList unranks
+them from the graph. On a hit the graph is not rebuilt.
+
+The cache also records whether the sources elaborated without any diagnostics, errors or
+warnings. On a hit the full-design diagnostics pass (`getAllDiagnostics`) is skipped, and
+symbols are elaborated lazily, as the engine touches them. Sources with warnings run the
+pass every time, so the warnings keep being reported.
+
+The store is keyed by a content hash of the filelist, every source file it names, the
+files in the include directories, the defines, the top module and the engine files
+that lay out CFGs, so any change to them starts a fresh cache file. A CFG entry is also
+keyed by the always block's text, its parameter values and the options that change its
+layout (merging, slicing, unrolling, ternary splitting). One pickle per fingerprint is kept
+in the cache directory, written atomically like the checkpoints."""
+
+import hashlib
+import os
+import pickle
+from typing import Iterable, List, Optional
+
+CACHE_VERSION = 3
+
+# sources pulled in through include directories
+SOURCE_EXTENSIONS = (".v", ".sv", ".vh", ".svh", ".vp", ".svp", ".inc")
+
+# engine files whose changes alter the cached CFG layout
+BUILDER_FILES = ("cfg.py", "block_graph.py", "loop_unroll.py", "ternary.py", "state_merging.py", "slicing.py",
+                 "path_cache.py", os.path.join("..", "helpers", "slang_helpers.py"))
+
+
+def filelist_entries(path: str, seen=None):
+    """(source files, include directories, other options) named by a .F/.f filelist,
+    following nested -f/-F files."""
+    seen = seen if seen is not None else set()
+    files, incdirs, other = [], [], []
+    path = os.path.abspath(path)
+    if path in seen or not os.path.exists(path):
+        return files, incdirs, other
+    seen.add(path)
+    base = os.path.dirname(path)
+
+    def resolve(name: str) -> str:
+        name = os.path.expandvars(name)
+        return name if os.path.isabs(name) else os.path.join(base, name)
+
+    with open(path, errors="replace") as f:
+        tokens = [tok for line in f for tok in line.split("//")[0].split()]
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok in ("-f", "-F") and i + 1 < len(tokens):
+            sub = filelist_entries(resolve(tokens[i + 1]), seen)
+            files += sub[0]
+            incdirs += sub[1]
+            other += sub[2]
+            i += 2
+            continue
+        if tok.startswith("+incdir+"):
+            incdirs += [resolve(d) for d in tok[len("+incdir+"):].split("+") if d]
+        elif tok.startswith("-I") and len(tok) > 2:
+            incdirs.append(resolve(tok[2:]))
+        elif tok.startswith(("+", "-")):
+            other.append(tok)
+        else:
+            files.append(resolve(tok))
+        i += 1
+    return files, incdirs, other
+
+
+def hash_file(h, path: str) -> None:
+    h.update(path.encode())
+    try:
+        with open(path, "rb") as f:
+            h.update(hashlib.blake2b(f.read(), digest_size=16).digest())
+    except OSError:
+        h.update(b"<missing>")
+
+
+def source_fingerprint(filelist: List[str], includes: Optional[Iterable[str]], defines: Optional[Iterable[str]], top: str) -> str:
+    """Content hash of everything the elaborated design depends on."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{CACHE_VERSION};top={top}".encode())
+    files, incdirs, other = [], list(includes or []), []
+    for entry in filelist:
+        files.append(entry)
+        if entry.endswith((".F", ".f")):
+            sub = filelist_entries(entry)
+            files += sub[0]
+            incdirs += sub[1]
+            other += sub[2]
+    for path in files:
+        hash_file(h, path)
+    for directory in incdirs:
+        h.update(f"incdir={directory}".encode())
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(SOURCE_EXTENSIONS):
+                    hash_file(h, os.path.join(directory, name))
+    for opt in list(other) + [f"-D{d}" for d in defines or []]:
+        h.update(opt.encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in BUILDER_FILES:
+        hash_file(h, os.path.join(here, name))
+    return h.hexdigest()
+
+
+def block_key(text: str, params: dict, layout: tuple) -> str:
+    """Key of one always block's CFG: its text, parameter values and layout options."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(text.encode())
+    h.update(repr(sorted(params.items())).encode())
+    h.update(repr(layout).encode())
+    return h.hexdigest()
+
+
+class PathCache:
+    """Cached CFGs of one set of sources, stored in `directory` under its fingerprint."""
+
+    def __init__(self, directory: str, fingerprint: str):
+        self.directory = directory
+        self.fingerprint = fingerprint
+        self.path = os.path.join(directory, f"{fingerprint}.pkl")
+        self.data = {"version": CACHE_VERSION, "fingerprint": fingerprint, "clean": False, "cfgs": {}}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            print(f"No path cache at {self.path}, building it")
+            return
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+            print(f"[Warning] Unreadable path cache {self.path} ({e}), rebuilding it")
+            return
+        if data.get("version") != CACHE_VERSION or data.get("fingerprint") != self.fingerprint:
+            print(f"[Warning] Path cache {self.path} is stale, rebuilding it")
+            return
+        self.data = data
+        print(f"Loaded path cache {self.path}: {len(data['cfgs'])} CFGs")
+
+    @property
+    def clean(self) -> bool:
+        """True if this design already elaborated without errors or warnings."""
+        return self.data["clean"]
+
+    def mark_clean(self) -> None:
+        if not self.data["clean"]:
+            self.data["clean"] = True
+            self.dirty = True
+
+    def cfg(self, key: str) -> Optional[dict]:
+        entry = self.data["cfgs"].get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def store_cfg(self, key: str, entry: dict) -> None:
+        self.data["cfgs"][key] = entry
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # one tmp file per process, since --jobs workers may save the same cache
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self.data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        self.dirty = False
+        print(f"Saved path cache {self.path} ({self.hits} CFGs reused, {self.misses} built)")
@@ -0,0 +1,115 @@
+"""Lazy enumeration of multi-cycle, multi-module CFG path combinations.
+
+`execute_sv` used to materialize the full cross product of CFG paths (per always block,
+per cycle, per module) as a list of dicts before executing the first statement. For
+designs like or1200 with 3+ cycles that list alone does not fit in memory. The PathSource
+below walks the same product in the same order, but only ever holds one odometer of
+digits, so peak memory is O(depth) instead of O(paths)."""
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+class PathSource:
+    """Index-addressable view of every (module, cycle, cfg) path combination.
+
+    The product is laid out as a flat list of positions, module-major, then cycle, then
+    always block (cfg), with the last position varying fastest. That is exactly the order
+    the old `product(*values)` over `product(product(...), repeat=num_cycles)` produced, so
+    path i here is path i in the old `total_paths` list."""
+
+    def __init__(self, mapped_paths: Dict[str, Dict[int, list]], module_names: Sequence[str], num_cycles: int):
+        self.module_names: List[str] = list(module_names)
+        self.num_cycles: int = int(num_cycles)
+        self.cfg_counts: Dict[str, int] = {}
+        # cfg index of each entry in an assembled cycle tuple; a subset when only some blocks are explored
+        self.cfg_indices: Dict[str, List[int]] = {}
+
+        # one pool (list of cfg paths) and one (module, cycle, cfg_idx) label per position
+        self.pools: List[list] = []
+        self.layout: List[Tuple[str, int, int]] = []
+        for module_name in self.module_names:
+            cfg_paths = mapped_paths.get(module_name, {})
+            self.cfg_counts[module_name] = len(cfg_paths)
+            self.cfg_indices[module_name] = sorted(cfg_paths)
+            for cycle in range(self.num_cycles):
+                for cfg_idx in sorted(cfg_paths):
+                    self.pools.append(cfg_paths[cfg_idx])
+                    self.layout.append((module_name, cycle, cfg_idx))
+
+        self.radices: List[int] = [len(pool) for pool in self.pools]
+        if not self.module_names:
+            self.total = 0
+        else:
+            self.total = 1
+            for radix in self.radices:
+                self.total *= radix
+
+    def __len__(self) -> int:
+        # len() raises OverflowError past sys.maxsize, so huge designs should read self.total
+        return self.total
+
+    def decode(self, index: int) -> List[int]:
+        """Mixed-radix decode of a path index into one digit per position."""
+        if index < 0:
+            index += self.total
+        if index < 0 or index >= self.total:
+            raise IndexError(f"path index {index} out of range for {self.total} paths")
+        digits = [0] * len(self.radices)
+        for pos in range(len(self.radices) - 1, -1, -1):
+            index, digits[pos] = divmod(index, self.radices[pos])
+        return digits
+
+    def encode(self, digits: Sequence[int]) -> int:
+        """Inverse of decode."""
+        index = 0
+        for digit, radix in zip(digits, self.radices):
+            index = index * radix + digit
+        return index
+
+    def assemble(self, digits: Sequence[int]) -> Dict[str, List[tuple]]:
+        """Turn a digit vector into the {module: [cycle_0_paths, cycle_1_paths, ...]} shape
+        `execute_sv` walks, where each cycle entry is a tuple with one cfg path per always block
+        (in `cfg_indices` order)."""
+        res = {}
+        pos = 0
+        for module_name in self.module_names:
+            cycles = []
+            n_cfgs = self.cfg_counts[module_name]
+            for _ in range(self.num_cycles):
+                cycles.append(tuple(self.pools[pos + k][digits[pos + k]] for k in range(n_cfgs)))
+                pos += n_cfgs
+            res[module_name] = cycles
+        return res
+
+    def __getitem__(self, index: int) -> Dict[str, List[tuple]]:
+        return self.assemble(self.decode(index))
+
+    def shard_range(self, shard_index: int, shard_count: int) -> Tuple[int, int]:
+        """Contiguous [start, stop) index range of one shard out of shard_count."""
+        return (self.total * shard_index // shard_count, self.total * (shard_index + 1) // shard_count)
+
+    def iter_digits(self, start: int = 0, stop: Optional[int] = None) -> Iterator[List[int]]:
+        """Yield digit vectors for indices [start, stop) by incrementing an odometer,
+        so each step is O(depth) and nothing but the current digits is kept around."""
+        if stop is None or stop > self.total:
+            stop = self.total
+        if start >= stop:
+            return
+        digits = self.decode(start)
+        for _ in range(stop - start):
+            yield digits
+            pos = len(digits) - 1
+            while pos >= 0:
+                digits[pos] += 1
+                if digits[pos] < self.radices[pos]:
+                    break
+                digits[pos] = 0
+                pos -= 1
+
+    def iter_range(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, List[tuple]]]:
+        """Yield assembled paths for indices [start, stop)."""
+        for digits in self.iter_digits(start, stop):
+            yield self.assemble(digits)
+
+    def __iter__(self) -> Iterator[Dict[str, List[tuple]]]:
+        return self.iter_range(0, self.total)
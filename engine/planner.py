@@ -0,0 +1,105 @@
+"""Dry-run path planning: exact path counts without enumerating a single path.
+
+The first sign that a design is intractable used to be an OOM inside `execute_sv`, while
+`nx.all_simple_paths` materialized every CFG path. The planner counts the paths of each
+CFG with `BlockGraph.path_stats`, dynamic programming over its DAG (paths from a node =
+sum over its successors), which is linear in the size of the graph. From those counts it
+derives the per-module, per-cycle and total path counts of the PathSource product and
+estimates the memory the run would need. `--plan` prints the report and stops;
+`--max_paths` checks the total against a budget before anything is explored."""
+
+import sys
+from typing import Dict, List, Tuple
+
+# CPython sizes used by the memory estimate: a tuple of basic-block indices per listed CFG
+# path, and one pointer per position of an eagerly built product tuple
+POINTER_BYTES = 8
+TUPLE_BYTES = sys.getsizeof(())
+
+
+def path_stats(graph) -> Tuple[int, int]:
+    """(number of CFG paths, total number of nodes over those paths)."""
+    if graph is None:
+        return 1, 0
+    return graph.path_stats()
+
+
+def format_count(n: int) -> str:
+    """Exact below 2^1000; beyond that str() may refuse, and the digits say nothing anyway."""
+    return str(n) if n.bit_length() < 1000 else f"~2^{n.bit_length() - 1}"
+
+
+def format_bytes(n: int) -> str:
+    n = int(n)
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if n < 1024:
+            return f"{n} {unit}"
+        n //= 1024
+    return f"{format_count(n)} PB"
+
+
+class PathPlan:
+    """Path counts of a run, per always block, module, cycle and in total."""
+
+    def __init__(self, cfgs_by_module, num_cycles: int):
+        self.num_cycles = int(num_cycles)
+        # instances of one definition share their CFGs, which are counted once
+        stats: Dict[int, Tuple[int, int]] = {}
+        # CFGs with a back edge, whose PathList keeps its simple paths in a list
+        listed = set()
+        for cfgs in cfgs_by_module.values():
+            for cfg in cfgs:
+                if id(cfg) not in stats:
+                    stats[id(cfg)] = path_stats(cfg.graph)
+                    if cfg.graph is not None and cfg.graph.topological_order() is None:
+                        listed.add(id(cfg))
+        # module -> [(path count, total path length) per always block]
+        self.blocks: Dict[str, List[Tuple[int, int]]] = {
+            name: [stats[id(cfg)] for cfg in cfgs] for name, cfgs in cfgs_by_module.items()}
+        self.unique = stats
+        self.listed = listed
+
+    def per_cycle(self, name: str) -> int:
+        """Paths of one module through one clock cycle."""
+        total = 1
+        for count, _ in self.blocks[name]:
+            total *= count
+        return total
+
+    def per_module(self, name: str) -> int:
+        return self.per_cycle(name) ** self.num_cycles
+
+    def cycle_total(self) -> int:
+        """Paths of the whole design through one clock cycle."""
+        total = 1
+        for name in self.blocks:
+            total *= self.per_cycle(name)
+        return total
+
+    @property
+    def total(self) -> int:
+        return self.cycle_total() ** self.num_cycles
+
+    def positions(self) -> int:
+        return sum(len(cfgs) for cfgs in self.blocks.values()) * self.num_cycles
+
+    def cfg_path_bytes(self) -> int:
+        """Memory for the CFG paths in mapped_paths. A PathList over a DAG unranks its paths
+        on demand, so only CFGs with a back edge hold theirs."""
+        return sum(count * TUPLE_BYTES + length * POINTER_BYTES
+                   for key, (count, length) in self.unique.items() if key in self.listed)
+
+    def eager_bytes(self) -> int:
+        """Memory the old eager product over cycles and modules would have needed."""
+        return self.total * (TUPLE_BYTES + self.positions() * POINTER_BYTES)
+
+    def report(self) -> None:
+        print(f"Path plan for {self.num_cycles} clock cycles")
+        for name, cfgs in self.blocks.items():
+            counts = ", ".join(format_count(count) for count, _ in cfgs) or "none"
+            print(f"  {name}: always block paths [{counts}], {format_count(self.per_cycle(name))} per cycle, "
+                  f"{format_count(self.per_module(name))} over {self.num_cycles} cycles")
+        print(f"  Per cycle (all modules): {format_count(self.cycle_total())}")
+        print(f"  Total paths: {format_count(self.total)}")
+        print(f"  Estimated memory: CFG paths {format_bytes(self.cfg_path_bytes())}, "
+              f"eager product {format_bytes(self.eager_bytes())}")
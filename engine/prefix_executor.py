@@ -0,0 +1,143 @@
+"""Prefix-sharing (trie-shaped) exploration of the multi-cycle path space.
+
+The serial loop in `execute_sv` replays every path from scratch: `init_state`, the per-module
+DFS and `state.pc.reset()` run once per path even when thousands of paths share the same
+first k cycles. Here the path space from PathSource is walked depth first, one level per
+(module, cycle, always block) position. Before each level the symbolic store is snapshotted
+and the solver gets a `push()`, so siblings resume from the shared prefix instead of redoing
+it, and a prefix that goes UNSAT (`m.abandon`) prunes its whole subtree at once."""
+
+from __future__ import annotations
+from .execution_manager import ExecutionManager
+from .symbolic_state import SymbolicState
+from .path_source import PathSource
+from .memo import state_digest, boundary_levels
+
+
+class PrefixSharingExecutor:
+    """Explores a PathSource as a trie, checkpointing at every cycle and always-block boundary."""
+
+    def __init__(self, engine, visitor, manager: ExecutionManager, state: SymbolicState, modules_dict, cfgs_by_module, module):
+        self.engine = engine
+        self.visitor = visitor
+        self.manager = manager
+        self.state = state
+        self.modules_dict = modules_dict
+        self.cfgs_by_module = cfgs_by_module
+        self.module = module
+        # number of complete paths skipped because a prefix of theirs was infeasible
+        self.pruned_paths = 0
+        # StateMemo shared by the engine (--memoize), and the paths it let us skip
+        self.memo = None
+        self.reused_paths = 0
+
+    def checkpoint(self):
+        """Snapshot everything a sibling needs to resume from this point."""
+        self.state.pc.push()
+        # O(1): instances are copied on first access by whichever side touches them
+        store = self.state.store.fork()
+        return (store, set(self.manager.reg_writes), self.manager.curr_module, self.manager.cycle)
+
+    def restore(self, snapshot) -> None:
+        """Roll the state back to a checkpoint and drop the solver level pushed with it."""
+        store, reg_writes, curr_module, cycle = snapshot
+        self.state.pc.pop()
+        self.state.store = store
+        self.manager.reg_writes = reg_writes
+        self.manager.curr_module = curr_module
+        self.manager.cycle = cycle
+        self.manager.abandon = False
+        self.manager.ignore = False
+
+    def execute_position(self, source: PathSource, level: int, choice: int) -> None:
+        """Run the always block at one trie level along its chosen CFG path."""
+        module_name, cycle, cfg_idx = source.layout[level]
+        self.manager.curr_module = module_name
+        self.manager.cycle = cycle
+        cfg = self.cfgs_by_module[module_name][cfg_idx]
+        self.engine.execute_cfg_path(self.visitor, self.manager, self.state, self.modules_dict, cfg, source.pools[level][choice])
+
+    def subtree_size(self, source: PathSource, level: int) -> int:
+        """Number of complete paths below a node at the given level."""
+        size = 1
+        for radix in source.radices[level + 1:]:
+            size *= radix
+        return size
+
+    def finish_leaf(self) -> bool:
+        """End-of-path bookkeeping; returns True when an assertion violation stops exploration."""
+        m = self.manager
+        m.cycle = 0
+        self.engine.done = True
+        print(f"checking path {m.path_count + 1}")
+        self.engine.check_state(m, self.state)
+        self.engine.done = False
+        if self.engine.finish_path(m, self.state):
+            return True
+        m.path_count += 1
+        return False
+
+    def run(self, source: PathSource, shard=None) -> bool:
+        """Walk the whole path space. Returns True if an assertion violation was reported.
+        With shard=(index, count) only the first-level choices congruent to index are taken,
+        so parallel workers split the trie by its first always block."""
+        m = self.manager
+        if source.total == 0:
+            return False
+
+        # the prefix shared by every path: fresh symbols plus decls/comb, done exactly once
+        self.engine.init_path_state(self.visitor, m, self.state, self.modules_dict, self.cfgs_by_module, self.module)
+        self.engine.check_state(m, self.state)
+
+        depth = len(source.pools)
+        if depth == 0:
+            return self.finish_leaf()
+
+        memo_levels = boundary_levels(source) if self.memo is not None else set()
+        visits = 0
+
+        # explicit stack instead of recursion: depth is modules * cycles * always blocks
+        choice = [-1] * depth
+        snapshots = [None] * depth
+        level = 0
+        while level >= 0:
+            if snapshots[level] is not None:
+                self.restore(snapshots[level])
+                snapshots[level] = None
+            choice[level] += 1
+            if choice[level] >= source.radices[level]:
+                choice[level] = -1
+                level -= 1
+                continue
+            if level == 0 and shard is not None and choice[0] % shard[1] != shard[0]:
+                continue
+
+            snapshots[level] = self.checkpoint()
+            self.execute_position(source, level, choice[level])
+
+            if m.abandon:
+                # the prefix is UNSAT: every path below it is infeasible too
+                pruned = self.subtree_size(source, level)
+                self.pruned_paths += pruned
+                m.path_count += pruned
+                continue
+
+            if level in memo_levels and not (m.ignore or m.assertion_violation):
+                # a sibling subtree already explored everything that follows from this state
+                visits += 1
+                if self.memo.seen((id(source), level), state_digest(self.state, m), visits):
+                    reused = self.subtree_size(source, level)
+                    self.reused_paths += reused
+                    m.path_count += reused
+                    continue
+
+            if level == depth - 1:
+                if self.finish_leaf():
+                    return True
+                if self.engine.progress_callback is not None and self.engine.progress_callback(m):
+                    return False
+                continue
+
+            level += 1
+
+        return False
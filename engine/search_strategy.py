@@ -0,0 +1,272 @@
+"""Search strategies: the order in which the serial executor runs paths.
+
+`execute_sv` used to walk the PathSource in product order. With an `--explore_time`
+budget on a large design, that order decides whether a violation is found at all.
+A strategy maps the ranks [start, stop) the engine was asked to run (the whole space,
+a `--jobs` shard or a leased work unit) to path indices. Every strategy here is a
+bijection on the path space, so shards and leases still partition it exactly.
+
+    dfs        product order, the last always block varies fastest (the old behaviour)
+    bfs        the first always block varies fastest, so early paths fan out across the
+               first cycle's branches instead of only the last cycle's
+    random     a seeded pseudo-random permutation, O(1) memory
+    uncovered  greedily runs the path covering the most not-yet-covered CFG branch
+               edges, then falls back to product order for the rest
+    assertion  per always block, CFG paths closer to an assertion statement come first"""
+
+import math
+import random
+from typing import Dict, Iterator, List, Optional
+
+from .path_source import PathSource
+from helpers.slang_helpers import is_assertion_stmt
+
+
+class SearchStrategy:
+    """Product order. Subclasses override `index` (static orders) or `order` (adaptive ones)."""
+    name = "dfs"
+
+    def prepare(self, source: PathSource, cfgs_by_module) -> None:
+        """Called before a PathSource is explored (once per independent group with --decompose)."""
+        pass
+
+    def index(self, source: PathSource, rank: int) -> int:
+        """The path index run at the given rank."""
+        return rank
+
+    def order(self, source: PathSource, start: int, stop: int) -> Iterator[int]:
+        """Yield the path indices for ranks [start, stop)."""
+        for rank in range(start, stop):
+            yield self.index(source, rank)
+
+    def record(self, manager, source: PathSource, index: int) -> None:
+        """Feedback after a path ran; manager.abandon tells whether it was feasible."""
+        pass
+
+    def state(self) -> dict:
+        """What a checkpoint needs to continue this order, as JSON types."""
+        return {}
+
+    def restore(self, state: dict) -> None:
+        """Load a `state()` saved by an earlier run, right after `prepare`."""
+        pass
+
+    def resume(self, source: PathSource, start: int, stop: int, done: int) -> Iterator[int]:
+        """`order` for ranks [start, stop) when the first `done` of them already ran."""
+        return self.order(source, start + done, stop)
+
+
+class DFSStrategy(SearchStrategy):
+    name = "dfs"
+
+
+class BFSStrategy(SearchStrategy):
+    """Reverses digit significance: rank r runs the path whose first position is r mod radix."""
+    name = "bfs"
+
+    def index(self, source: PathSource, rank: int) -> int:
+        digits = [0] * len(source.radices)
+        for pos, radix in enumerate(source.radices):
+            rank, digits[pos] = divmod(rank, radix)
+        return source.encode(digits)
+
+
+class RandomStrategy(SearchStrategy):
+    """Affine permutation rank -> (a * rank + b) mod total with gcd(a, total) == 1.
+    Not a uniform shuffle, but it needs no memory and spreads consecutive ranks apart."""
+    name = "random"
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.a = 1
+        self.b = 0
+
+    def prepare(self, source: PathSource, cfgs_by_module) -> None:
+        total = source.total
+        if total <= 1:
+            return
+        self.a = self.rng.randrange(1, total)
+        while math.gcd(self.a, total) != 1:
+            self.a = self.rng.randrange(1, total)
+        self.b = self.rng.randrange(total)
+
+    def index(self, source: PathSource, rank: int) -> int:
+        if source.total <= 1:
+            return rank
+        return (self.a * rank + self.b) % source.total
+
+    def state(self) -> dict:
+        version, internal, gauss = self.rng.getstate()
+        return {"a": self.a, "b": self.b, "rng": [version, list(internal), gauss]}
+
+    def restore(self, state: dict) -> None:
+        self.a = state["a"]
+        self.b = state["b"]
+        version, internal, gauss = state["rng"]
+        self.rng.setstate((version, tuple(internal), gauss))
+
+
+def cfg_path_edges(module_name: str, cfg_idx: int, cfg_path) -> List[tuple]:
+    """Branch edges a CFG path takes, keyed so the same always block shares them across cycles."""
+    return [(module_name, cfg_idx, u, v) for u, v in zip(cfg_path, cfg_path[1:])]
+
+
+class UncoveredBranchFirst(SearchStrategy):
+    """Coverage-guided: while some CFG edge is uncovered, run the path taking the most of them.
+
+    The path is built greedily one position at a time, counting edges already picked for
+    earlier cycles as covered, so later cycles prefer other branches. An edge counts as
+    covered once a feasible path took it; edges only reached by infeasible paths are given
+    up on after `retries` attempts. Then the remaining ranks run in product order."""
+    name = "uncovered"
+
+    def __init__(self, retries: int = 2):
+        self.retries = retries
+        self.covered = set()
+        self.attempts: Dict[tuple, int] = {}
+        # indices already run by the greedy phase, skipped by the product-order phase
+        self.visited = set()
+        self.pending = None
+
+    def prepare(self, source: PathSource, cfgs_by_module) -> None:
+        # indices are per PathSource; edge coverage carries over between sources
+        self.visited = set()
+
+    def is_open(self, edge) -> bool:
+        return edge not in self.covered and self.attempts.get(edge, 0) < self.retries
+
+    def position_edges(self, source: PathSource, pos: int, digit: int) -> List[tuple]:
+        module_name, _, cfg_idx = source.layout[pos]
+        return cfg_path_edges(module_name, cfg_idx, source.pools[pos][digit])
+
+    def greedy(self, source: PathSource, low: List[int], high: List[int]):
+        """Best digits within [encode(low), encode(high)], and the open edges they take."""
+        digits = []
+        gained = set()
+        tight_low = tight_high = True
+        for pos in range(len(source.radices)):
+            first = low[pos] if tight_low else 0
+            last = high[pos] if tight_high else source.radices[pos] - 1
+            best, best_new = first, []
+            for digit in range(first, last + 1):
+                new = [e for e in self.position_edges(source, pos, digit) if self.is_open(e) and e not in gained]
+                if len(new) > len(best_new):
+                    best, best_new = digit, new
+            digits.append(best)
+            gained.update(best_new)
+            tight_low = tight_low and best == low[pos]
+            tight_high = tight_high and best == high[pos]
+        return digits, gained
+
+    def order(self, source: PathSource, start: int, stop: int) -> Iterator[int]:
+        if stop > source.total:
+            stop = source.total
+        if start >= stop:
+            return
+        low, high = source.decode(start), source.decode(stop - 1)
+        while True:
+            digits, gained = self.greedy(source, low, high)
+            if not gained:
+                break
+            index = source.encode(digits)
+            if index in self.visited:
+                # the same path again would fail the same way
+                for edge in gained:
+                    self.attempts[edge] = self.retries
+                continue
+            self.visited.add(index)
+            self.pending = gained
+            yield index
+        self.pending = None
+        for index in range(start, stop):
+            if index not in self.visited:
+                yield index
+
+    def record(self, manager, source: PathSource, index: int) -> None:
+        if self.pending is None:
+            return
+        for edge in self.pending:
+            self.attempts[edge] = self.attempts.get(edge, 0) + 1
+        if not manager.abandon:
+            for pos, digit in enumerate(source.decode(index)):
+                self.covered.update(self.position_edges(source, pos, digit))
+
+    def state(self) -> dict:
+        return {"covered": [list(edge) for edge in self.covered],
+                "attempts": [[list(edge), n] for edge, n in self.attempts.items()],
+                "visited": sorted(self.visited)}
+
+    def restore(self, state: dict) -> None:
+        self.covered = {tuple(edge) for edge in state["covered"]}
+        self.attempts = {tuple(edge): n for edge, n in state["attempts"]}
+        self.visited = set(state["visited"])
+
+    def resume(self, source: PathSource, start: int, stop: int, done: int) -> Iterator[int]:
+        # with the coverage restored the greedy phase picks up where it stopped; ranks done
+        # beyond the greedy picks (all in `visited`) were taken by the product-order phase
+        skip = done - len(self.visited)
+        for index in self.order(source, start, stop):
+            if self.pending is None and skip > 0:
+                skip -= 1
+                continue
+            yield index
+
+
+def assertion_distances(cfg) -> Dict[int, int]:
+    """Basic block -> number of CFG edges to the nearest block containing an assertion."""
+    targets = [idx for idx, block in enumerate(cfg.basic_block_list) if any(is_assertion_stmt(stmt) for stmt in block)]
+    graph = getattr(cfg, "graph", None)
+    if not targets or graph is None:
+        return {}
+    return graph.distances_to(targets)
+
+
+class AssertionDistance(SearchStrategy):
+    """Ranks each always block's CFG paths by how close they come to an assertion statement:
+    0 if the path runs through one, otherwise the CFG distance from its nearest block.
+    Always blocks without assertions keep product order. Assertions declared outside
+    always blocks are not in any CFG, so for them this degrades to dfs."""
+    name = "assertion"
+
+    def __init__(self):
+        # per position: rank digit -> pool digit
+        self.perms: List[List[int]] = []
+
+    def prepare(self, source: PathSource, cfgs_by_module) -> None:
+        perms_by_cfg = {}
+        self.perms = []
+        for pos, (module_name, _, cfg_idx) in enumerate(source.layout):
+            key = (module_name, cfg_idx)
+            if key not in perms_by_cfg:
+                cfg = cfgs_by_module[module_name][cfg_idx]
+                dist = assertion_distances(cfg)
+                pool = source.pools[pos]
+                if dist:
+                    unreachable = len(cfg.basic_block_list) + 1
+                    cost = [min((dist.get(b, unreachable) for b in p if b >= 0), default=unreachable) for p in pool]
+                    perms_by_cfg[key] = sorted(range(len(pool)), key=cost.__getitem__)
+                else:
+                    perms_by_cfg[key] = list(range(len(pool)))
+            self.perms.append(perms_by_cfg[key])
+
+    def index(self, source: PathSource, rank: int) -> int:
+        digits = source.decode(rank)
+        return source.encode([perm[d] for perm, d in zip(self.perms, digits)])
+
+
+STRATEGIES = {
+    "dfs": DFSStrategy,
+    "bfs": BFSStrategy,
+    "random": RandomStrategy,
+    "uncovered": UncoveredBranchFirst,
+    "assertion": AssertionDistance,
+}
+
+
+def make_strategy(name: str, seed: Optional[int] = None) -> SearchStrategy:
+    """Build a strategy from its command line name."""
+    if name not in STRATEGIES:
+        raise ValueError(f"unknown search strategy {name!r}, expected one of {', '.join(STRATEGIES)}")
+    if name == "random":
+        return RandomStrategy(seed)
+    return STRATEGIES[name]()
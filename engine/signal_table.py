@@ -0,0 +1,63 @@
+"""Elaboration-time table of the signals of every instance.
+
+`init_path_state` used to run the symbol DFS (`SymbolicDFS.dfs`) over every instance
+before every path, to rediscover the same variables, ports, nets and parameters. It then
+kept their declared widths in nested per-instance dicts (`manager.widths`), which every
+read of an unassigned signal and every assignment looked up with two `.get(..., {})`
+calls.
+
+A SignalTable is filled once, on the first path. Each (instance, signal) gets a dense
+integer id, in discovery order. The signal's declared width and its pyslang symbol, which
+`initial_term` needs for parameter values, are kept in arrays indexed by that id. Later
+paths seed their stores from the table without walking the design again.
+
+The per-path store stays keyed by signal name (see engine/store.py). The visitors resolve
+signals through their pyslang symbols' names while they run, so a slot array would trade
+one dict lookup for the same lookup plus an index."""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class SignalTable:
+    """Dense ids, declared widths and symbols of every (instance, signal)."""
+    __slots__ = ("ids", "names", "widths", "symbols")
+
+    def __init__(self):
+        # instance name -> signal name -> id
+        self.ids: Dict[str, Dict[str, int]] = {}
+        # indexed by id
+        self.names: List[Tuple[str, str]] = []
+        self.widths: List[int] = []
+        self.symbols: List[object] = []
+
+    def __contains__(self, instance: str) -> bool:
+        return instance in self.ids
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add_instance(self, instance: str, symbols: Dict[str, object], width_of) -> None:
+        """Record the signals of an instance (name -> pyslang symbol). width_of(symbol) gives
+        the declared width of each."""
+        ids = self.ids.setdefault(instance, {})
+        for name, symbol in symbols.items():
+            if name in ids:
+                continue
+            ids[name] = len(self.names)
+            self.names.append((instance, name))
+            self.widths.append(width_of(symbol))
+            self.symbols.append(symbol)
+
+    def signals(self, instance: str) -> Iterator[Tuple[str, object]]:
+        """(name, symbol) of every signal of an instance, in discovery order."""
+        symbols = self.symbols
+        return ((name, symbols[i]) for name, i in self.ids.get(instance, {}).items())
+
+    def id(self, instance: str, name: str) -> Optional[int]:
+        ids = self.ids.get(instance)
+        return ids.get(name) if ids is not None else None
+
+    def width(self, instance: str, name: str, default: Optional[int] = 32) -> Optional[int]:
+        """Declared width of a signal, default for one the table does not know."""
+        i = self.id(instance, name)
+        return self.widths[i] if i is not None else default
@@ -0,0 +1,204 @@
+"""Cone-of-influence slicing against the design's assertions.
+
+Only logic that can reach an assertion can change whether it holds. The slicer builds a
+fan-in graph over signals: an assignment makes its target depend on the identifiers of
+its right-hand side and of every condition guarding it (control dependence). Continuous
+assigns add the same edges, and instance port connections merge the port with the parent
+signals connected to it. The cone is everything reachable backwards from the signals
+(and guards) of the assertions.
+
+The slice is applied before CFGs are built. Always blocks that neither write a cone
+signal nor contain an assertion are dropped. Within the remaining blocks, statements
+outside the cone are left out of the CFG. An if/else or case statement none of whose
+arms matters disappears entirely, together with the paths it would have split into."""
+
+from typing import Dict, List, Set
+
+import pyslang as ps
+
+from .execution_manager import ExecutionManager
+from .dependencies import UnionFind, identifiers, lhs_name, block_writes, port_aliases
+from helpers.slang_helpers import (get_module_name, get_cond_expr, get_branches, get_case_item_body,
+                                   is_assertion_stmt)
+
+
+def own_members(module, class_name: str) -> list:
+    """Members of one class that belong to this instance only, not to its children."""
+    return [item for item in getattr(module, "body", None) or [] if item.__class__.__name__ == class_name]
+
+
+def own_always_blocks(module) -> list:
+    return [item.syntax for item in own_members(module, "ProceduralBlockSymbol") if getattr(item, "syntax", None) is not None]
+
+
+def contains_assertion(stmt) -> bool:
+    if stmt is None:
+        return False
+    if is_assertion_stmt(stmt):
+        return True
+    if isinstance(stmt, ps.BlockStatementSyntax):
+        return any(contains_assertion(sub) for sub in stmt.items)
+    if isinstance(stmt, ps.ConditionalStatementSyntax):
+        return any(contains_assertion(body) for body in get_branches(stmt))
+    if isinstance(stmt, ps.CaseStatementSyntax):
+        return any(contains_assertion(get_case_item_body(item)) for item in getattr(stmt, "items", []))
+    if isinstance(stmt, ps.ExpressionStatementSyntax):
+        return False
+    if hasattr(stmt, "statement"):
+        return contains_assertion(stmt.statement)
+    if hasattr(stmt, "__iter__") and not isinstance(stmt, ps.StatementSyntax):
+        return any(contains_assertion(sub) for sub in stmt)
+    return False
+
+
+class ConeOfInfluence:
+    """Fan-in cone of the assertions over every instance in `modules`."""
+
+    def __init__(self, modules):
+        self.aliases: UnionFind = port_aliases(modules)
+        # signal -> signals it reads, over alias roots
+        self.fanin: Dict[tuple, Set[tuple]] = {}
+        # alias roots referenced by assertions and their guards
+        self.seeds: Set[tuple] = set()
+        # every (instance, signal) seen, to map the cone back to names
+        self.signals: Set[tuple] = set()
+        self.assertions: list = []
+        # instance name -> its own name plus the names of every instance below it
+        self.subtree: Dict[str, List[str]] = {}
+        for module in modules:
+            name = get_module_name(module)
+            self.subtree[name] = self.instances_below(module)
+            for ab in own_always_blocks(module):
+                self.walk(name, ab, set())
+            for assign in own_members(module, "ContinuousAssignSymbol"):
+                self.continuous_assign(name, assign)
+            for item in getattr(module, "body", None) or []:
+                if is_assertion_stmt(item):
+                    self.assertion(name, getattr(item, "syntax", None) or item, set())
+        self.cone = self.closure()
+
+    def instances_below(self, module) -> List[str]:
+        names = [get_module_name(module)]
+        for child in own_members(module, "InstanceSymbol"):
+            names.extend(self.instances_below(child))
+        return names
+
+    def node(self, name: str, signal: str) -> tuple:
+        self.signals.add((name, signal))
+        return self.aliases.find((name, signal))
+
+    def depend(self, name: str, targets, reads) -> None:
+        read_nodes = {self.node(name, sig) for sig in reads}
+        for target in targets:
+            self.fanin.setdefault(self.node(name, target), set()).update(read_nodes)
+
+    def assertion(self, name: str, stmt, ctrl: Set[str]) -> None:
+        self.assertions.append(stmt)
+        self.seeds.update(self.node(name, sig) for sig in identifiers(stmt) | ctrl)
+
+    def continuous_assign(self, name: str, assign) -> None:
+        syntax = getattr(assign, "syntax", None)
+        left = getattr(syntax, "left", None)
+        target = lhs_name(left) if left is not None else None
+        if target is not None:
+            self.depend(name, [target], identifiers(getattr(syntax, "right", None)) | (identifiers(left) - {target}))
+        else:
+            # no left/right split available: every name may feed every other one
+            names = identifiers(syntax)
+            self.depend(name, names, names)
+
+    def walk(self, name: str, stmt, ctrl: Set[str]) -> None:
+        """Record the fan-in edges of one always block; ctrl holds the guarding identifiers."""
+        if stmt is None:
+            return
+        if is_assertion_stmt(stmt):
+            self.assertion(name, stmt, ctrl)
+        elif isinstance(stmt, ps.ExpressionStatementSyntax):
+            expr = stmt.expr
+            if expr.kind in (ps.SyntaxKind.AssignmentExpression, ps.SyntaxKind.NonblockingAssignmentExpression):
+                target = lhs_name(expr.left)
+                targets = [target] if target is not None else identifiers(expr.left)
+                # indices on the left are reads too
+                self.depend(name, targets, identifiers(expr.right) | (identifiers(expr.left) - set(targets)) | ctrl)
+            else:
+                # increments and task calls: whatever they write depends on everything they name
+                names = identifiers(stmt)
+                self.depend(name, names, names | ctrl)
+        elif isinstance(stmt, ps.BlockStatementSyntax):
+            for sub in stmt.items:
+                self.walk(name, sub, ctrl)
+        elif isinstance(stmt, ps.ConditionalStatementSyntax):
+            guarded = ctrl | identifiers(get_cond_expr(stmt))
+            for body in get_branches(stmt):
+                self.walk(name, body, guarded)
+        elif isinstance(stmt, ps.CaseStatementSyntax):
+            guarded = ctrl | identifiers(getattr(stmt, "expr", None))
+            for item in getattr(stmt, "items", []):
+                for expr in getattr(item, "expressions", None) or []:
+                    guarded = guarded | identifiers(expr)
+            for item in getattr(stmt, "items", []):
+                self.walk(name, get_case_item_body(item), guarded)
+        elif stmt.__class__.__name__ in ("TimingControlStatementSyntax", "ProceduralBlockSyntax"):
+            self.walk(name, getattr(stmt, "statement", None), ctrl)
+        elif hasattr(stmt, "statement"):
+            # loops: the header (bounds, loop variable) guards every iteration of the body
+            body = stmt.statement
+            header = identifiers(stmt) - identifiers(body)
+            self.walk(name, body, ctrl | header)
+        elif hasattr(stmt, "__iter__") and not isinstance(stmt, ps.StatementSyntax):
+            for sub in stmt:
+                self.walk(name, sub, ctrl)
+
+    def closure(self) -> Dict[str, Set[str]]:
+        """Instance name -> names of its signals in the cone."""
+        reached = set(self.seeds)
+        work = list(reached)
+        while work:
+            for src in self.fanin.get(work.pop(), ()):
+                if src not in reached:
+                    reached.add(src)
+                    work.append(src)
+        cone: Dict[str, Set[str]] = {}
+        for name, signal in self.signals:
+            if self.aliases.find((name, signal)) in reached:
+                cone.setdefault(name, set()).add(signal)
+        return cone
+
+    def names_for(self, name: str) -> Set[str]:
+        """Cone signals an always block listed under `name` may write. `CFG.get_always_sv` also
+        lists the always blocks of child instances, so their cones are included too."""
+        names = set()
+        for inst in self.subtree.get(name, [name]):
+            names |= self.cone.get(inst, set())
+        return names
+
+    def relevant(self, name: str, stmt) -> bool:
+        """False for statements that can be sliced away."""
+        if stmt is None:
+            return False
+        if contains_assertion(stmt):
+            return True
+        if isinstance(stmt, ps.ExpressionStatementSyntax) and stmt.expr.kind not in (
+                ps.SyntaxKind.AssignmentExpression, ps.SyntaxKind.NonblockingAssignmentExpression):
+            # $display and friends do not matter; other calls and increments are kept if they name a cone signal
+            if str(stmt).lstrip().startswith("$"):
+                return False
+            return bool(identifiers(stmt) & self.names_for(name))
+        if isinstance(stmt, (ps.ExpressionStatementSyntax, ps.BlockStatementSyntax, ps.ConditionalStatementSyntax,
+                             ps.CaseStatementSyntax)) or hasattr(stmt, "statement"):
+            return bool(block_writes(stmt, set()) & self.names_for(name))
+        # declarations and anything not understood stay
+        return True
+
+    def keep(self, name: str):
+        """Predicate handed to CFG.keep for the always blocks of one module."""
+        return lambda stmt: self.relevant(name, stmt)
+
+
+def slice_always_blocks(manager: ExecutionManager, cone: ConeOfInfluence, name: str, always_blocks: list) -> list:
+    """The always blocks of `name` that touch the cone; records them in manager.blocks_of_interest."""
+    kept = [ab for ab in always_blocks if cone.relevant(name, ab)]
+    manager.blocks_of_interest.extend((name, ab) for ab in kept)
+    if len(kept) < len(always_blocks):
+        print(f"Slicing {name}: {len(always_blocks) - len(kept)} of {len(always_blocks)} always blocks are outside the cone")
+    return kept
@@ -0,0 +1,138 @@
+"""Per-conditional ITE merging of mux-style if/else statements.
+
+`CFG.build_cfg` splits every if/else into two paths, so an always block with k independent
+if/else statements yields 2^k paths even when each arm only assigns a register or two.
+With merging, such a conditional stays a single CFG node (a MergedConditional). When it
+is executed, both arms run on a copy of the store, and every signal whose value differs
+afterwards is set to the term `If(cond, then_value, else_value)`. Each conditional is
+merged on its own, right where it is executed. Paths that split elsewhere in the CFG
+(case statements, unmerged if/else) are not joined back together.
+
+Merging is adaptive. An always block is only merged when splitting would give more than
+`merge_paths` paths. Within such a block, a conditional is merged only when its arms are
+plain assignments (or nested mergeable if/else statements) totalling at most `merge_size`
+tokens. Everything else (case statements, loops, assertions, big arms) is split as before,
+so assertions keep their exact path conditions."""
+
+from __future__ import annotations
+import pyslang as ps
+from z3 import If
+
+from .execution_manager import ExecutionManager
+from .symbolic_state import SymbolicState
+from helpers.slang_helpers import get_cond_expr, get_branches, case_arms
+from helpers.rvalue_to_z3 import z3_to_bool, store_value_to_z3, match_widths, same_term, fresh_term
+
+
+class MergedConditional:
+    """CFG node for an if/else whose arms are merged instead of split."""
+    __slots__ = ("stmt",)
+
+    def __init__(self, stmt):
+        self.stmt = stmt
+
+    def __str__(self):
+        return f"merged {self.stmt}"
+
+
+def is_assignment_stmt(stmt) -> bool:
+    return isinstance(stmt, ps.ExpressionStatementSyntax) and stmt.expr.kind in (
+        ps.SyntaxKind.AssignmentExpression, ps.SyntaxKind.NonblockingAssignmentExpression)
+
+
+def arm_size(stmt):
+    """Number of tokens in an arm, or None if the arm cannot be merged."""
+    if stmt is None:
+        return 0
+    if is_assignment_stmt(stmt):
+        return len(str(stmt).split())
+    if isinstance(stmt, ps.BlockStatementSyntax):
+        total = 0
+        for sub in stmt.items:
+            size = arm_size(sub)
+            if size is None:
+                return None
+            total += size
+        return total
+    if isinstance(stmt, ps.ConditionalStatementSyntax):
+        return conditional_size(stmt)
+    return None
+
+
+def conditional_size(stmt):
+    """Token count of an if/else and its arms, or None if it has to be split."""
+    if get_cond_expr(stmt) is None:
+        return None
+    then_body, else_body = get_branches(stmt)
+    then_size = arm_size(then_body)
+    else_size = arm_size(else_body)
+    if then_size is None or else_size is None:
+        return None
+    return 1 + then_size + else_size
+
+
+def is_mergeable(stmt, max_size: int) -> bool:
+    size = conditional_size(stmt)
+    return size is not None and size <= max_size
+
+
+def count_block_paths(stmt) -> int:
+    """Number of paths splitting would give, counted on the syntax tree."""
+    if stmt is None:
+        return 1
+    if isinstance(stmt, ps.BlockStatementSyntax):
+        total = 1
+        for sub in stmt.items:
+            total *= count_block_paths(sub)
+        return total
+    if isinstance(stmt, ps.ConditionalStatementSyntax):
+        then_body, else_body = get_branches(stmt)
+        return count_block_paths(then_body) + count_block_paths(else_body)
+    if isinstance(stmt, ps.CaseStatementSyntax):
+        return sum(count_block_paths(body) for _, body in case_arms(stmt))
+    if stmt.__class__.__name__ in ("TimingControlStatementSyntax", "ProceduralBlockSyntax"):
+        return count_block_paths(getattr(stmt, "statement", None))
+    return 1
+
+
+def run_arm(visitor, m: ExecutionManager, s: SymbolicState, modules, stmt) -> None:
+    if stmt is None:
+        return
+    if isinstance(stmt, ps.BlockStatementSyntax):
+        for sub in stmt.items:
+            run_arm(visitor, m, s, modules, sub)
+    elif isinstance(stmt, ps.ConditionalStatementSyntax):
+        merge_conditional(visitor, m, s, modules, stmt)
+    else:
+        visitor.visit_stmt(m, s, stmt, modules, None)
+
+
+def merge_conditional(visitor, m: ExecutionManager, s: SymbolicState, modules, stmt) -> None:
+    """Run both arms of an if/else and join the stores with ITE terms."""
+    if m.ignore:
+        return
+    m.branch_count += 1
+    cond = z3_to_bool(visitor.expr_to_z3(m, s, get_cond_expr(stmt)))
+    then_body, else_body = get_branches(stmt)
+    store = s.store[m.curr_module]
+    before = dict(store)
+
+    run_arm(visitor, m, s, modules, then_body)
+    then_store = dict(store)
+    store.clear()
+    store.update(before)
+    run_arm(visitor, m, s, modules, else_body)
+
+    for signal in set(then_store) | set(store):
+        then_value = then_store.get(signal)
+        else_value = store.get(signal)
+        if same_term(then_value, else_value):
+            continue
+        then_term = store_value_to_z3(then_value) if then_value is not None else None
+        else_term = store_value_to_z3(else_value) if else_value is not None else None
+        # a signal first seen in one arm is unconstrained on the other
+        if then_term is None:
+            then_term = fresh_term(m, signal, else_term.size())
+        if else_term is None:
+            else_term = fresh_term(m, signal, then_term.size())
+        store[signal] = If(cond, *match_widths(then_term, else_term))
@@ -0,0 +1,88 @@
+"""Copy-on-write symbolic store, forked in O(1).
+
+`SymbolicState.store` maps an instance name to a dict from signal name to its term. The
+executors that resume from a saved state (the prefix-sharing trie, the forking worklist)
+used to snapshot it as `{name: dict(signals) ...}`, a copy of every signal of every
+instance, although an always block only touches the instance it belongs to. On designs
+like or1200, with thousands of signals, most of that copying was wasted.
+
+A Store is chunked per instance. `fork()` only hands the same per-instance dicts to a new
+Store and is O(1), however many signals there are. Either side copies an instance's dict
+the first time it is looked up after the fork, with one C-level `dict` copy, and owns it
+from then on. So a path pays for the instances it touches, once, and the dicts it gets
+back are plain dicts: the visitors keep reading and writing `store[instance][signal]` at
+dict speed. Instances a path never touches stay shared by every snapshot.
+
+Iterating with `items()`/`values()` hands out the dicts without copying them. Those are
+for reading (printing, digests, counterexamples); write through `store[instance]`."""
+
+from collections.abc import MutableMapping
+
+
+class Store(MutableMapping):
+    """instance name -> {signal name: term}, copied per instance on first access after a fork."""
+    __slots__ = ("_modules", "_owned")
+
+    def __init__(self, modules=None):
+        self._modules = dict(modules) if modules else {}
+        # instances whose dict belongs to this store alone, None while the instance table
+        # itself is still shared with a fork
+        self._owned = set(self._modules)
+
+    def fork(self) -> "Store":
+        """A store with the same contents. Neither side sees the other's later writes."""
+        other = Store.__new__(Store)
+        other._modules = self._modules
+        other._owned = None
+        self._owned = None
+        return other
+
+    def _own(self, name: str) -> dict:
+        if self._owned is None:
+            self._modules = dict(self._modules)
+            self._owned = set()
+        signals = self._modules[name]
+        if name not in self._owned:
+            signals = self._modules[name] = dict(signals)
+            self._owned.add(name)
+        return signals
+
+    def __getitem__(self, name: str) -> dict:
+        if self._owned is not None and name in self._owned:
+            return self._modules[name]
+        return self._own(name)
+
+    def __setitem__(self, name: str, signals: dict) -> None:
+        if self._owned is None:
+            self._modules = dict(self._modules)
+            self._owned = set()
+        self._modules[name] = signals
+        self._owned.add(name)
+
+    def __delitem__(self, name: str) -> None:
+        if self._owned is None:
+            self._modules = dict(self._modules)
+            self._owned = set()
+        del self._modules[name]
+        self._owned.discard(name)
+
+    def __contains__(self, name) -> bool:
+        return name in self._modules
+
+    def __iter__(self):
+        return iter(self._modules)
+
+    def __len__(self) -> int:
+        return len(self._modules)
+
+    def get(self, name, default=None):
+        return self[name] if name in self._modules else default
+
+    def items(self):
+        return self._modules.items()
+
+    def values(self):
+        return self._modules.values()
+
+    def __repr__(self) -> str:
+        return repr(self._modules)
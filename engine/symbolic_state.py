@@ -3,43 +3,49 @@ are some other methods here that may be helpful, too."""
 
 import z3
 from z3 import Solver, Int, BitVec, BitVecSort
+from helpers.utils import SYMBOL
+from .store import Store
+
 
 class SymbolicState:
-    pc = Solver()
-    assertion_counter = 0
-    sort = BitVecSort(32)
-    clock_cycle: int = 0
-    #TODO need to change to be a nested mapping of module names to dictionaries
-    # can be initalized at the beginning of the run 
-    store = {}
+    def __init__(self):
+        self.pc = Solver()
+        self.assertion_counter = 0
+        self.sort = BitVecSort(32)
+        self.clock_cycle: int = 0
+        # instance name -> {signal name: term}, forked copy-on-write (see engine/store.py)
+        self.store = Store()
+        # variable reference -> (instance name or None for the current one, signal name)
+        self.refs = {}
 
-    # set to true when evaluating a conditoin so that
-    # evaluating the expression knows to add the expr to the
-    # PC, set to false after
-    cond: bool = False
+        # set to true when evaluating a conditoin so that
+        # evaluating the expression knows to add the expr to the
+        # PC, set to false after
+        self.cond: bool = False
 
     def get_symbolic_expr(self, module_name: str, var_name: str) -> str:
         """Just looks up a symbolic expression associated with a specific variable name
         in that particular module."""
-        if '[' in var_name:
-            name = var_name.split("[")[0]
-            return self.store[module_name][name]
-        elif '.' in var_name:
-            real_module_name = var_name.split(".")[0]
-            real_var_name = var_name.split(".")[1]
-            return self.store[real_module_name][real_var_name]
-        return self.store[module_name][var_name]
+        ref = self.refs.get(var_name)
+        if ref is None:
+            # split once per distinct reference: x[3] is x, u0.x is x of instance u0
+            if '[' in var_name:
+                ref = (None, var_name.split("[")[0])
+            elif '.' in var_name:
+                parts = var_name.split(".")
+                ref = (parts[0], parts[1])
+            else:
+                ref = (None, var_name)
+            self.refs[var_name] = ref
+        return self.store[ref[0] or module_name][ref[1]]
 
     def get_symbols(self):
         """Returns a list of all the symbols present in the symbolic state.
         This is useful in the parsing to z3 phase because we need to know what symbols to declare as constants."""
-        symbols_list = []
-        for module in self.store:
-            for signal in self.store[module]:
-                symbolic_expression = self.store[module][signal]
-                symbols_list += symbolic_expression.split(" ")
         res = []
-        for sym in symbols_list:
-            if sym.isalnum():
-                res.append(sym)
+        for signals in self.store.values():
+            for value in signals.values():
+                for sym in SYMBOL.findall(str(value)):
+                    if sym not in res:
+                        res.append(sym)
         return res
@@ -0,0 +1,91 @@
+"""Treatment of `?:` expressions: one If term, or a path split (`--ternary_mode`).
+
+`conjunction_with_pointers` used to render a ternary right-hand side as an infix string,
+and nothing decided how a mux affected exploration. The expression translator now encodes
+every ternary as a Z3 `If` over both sides (`parse_expr_to_Z3`), and an assignment of one
+stores that term. That is the `ite` mode, the default: mux-heavy datapaths such as the
+aes cores stay at one path per block.
+
+In the `split` mode, for coverage-oriented runs, the CFG builder lowers an assignment
+whose right-hand side is a ternary, `x = c ? a : b`, into a branch: a TernaryBranch node
+that checks `c` (direction 1) or `!c` (direction 0), followed by one TernaryArm node per
+side that assigns it to `x`. Chained ternaries (`c1 ? a : c2 ? b : d`) split once per
+condition. The arms join again after the assignment, so the rest of the block runs on every
+arm. Ternaries nested inside other expressions are still encoded as If terms."""
+
+import pyslang as ps
+from z3 import Not
+
+from .execution_manager import ExecutionManager
+from .symbolic_state import SymbolicState
+from helpers.rvalue_to_z3 import ternary_parts, z3_to_bool, cached_solve
+from helpers.slang_helpers import assign_term
+
+TERNARY_MODES = ("ite", "split")
+
+
+class TernaryBranch:
+    """CFG node splitting the path on the condition of a ternary assigned to `target`."""
+    __slots__ = ("target", "expr")
+
+    def __init__(self, target: str, expr):
+        self.target = target
+        self.expr = expr
+
+    def __str__(self):
+        return f"split {self.target} = {self.expr}"
+
+
+class TernaryArm:
+    """CFG node assigning the side of a split ternary taken on this path to `target`."""
+    __slots__ = ("target", "value")
+
+    def __init__(self, target: str, value):
+        self.target = target
+        self.value = value
+
+    def __str__(self):
+        return f"{self.target} = {self.value}"
+
+
+def ternary_assignment(stmt):
+    """(target name, ternary) of an assignment statement `x = c ? a : b` (blocking or not,
+    syntax or semantic), or None."""
+    expr = getattr(stmt, "expr", None)
+    if expr is None:
+        return None
+    if isinstance(stmt, ps.ExpressionStatementSyntax):
+        if expr.kind not in (ps.SyntaxKind.AssignmentExpression, ps.SyntaxKind.NonblockingAssignmentExpression) \
+                or not hasattr(expr.left, "identifier"):
+            return None
+        target = expr.left.identifier.value
+    elif stmt.kind == ps.StatementKind.ExpressionStatement:
+        if expr.kind != ps.ExpressionKind.Assignment or getattr(expr.left, "symbol", None) is None:
+            return None
+        target = expr.left.symbol.name
+    else:
+        return None
+    return (target, expr.right) if ternary_parts(expr.right) is not None else None
+
+
+def run_ternary_node(visitor, m: ExecutionManager, s: SymbolicState, node, direction) -> None:
+    """Execute a TernaryBranch (check the side taken, abandon the path if it is infeasible)
+    or a TernaryArm (assign that side)."""
+    if m.ignore:
+        return
+    if isinstance(node, TernaryArm):
+        assign_term(m, s, node.target, visitor.expr_to_z3(m, s, node.value))
+        return
+    m.branch_count += 1
+    cond_expr = ternary_parts(node.expr)[0]
+    cond = z3_to_bool(visitor.expr_to_z3(m, s, cond_expr))
+    taken = cond if direction else Not(cond)
+    visitor.branch = bool(direction)
+    s.pc.push()
+    s.assertion_counter += 1
+    s.pc.assert_and_track(taken, f"p{s.assertion_counter}")
+    feasible = cached_solve(m, s.pc)
+    s.pc.pop()
+    if not feasible:
+        m.abandon = True
+        m.ignore = True
@@ -4,12 +4,12 @@ Z3 expressions and solving for assertion violations."""
 import z3
 from z3 import Solver, Int, BitVec, Context, BitVecSort, ExprRef, BitVecRef, If, BitVecVal, And, IntVal, Int2BV, Or, Not, ULT, UGT, Z3Exception, BoolRef
 from z3 import is_and, is_app_of, Z3_OP_EXTRACT, is_eq, is_distinct
-from helpers.rvalue_parser import parse_tokens, tokenize
+from helpers.utils import canonicalize
 from engine.execution_manager import ExecutionManager
 from engine.symbolic_state import SymbolicState
 import pyslang as ps
-import networkx as nx
 import ast
+import hashlib
 from copy import deepcopy
 
 
@@ -20,215 +20,6 @@ op_map = {"Plus": "+", "Minus": "-", "Power": "**", "Times": "*", "Divide": "/",
 "Sra": ">>", "LessThan": "<", "GreaterThan": ">", "LessEq": "<=", "GreaterEq": ">=", "Eq": "=", "NotEq": "!=", "Eql": "===", "NotEql": "!==",
 "And": "&", "Xor": "^", "Xnor": "<->", "Land": "&&", "Lor": "||"}
 
-class Z3Visitor():
-    def __init__(self, prefix):
-        """Constructor that sets the prefix for variable names."""
-        self.prefix = prefix
-        print("prefix", prefix)
-        #self.visited_nodes = set() 
-
-    def visit(self, node):
-        """A visitor that processes the node to generate Z3 expressions."""
-        print(f"Visiting node: {node}") 
-        print(f"Visiting node Type: {type(node)}")  
-        if isinstance(node, ps.Token):
-            result = self.handle_token(node)
-        elif isinstance(node, ps.IdentifierNameSyntax):
-            result = self.handle_identifier(node)
-        elif isinstance(node, ps.IdentifierSelectNameSyntax):
-            result = self.handle_identifier_select_name(node)
-        elif isinstance(node, ps.ElementSelectSyntax):
-            result = self.handle_element_select(node)
-        elif isinstance(node, ps.BinaryExpressionSyntax):
-            result = self.handle_binary_expression(node)
-        elif isinstance(node, ps.ParenthesizedExpressionSyntax):
-            result = self.handle_parenthesized_expression(node)
-            print("result", type(result))
-        elif isinstance(node, ps.LiteralExpressionSyntax):
-            result = self.handle_literal_expression(node)
-        elif isinstance(node, ps.BitSelectSyntax):
-            result = self.handle_bit_select(node)
-        elif isinstance(node, ps.ScopedNameSyntax):
-            result = self.handle_scoped_name(node)
-        elif isinstance(node, ps.IntegerVectorExpressionSyntax):
-            result = self.handle_integer_vector_expression(node)
-        elif isinstance(node, ps.PrefixUnaryExpressionSyntax):
-            result = self.handle_prefix_unary_expression(node)
-        else:
-            print(f"Unhandled syntax: {type(node)}")
-            return None
-        print(result)
-        if isinstance(result, ps.VisitAction):
-            print(f"Encountered VisitAction: {result}")
-            return None  
-        return result
-
-    def handle_integer_vector_expression(self, node):
-        """Handle integer vector expressions."""
-        print(f"Handling IntegerVectorExpression: {node}")
-        
-        print("Attributes of the node:", dir(node))
-
-        if hasattr(node, 'value'):
-            value = node.value  
-            print(f"Value of the IntegerVectorExpression: {value}")
-            return BitVecVal(int(str(value)), 32)  #
-
-        elif hasattr(node, 'size'):
-            size = node.size 
-            print(f"Size of the IntegerVectorExpression: {size}")
-            return BitVecVal(int(str(size)), 32)  
-        return None   
-
-    def handle_identifier(self, node):
-        """Handle identifiers."""
-        print(f"Handling identifier: {str(node.identifier)}")
-        variable = str(node.identifier)
-        return BitVec(variable, 32)
-    
-    def handle_identifier_select_name(self, node):
-        """Handle indexed or array accesses like 'match[i]'."""
-        print(f"Handling identifier select: {str(node.identifier)}[{node.selectors}]")
-        
-        # Extract the identifier ('match' or 'conf_i')
-        identifier = str(node.identifier)
-        
-        # Get the index, assuming it's the first selector for example  'match[i]', i will be the selector)
-        index_expr = self.visit(node.selectors[0])  
-        print("index_expr",type(index_expr))
-        index_val = int(str(index_expr))  
-        variable = f"{identifier}[{index_val}]" 
-        print("Fully Verified Variable:", variable)
-        return BitVec(variable, 32)
- 
-    def handle_scoped_name(self, node):
-            """Handle scoped names, including indexed names like conf_i[i].locked."""
-            print(f"Handling scoped name: {node}")
-            
-            if str(node.separator) == "::":
-                # Scoped names like riscv::PRIV_LVL_M
-                scoped_name = str(node)
-                return BitVec(scoped_name, 32)
-            
-            elif str(node.separator) == ".":
-                # Field access like conf_i[i].locked
-                # First, handle the base (conf_i[i])
-                base = self.visit(node.left)  # Conf_i[i]
-                print("base",base)
-                # Then handle the field (locked)
-                field = str(node.right)  # Field access (locked)
-                variable= str(f"{base}[{field}]")
-                return BitVec(variable, 32)
-
-    def handle_element_select(self, node):
-        """Handle element selection like structs and arrays."""
-        print(f"Handling element select: {node}")
-        element = self.visit(node.selector)  
-        return element
-    
-
-    def handle_bit_select(self, node):
-        """Handle bit select expressions like 'match[i]'."""
-        print(f"Handling bit select expression: {node}")
-
-       
-        return BitVec(f"{node}", 32)
-
-    def handle_literal_expression(self, node):
-        """Handle literal expressions."""
-        print(f"Handling literal expression: {node}")
-        literal_value = node  
-        if literal_value == 0:
-            return BitVecVal(0, 32)  
-        return BitVecVal(int(str(literal_value)), 32)  
-
-    def convert_bitvec_to_bool(self, bitvec_expr):
-        """Converts a BitVec expression to a Boolean (True if non-zero, False if zero)."""
-        return UGT(bitvec_expr, BitVecVal(0, 32))
-
-    def handle_prefix_unary_expression(self, node):
-        """Handle prefix unary expressions (like NOT)."""
-        print(f"Handling prefix unary expression: {node}")
-        operator = str(node.operatorToken).strip()
-        operand = self.visit(node.operand)
-        if operator == "!":
-            return Not(operand)
-        elif operator == "-":
-            return -operand
-        else:
-            print(f"Unsupported unary operator: {operator}")
-            raise ValueError(f"Unsupported unary operator: {operator}")
-
-
-    def handle_binary_expression(self, node):
-        """Handle binary expressions (AND, OR, equality, etc.)."""
-        print(f"Handling binary expression: {node.operatorToken}")
-        left_expr = self.visit(node.left)
-        print("done")
-        right_expr = self.visit(node.right)
-        print("done2")
-        operator = str(node.operatorToken).strip()
-
-        # issue
-        print((left_expr))
-        print(node.left)
-        if str(left_expr.sort()) == "Bool" and str(right_expr.sort()) != "Bool":
-            right_expr = UGT(right_expr, BitVecVal(0, 32)) 
-            print(f"Converted Right Expression to Bool: {right_expr}")
-
-        print(operator)
-        print(node.left)
-        print(node.right)
-        print(left_expr.sort())
-        print(right_expr.sort())
-        if operator == "==":
-            return left_expr == right_expr
-        elif operator == "!=":
-            return left_expr != right_expr
-        elif operator == "&&":
-            return And(left_expr, right_expr)
-        elif operator == "||":
-            return Or(left_expr, right_expr)
-        elif operator == ">":
-            return UGT(left_expr, right_expr) 
-        elif operator == "<":
-            return ULT(left_expr, right_expr) 
-        elif isinstance(left_expr, BitVecRef) and isinstance(right_expr, BitVecRef):
-            return UGT(left_expr, BitVecVal(0, 32)) == right_expr
-        
-        else:
-            print(f"Unsupported binary operator: {operator}")
-            raise ValueError(f"Unsupported binary operator: {operator}")
-
-
-    def handle_parenthesized_expression(self, node):
-        """Handle parenthesized expressions."""
-        print("Handling parenthesized expression.")
-        return (self.visit(node.expression))
-    
-    def get_full_variable_name(self,variable):
-        """Generate the full variable name by appending the variable to the prefix."""
-        return f"{self.prefix}.{variable}"
-    
-def pyslang_to_z3(expr, prefix=""):
-    """Parse the expression and convert it into a Z3 expression."""
-    print(f"Parsing expression: {expr}")
-    syntax_tree = ps.SyntaxTree.fromText(expr)
-    root = syntax_tree.root
-    visitor = Z3Visitor(prefix)
-    z3_expression = visitor.visit(root)    
-    return z3_expression
-
-
-def get_constants_list(new_constraint, s: SymbolicState, m: ExecutionManager):
-    """Get list of constants that need to be added to z3 context from symbolic expressions."""
-    res = []
-    words = new_constraint.split(" ")
-    for word in words:
-        if word in s.store[m.curr_module].values():
-            res.append(word)
-    return res
-
 def parse_concat_to_Z3(concat, s: SymbolicState, m: ExecutionManager):
     """Takes a concatenation of symbolic symbols areturns the list of bitvectors"""
     res = []
@@ -238,6 +29,186 @@ def parse_concat_to_Z3(concat, s: SymbolicState, m: ExecutionManager):
     return res
 
 
+def constant_value(e):
+    """Integer value of a semantic expression pyslang folded to a constant (or of a parameter
+    reference), None otherwise."""
+    # imported here: engine.loop_unroll imports the helpers that import this module
+    from engine.loop_unroll import constant_int
+    constant = getattr(e, "constant", None)
+    if constant is None and e.kind == ps.ExpressionKind.NamedValue:
+        symbol = getattr(e, "symbol", None)
+        if symbol is not None and symbol.kind == ps.SymbolKind.Parameter:
+            constant = symbol.value
+    return constant_int(constant)
+
+def ternary_parts(e):
+    """(condition, if-true, if-false) of a `c ? a : b` expression, syntax or semantic, looking
+    through parentheses and implicit conversions. None for any other expression."""
+    while e is not None:
+        if e.__class__.__name__ == "ParenthesizedExpressionSyntax":
+            e = getattr(e, "expression", None)
+        elif getattr(e, "kind", None) == ps.ExpressionKind.Conversion:
+            e = getattr(e, "operand", None)
+        else:
+            break
+    if e is None:
+        return None
+    if e.__class__.__name__ != "ConditionalExpressionSyntax" and getattr(e, "kind", None) != ps.ExpressionKind.ConditionalOp:
+        return None
+    # ConditionalExpressionSyntax keeps its conditions in .predicate, ConditionalOp in .conditions
+    predicate = getattr(e, "predicate", None)
+    conditions = getattr(predicate, "conditions", None) or getattr(e, "conditions", None)
+    cond = next(iter(conditions)).expr if conditions else predicate
+    return cond, getattr(e, "left", None), getattr(e, "right", None)
+
+def as_bitvec(e):
+    """A bit-vector for an expression value: Bools become 1 bit, Python ints 32-bit constants."""
+    if isinstance(e, BoolRef):
+        return If(e, BitVecVal(1, 1), BitVecVal(0, 1))
+    if isinstance(e, int):
+        return BitVecVal(e, 32)
+    return e
+
+def fit(e, width):
+    """e truncated or zero-extended to width bits, as an assignment to a width-bit signal does."""
+    e = as_bitvec(e)
+    if width is None or not isinstance(e, BitVecRef):
+        return e
+    if e.size() < width:
+        return z3.ZeroExt(width - e.size(), e)
+    if e.size() > width:
+        return z3.Extract(width - 1, 0, e)
+    return e
+
+def match_widths(a, b):
+    """Operands of a binary operator, the narrower bit-vector zero-extended to the other's width.
+    Two Bools are left alone."""
+    if isinstance(a, BoolRef) and isinstance(b, BoolRef):
+        return a, b
+    a, b = as_bitvec(a), as_bitvec(b)
+    if isinstance(a, BitVecRef) and isinstance(b, BitVecRef):
+        width = max(a.size(), b.size())
+        return fit(a, width), fit(b, width)
+    return a, b
+
+def signal_width(symbol) -> int:
+    """Declared width of a pyslang symbol or semantic expression, 32 when it has none."""
+    width = getattr(getattr(symbol, "type", None), "bitWidth", None)
+    return width if isinstance(width, int) and width > 0 else 32
+
+def literal_width(text: str) -> int:
+    """Width of a Verilog integer literal: the size of 8'hFF, 32 for unsized ones."""
+    size = text.split("'")[0].strip() if "'" in text else ""
+    return int(size) if size.isdigit() and int(size) > 0 else 32
+
+def fresh_term(m: ExecutionManager, name: str, width: int = 32):
+    """A fresh unconstrained bit-vector of the given width for signal name, named after it, its
+    instance and the cycle (ExecutionManager.symbol_name)."""
+    return BitVec(m.symbol_name(name), width)
+
+def initial_term(m: ExecutionManager, symbol):
+    """Store entry a signal starts with: the value of a parameter, a fresh term of the declared
+    width otherwise."""
+    width = signal_width(symbol)
+    if symbol.kind == ps.SymbolKind.Parameter:
+        from engine.loop_unroll import constant_int
+        value = constant_int(symbol.value)
+        if value is not None:
+            return BitVecVal(value, width)
+    return fresh_term(m, symbol.name, width)
+
+def same_term(a, b) -> bool:
+    """Structural equality of two store entries."""
+    if isinstance(a, ExprRef) and isinstance(b, ExprRef):
+        return a.eq(b)
+    return type(a) == type(b) and a == b
+
+def signal_term(s: SymbolicState, m: ExecutionManager, name: str, module: str = None):
+    """Z3 term of a signal's store entry. A signal without one is seeded with a fresh term of
+    its declared width, named like every other fresh symbol, so later reads see the same one."""
+    module = module or m.curr_module
+    store = s.store.setdefault(module, {})
+    value = store.get(name)
+    if value is None:
+        value = store[name] = BitVec(m.symbol_name(name, module), m.signals.width(module, name))
+    return store_value_to_z3(value)
+
+def assigned_term(m: ExecutionManager, name: str, term):
+    """term fitted to the declared width of the signal it is assigned to."""
+    return fit(term, m.signals.width(m.curr_module, name, None))
+
+def constant_index(term):
+    """Integer value of a term that simplifies to a constant, None otherwise."""
+    term = z3.simplify(as_bitvec(term))
+    return term.as_long() if z3.is_bv_value(term) else None
+
+def select_to_Z3(e, s: SymbolicState, m: ExecutionManager):
+    """Bit select x[i] (constant or not) and part selects x[h:l], x[b+:w], x[b-:w] with
+    constant bounds, as Extracts of the selected value."""
+    base = as_bitvec(parse_expr_to_Z3(getattr(e, "left", None) or e.value, s, m))
+    selector = getattr(getattr(e, "select", None), "selector", None) or getattr(e, "selector", None)
+    if selector is None or not isinstance(base, BitVecRef):
+        return base
+    size = base.size()
+    if hasattr(selector, "expr"):
+        index = as_bitvec(parse_expr_to_Z3(selector.expr, s, m))
+        constant = constant_index(index)
+        if constant is None:
+            return z3.Extract(0, 0, z3.LShR(base, fit(index, size)))
+        return z3.Extract(constant, constant, base) if constant < size else BitVecVal(0, 1)
+    left = constant_index(parse_expr_to_Z3(selector.left, s, m))
+    right = constant_index(parse_expr_to_Z3(selector.right, s, m))
+    if left is None or right is None:
+        # a part select with variable bounds: the whole value, an over-approximation of its width
+        return base
+    op = str(getattr(selector, "range", ":")).strip()
+    if op == "+:":
+        msb, lsb = left + right - 1, left
+    elif op == "-:":
+        msb, lsb = left, left - right + 1
+    else:
+        msb, lsb = max(left, right), min(left, right)
+    if lsb < 0 or msb >= size:
+        return base
+    return z3.Extract(msb, lsb, base)
+
+def concat_to_Z3(e, s: SymbolicState, m: ExecutionManager):
+    """{a, b, ...}: the operands side by side, the first one in the high bits."""
+    parts = [as_bitvec(parse_expr_to_Z3(x, s, m)) for x in e.expressions]
+    parts = [x for x in parts if isinstance(x, BitVecRef)]
+    if not parts:
+        return BitVecVal(0, 32)
+    return parts[0] if len(parts) == 1 else z3.Concat(*parts)
+
+def unary_to_Z3(op: str, operand):
+    """A prefix operator (logical, bitwise or reduction) applied to a term."""
+    if op == "!":
+        return Not(z3_to_bool(operand))
+    operand = as_bitvec(operand)
+    if op == "~":
+        return ~operand
+    if op == "-":
+        return -operand
+    if op == "+":
+        return operand
+    ones = BitVecVal(-1, operand.size())
+    reductions = {"&": operand == ones, "~&": operand != ones, "|": operand != 0, "~|": operand == 0}
+    if op in reductions:
+        return as_bitvec(reductions[op])
+    if op in ("^", "~^", "^~"):
+        parity = z3.Extract(0, 0, operand)
+        for bit in range(1, operand.size()):
+            parity = parity ^ z3.Extract(bit, bit, operand)
+        return parity if op == "^" else ~parity
+    print(f"[Warning] Unhandled unary operator: {op}")
+    return operand
+
+def ternary_to_Z3(e, s: SymbolicState, m: ExecutionManager):
+    """One If term for a `c ? a : b` expression: both sides are kept and the path is not split."""
+    cond, if_true, if_false = ternary_parts(e)
+    if_true, if_false = match_widths(as_bitvec(parse_expr_to_Z3(if_true, s, m)), as_bitvec(parse_expr_to_Z3(if_false, s, m)))
+    return If(z3_to_bool(parse_expr_to_Z3(cond, s, m)), if_true, if_false)
+
 def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManager):
     """Converts a Verilog Expression to a Z3 expression.
 
@@ -264,10 +235,19 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
     if hasattr(e, 'kind'):
         kind = e.kind
 
+        # elaboration-time constants (parameters, constant subexpressions) fold to literals
+        if isinstance(kind, ps.ExpressionKind):
+            folded = constant_value(e)
+            if folded is not None:
+                return BitVecVal(folded, signal_width(e))
+
+        # Handle ConditionalOp semantic expressions (c ? a : b)
+        if kind == ps.ExpressionKind.ConditionalOp:
+            return ternary_to_Z3(e, s, m)
+
         # Handle BinaryOp semantic expressions (e.g., out <= 2)
-        if kind == ps.ExpressionKind.BinaryOp:
-            lhs = parse_expr_to_Z3(e.left, s, m)
-            rhs = parse_expr_to_Z3(e.right, s, m)
+        elif kind == ps.ExpressionKind.BinaryOp:
+            lhs, rhs = match_widths(parse_expr_to_Z3(e.left, s, m), parse_expr_to_Z3(e.right, s, m))
             op = str(e.op) if hasattr(e, 'op') else ""
             print(f"[DEBUG BinaryOp] lhs={lhs}, rhs={rhs}, op={op}")
 
@@ -301,12 +281,12 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
             elif "BinaryXor" in op or "Xor" in op:
                 return lhs ^ rhs
             elif "LogicalAnd" in op or "Land" in op:
-                lhs_bool = lhs != BitVecVal(0, 32) if hasattr(lhs, 'size') else lhs
-                rhs_bool = rhs != BitVecVal(0, 32) if hasattr(rhs, 'size') else rhs
+                lhs_bool = z3_to_bool(lhs)
+                rhs_bool = z3_to_bool(rhs)
                 return And(lhs_bool, rhs_bool)
             elif "LogicalOr" in op or "Lor" in op:
-                lhs_bool = lhs != BitVecVal(0, 32) if hasattr(lhs, 'size') else lhs
-                rhs_bool = rhs != BitVecVal(0, 32) if hasattr(rhs, 'size') else rhs
+                lhs_bool = z3_to_bool(lhs)
+                rhs_bool = z3_to_bool(rhs)
                 return Or(lhs_bool, rhs_bool)
             elif "LogicalShiftLeft" in op or "Sll" in op:
                 return lhs << rhs
@@ -322,20 +302,7 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
         elif kind == ps.ExpressionKind.NamedValue:
             symbol = getattr(e, 'symbol', None)
             if symbol is not None:
-                var_name = symbol.name
-                module_name = m.curr_module
-                print(f"[DEBUG NamedValue] var_name={var_name}, module={module_name}, store keys={list(s.store.get(module_name, {}).keys())}")
-                if module_name in s.store and var_name in s.store[module_name]:
-                    sym_val = s.store[module_name][var_name]
-                    if isinstance(sym_val, str) and sym_val.isdigit():
-                        return BitVecVal(int(sym_val), 32)
-                    elif isinstance(sym_val, str):
-                        return BitVec(sym_val, 32)
-                    else:
-                        return sym_val
-                else:
-                    # Variable not in store, create a fresh symbolic variable
-                    return BitVec(var_name, 32)
+                return signal_term(s, m, symbol.name)
             return BitVecVal(0, 32)
 
         # Handle IntegerLiteral semantic expressions
@@ -344,7 +311,7 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
             if hasattr(val, 'value'):
                 val = val.value
             print(f"[DEBUG IntegerLiteral] val={val}")
-            return BitVecVal(int(val), 32)
+            return BitVecVal(int(val), signal_width(e))
 
         # Handle Conversion expressions (type casts)
         elif kind == ps.ExpressionKind.Conversion:
@@ -357,12 +324,10 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
         elif kind == ps.ExpressionKind.UnaryOp:
             operand = parse_expr_to_Z3(e.operand, s, m)
             op = str(e.op) if hasattr(e, 'op') else ""
-            if "Not" in op or "LogicalNot" in op:
-                if hasattr(operand, 'size'):
-                    return operand == BitVecVal(0, 32)
-                return Not(operand)
-            elif "BitwiseNot" in op:
-                return ~operand
+            if "BitwiseNot" in op:
+                return ~as_bitvec(operand)
+            elif "Not" in op or "LogicalNot" in op:
+                return Not(z3_to_bool(operand))
             elif "Minus" in op:
                 return -operand
             elif "Plus" in op:
@@ -382,10 +347,13 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
             return parse_expr_to_Z3(inner_expr, s, m)
         return BitVecVal(0, 32)
 
+    # Handle ConditionalExpressionSyntax (c ? a : b)
+    if class_name == "ConditionalExpressionSyntax":
+        return ternary_to_Z3(e, s, m)
+
     # Handle BinaryExpressionSyntax
     if class_name == "BinaryExpressionSyntax":
-        lhs = parse_expr_to_Z3(e.left, s, m)
-        rhs = parse_expr_to_Z3(e.right, s, m)
+        lhs, rhs = match_widths(parse_expr_to_Z3(e.left, s, m), parse_expr_to_Z3(e.right, s, m))
         op_token = str(getattr(e, 'operatorToken', ''))
         print(f"[DEBUG BinaryExpressionSyntax] lhs={lhs}, rhs={rhs}, op_token={op_token}")
 
@@ -412,12 +380,12 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
         elif "%" in op_token:
             return z3.URem(lhs, rhs)
         elif "&&" in op_token:
-            lhs_bool = lhs != BitVecVal(0, 32) if hasattr(lhs, 'size') else lhs
-            rhs_bool = rhs != BitVecVal(0, 32) if hasattr(rhs, 'size') else rhs
+            lhs_bool = z3_to_bool(lhs)
+            rhs_bool = z3_to_bool(rhs)
             return And(lhs_bool, rhs_bool)
         elif "||" in op_token:
-            lhs_bool = lhs != BitVecVal(0, 32) if hasattr(lhs, 'size') else lhs
-            rhs_bool = rhs != BitVecVal(0, 32) if hasattr(rhs, 'size') else rhs
+            lhs_bool = z3_to_bool(lhs)
+            rhs_bool = z3_to_bool(rhs)
             return Or(lhs_bool, rhs_bool)
         elif "&" in op_token:
             return lhs & rhs
@@ -433,8 +401,21 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
             print(f"[Warning] Unhandled binary operator token: {op_token}")
             return BitVecVal(0, 32)
 
+    # Sized and based literals (2'd1, 8'hFF, 'b1) keep their digits in separate tokens
+    if class_name == "IntegerVectorExpressionSyntax":
+        size = str(e.size).strip()
+        base = str(e.base).strip().lstrip("'").lower().lstrip("s")
+        digits = str(e.value).strip().replace("_", "")
+        width = int(size) if size.isdigit() and int(size) > 0 else 32
+        try:
+            return BitVecVal(int(digits, {"b": 2, "o": 8, "d": 10, "h": 16}[base]), width)
+        except (KeyError, ValueError):
+            # x and z digits have no bit-vector value
+            print(f"[Warning] Could not parse literal: {str(e).strip()}")
+            return BitVecVal(0, width)
+
     # Handle LiteralExpressionSyntax (integer literals)
-    if class_name == "LiteralExpressionSyntax" or class_name == "IntegerVectorExpressionSyntax":
+    if class_name == "LiteralExpressionSyntax":
         # Try to get the literal value
         literal_token = getattr(e, 'literal', None)
         if literal_token is not None:
@@ -442,18 +423,19 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
             # Parse Verilog integer literals (e.g., "2", "32'd5", "8'hFF")
             try:
                 if "'" in val_str:
-                    # Handle sized literals like 32'd5
+                    # Handle sized literals like 32'd5; the size is the width of the term
+                    width = literal_width(val_str)
                     parts = val_str.split("'")
                     base_char = parts[1][0] if len(parts[1]) > 0 else 'd'
                     num_str = parts[1][1:] if len(parts[1]) > 1 else '0'
                     if base_char == 'd':
-                        return BitVecVal(int(num_str), 32)
+                        return BitVecVal(int(num_str), width)
                     elif base_char == 'h':
-                        return BitVecVal(int(num_str, 16), 32)
+                        return BitVecVal(int(num_str, 16), width)
                     elif base_char == 'b':
-                        return BitVecVal(int(num_str, 2), 32)
+                        return BitVecVal(int(num_str, 2), width)
                     elif base_char == 'o':
-                        return BitVecVal(int(num_str, 8), 32)
+                        return BitVecVal(int(num_str, 8), width)
                 else:
                     return BitVecVal(int(val_str), 32)
             except ValueError:
@@ -461,12 +443,22 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
                 return BitVecVal(0, 32)
         return BitVecVal(0, 32)
 
+    # Handle IdentifierNameSyntax: the signal's term in the store
+    if class_name == "IdentifierNameSyntax":
+        return signal_term(s, m, e.identifier.valueText)
+
+    if class_name == "ElementSelectExpressionSyntax":
+        return select_to_Z3(e, s, m)
+
+    if class_name == "ConcatenationExpressionSyntax":
+        return concat_to_Z3(e, s, m)
+
+    if class_name in ("PrefixUnaryExpressionSyntax", "UnaryExpressionSyntax"):
+        op_token = getattr(e, "operatorToken", None)
+        op = str(getattr(op_token, "valueText", op_token)).strip()
+        return unary_to_Z3(op, parse_expr_to_Z3(e.operand, s, m))
+
     # Legacy handling for syntax nodes and Z3 expressions below
-    tokens_list = parse_tokens(tokenize(e, s, m))
-    new_constraint = evaluate_expr(tokens_list, s, m)
-    new_constants = []
-    if not new_constraint is None:
-        new_constants = get_constants_list(new_constraint, s, m)
     if is_and(e):
         lhs = parse_expr_to_Z3(e.left, s, m)
         rhs = parse_expr_to_Z3(e.right, s, m)
@@ -493,34 +485,6 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
             else:
                 sym_val = part_sel_expr
             return BitVec(sym_val, 32)
-    elif e.__class__.__name__ == "IdentifierNameSyntax":
-        module_name = m.curr_module  # Default to current module
-        # PySlang 7.0 IdentifierNameSyntax uses .identifier.valueText for the name
-        # Access the identifier name through .identifier attribute
-        if not hasattr(e, "identifier"):
-            # Fallback: try to get name directly if identifier attribute doesn't exist
-            var_name = getattr(e, "valueText", getattr(e, "name", None))
-            if var_name is None:
-                return BitVecVal(0, 32)  # Return zero if we can't get the name
-        else:
-            var_name = e.identifier.valueText if hasattr(e.identifier, "valueText") else None
-            if var_name is None:
-                var_name = getattr(e.identifier, "name", None)
-        
-        if var_name is None:
-            return BitVecVal(0, 32)  # Return zero if we can't get the name
-            
-        is_reg = var_name in m.reg_decls if hasattr(m, "reg_decls") else False
-        
-        # Check if variable exists in store, if not return zero
-        if module_name not in s.store or var_name not in s.store[module_name]:
-            return BitVecVal(0, 32)
-            
-        if s.store[module_name][var_name].isdigit():
-            int_val = IntVal(int(s.store[module_name][var_name]))
-            return Int2BV(int_val, 32)
-        else:
-            return BitVec(s.store[module_name][var_name], 32)
     elif e.__class__.__name__ == "IntegerLiteralExpressionSyntax":
         int_val = IntVal(e.value)
         return Int2BV(int_val, 32)
@@ -546,8 +510,7 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
 
         # Handle BinaryOp semantic expressions (e.g., out <= 2)
         if kind == ps.ExpressionKind.BinaryOp:
-            lhs = parse_expr_to_Z3(e.left, s, m)
-            rhs = parse_expr_to_Z3(e.right, s, m)
+            lhs, rhs = match_widths(parse_expr_to_Z3(e.left, s, m), parse_expr_to_Z3(e.right, s, m))
             op = str(e.op) if hasattr(e, 'op') else ""
 
             # Map PySlang binary operators to Z3
@@ -581,12 +544,12 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
                 return lhs ^ rhs
             elif op == "BinaryOperator.LogicalAnd" or "Land" in op:
                 # Convert to bool if needed
-                lhs_bool = lhs != BitVecVal(0, 32) if hasattr(lhs, 'size') else lhs
-                rhs_bool = rhs != BitVecVal(0, 32) if hasattr(rhs, 'size') else rhs
+                lhs_bool = z3_to_bool(lhs)
+                rhs_bool = z3_to_bool(rhs)
                 return And(lhs_bool, rhs_bool)
             elif op == "BinaryOperator.LogicalOr" or "Lor" in op:
-                lhs_bool = lhs != BitVecVal(0, 32) if hasattr(lhs, 'size') else lhs
-                rhs_bool = rhs != BitVecVal(0, 32) if hasattr(rhs, 'size') else rhs
+                lhs_bool = z3_to_bool(lhs)
+                rhs_bool = z3_to_bool(rhs)
                 return Or(lhs_bool, rhs_bool)
             elif op == "BinaryOperator.LogicalShiftLeft" or "Sll" in op:
                 return lhs << rhs
@@ -602,19 +565,7 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
         elif kind == ps.ExpressionKind.NamedValue:
             symbol = getattr(e, 'symbol', None)
             if symbol is not None:
-                var_name = symbol.name
-                module_name = m.curr_module
-                if module_name in s.store and var_name in s.store[module_name]:
-                    sym_val = s.store[module_name][var_name]
-                    if isinstance(sym_val, str) and sym_val.isdigit():
-                        return BitVecVal(int(sym_val), 32)
-                    elif isinstance(sym_val, str):
-                        return BitVec(sym_val, 32)
-                    else:
-                        return sym_val
-                else:
-                    # Variable not in store, create a fresh symbolic variable
-                    return BitVec(var_name, 32)
+                return signal_term(s, m, symbol.name)
             return BitVecVal(0, 32)
 
         # Handle IntegerLiteral semantic expressions
@@ -622,7 +573,7 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
             val = getattr(e, 'value', 0)
             if hasattr(val, 'value'):
                 val = val.value
-            return BitVecVal(int(val), 32)
+            return BitVecVal(int(val), signal_width(e))
 
         # Handle Conversion expressions (type casts)
         elif kind == ps.ExpressionKind.Conversion:
@@ -635,12 +586,10 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
         elif kind == ps.ExpressionKind.UnaryOp:
             operand = parse_expr_to_Z3(e.operand, s, m)
             op = str(e.op) if hasattr(e, 'op') else ""
-            if "Not" in op or "LogicalNot" in op:
-                if hasattr(operand, 'size'):
-                    return operand == BitVecVal(0, 32)
-                return Not(operand)
-            elif "BitwiseNot" in op:
-                return ~operand
+            if "BitwiseNot" in op:
+                return ~as_bitvec(operand)
+            elif "Not" in op or "LogicalNot" in op:
+                return Not(z3_to_bool(operand))
             elif "Minus" in op:
                 return -operand
             elif "Plus" in op:
@@ -653,6 +602,50 @@ def parse_expr_to_Z3(e: ps.ExpressionSyntax, s: SymbolicState, m: ExecutionManag
     print(f"[Warning] Unrecognized expression type: {type(e)}, returning 0")
     return BitVecVal(0, 32)
 
+def z3_to_bool(e):
+    """Coerces a Z3 term to a Bool the way Verilog does: bit-vectors are true when non-zero."""
+    if isinstance(e, BoolRef):
+        return e
+    if isinstance(e, BitVecRef):
+        return e != BitVecVal(0, e.size())
+    return e
+
+def store_value_to_z3(value):
+    """Z3 term for a symbolic store entry. Entries are terms; a name (or digit string) left
+    over from older code is read as a 32-bit word."""
+    if isinstance(value, ExprRef):
+        return value
+    if value.isdigit():
+        return BitVecVal(int(value), 32)
+    return BitVec(value, 32)
+
+def case_match(selector, label):
+    """The guard under which a case label matches the case selector."""
+    if isinstance(selector, BoolRef) or isinstance(label, BoolRef):
+        return z3_to_bool(selector) == z3_to_bool(label)
+    selector, label = match_widths(selector, label)
+    return selector == label
+
+def query_key(pc: Solver) -> str:
+    """Key of the satisfiability query pc in the solver cache (--use_cache): a digest of its
+    assertions with fresh symbols canonicalized, so the same query hits from another path,
+    instance or cycle, and from another run."""
+    names = {}
+    text = "\n".join(canonicalize(a.sexpr(), names, tracked=True) for a in pc.assertions())
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+def cached_solve(m: ExecutionManager, pc: Solver) -> bool:
+    """solve_pc through the manager's solver cache, when there is one."""
+    if m.cache is None:
+        return solve_pc(pc)
+    key = query_key(pc)
+    cached = m.cache.get(key)
+    if cached is not None:
+        return cached.decode() == "True"
+    result = solve_pc(pc)
+    m.cache.set(key, str(result))
+    return result
+
 def solve_pc(s: Solver) -> bool:
     """Solve path condition."""
     result = str(s.check())
@@ -1,40 +1,15 @@
 """A library of helper functions for working with the PySlang AST."""
 import pyslang as ps
-import re
-from helpers.utils import init_symbol
 from engine.execution_manager import ExecutionManager
 from engine.symbolic_state import SymbolicState
-from helpers.rvalue_to_z3 import solve_pc
-from helpers.rvalue_parser import conjunction_with_pointers
-from z3 import Not, is_bool, BoolVal, ExprRef, BitVecRef, BitVecVal
+from helpers.rvalue_to_z3 import (solve_pc, cached_solve, case_match, ternary_parts, z3_to_bool, fit, signal_width,
+                                  fresh_term, signal_term, assigned_term, same_term)
+from z3 import Not, And, Or, is_bool, BoolVal, ExprRef, BitVecRef, BitVecVal
 
 
-def substitute_symbols(expr_str: str, store: dict) -> str:
-    """Substitute variable names in expression string with their symbolic values from store.
-
-    Args:
-        expr_str: Expression string like "(+ out 1)"
-        store: Dict mapping variable names to symbolic values
-
-    Returns:
-        Expression string with variables replaced by symbolic values, e.g. "(+ abc123 1)"
-    """
-    if not store:
-        return expr_str
-
-    # Sort variables by length (longest first) to avoid partial replacements
-    # e.g., replace "out_wire" before "out"
-    sorted_vars = sorted(store.keys(), key=len, reverse=True)
-
-    result = expr_str
-    for var_name in sorted_vars:
-        sym_val = store[var_name]
-        # Use word boundary regex to avoid partial matches
-        # Match variable name that is not part of a larger identifier
-        pattern = r'\b' + re.escape(var_name) + r'\b'
-        result = re.sub(pattern, str(sym_val), result)
-
-    return result
+def assign_term(m: ExecutionManager, s: SymbolicState, lhs: str, term) -> None:
+    """Store a Z3 term as the value of lhs, fitted to lhs's declared width."""
+    s.store[m.curr_module][lhs] = assigned_term(m, lhs, term)
 
 def init_state(s: SymbolicState, prev_store, ast, symbol_visitor):
     """give fresh symbols and merge register values in."""
@@ -56,17 +31,84 @@ def merge_states(state: SymbolicState, store):
             continue
         else:
             for key2, var in val.items():
-                if var in store.values():
-                    prev_symbol = state.store[key][key2]
-                    new_symbol = store[key][key2]
-                    state.store[key][key2].replace(prev_symbol, new_symbol)
-                else:
-                    state.store[key][key2] = store[key][key2]
+                if any(same_term(var, value) for value in store.values()):
+                    continue
+                state.store[key][key2] = store[key][key2]
 
 def get_module_name(module) -> str:
     """Extracts module name from module syntax object"""
     return module.name
 
+def get_cond_expr(stmt):
+    """Returns the condition expression of an if statement, semantic or syntax node.
+    Semantic ConditionalStatements keep it in .conditions, ConditionalStatementSyntax
+    keeps it in .predicate.conditions."""
+    conditions = getattr(stmt, "conditions", None)
+    if not conditions:
+        predicate = getattr(stmt, "predicate", None)
+        conditions = getattr(predicate, "conditions", None) if predicate is not None else None
+    if not conditions:
+        return None
+    for cond in conditions:
+        return getattr(cond, "expr", None)
+    return None
+
+def get_branches(stmt):
+    """Returns the (then, else) bodies of an if statement; else is None if absent."""
+    then_body = getattr(stmt, "ifTrue", getattr(stmt, "statement", None))
+    else_clause = getattr(stmt, "elseClause", None)
+    if else_clause is not None:
+        else_body = getattr(else_clause, "statement", getattr(else_clause, "clause", None))
+    else:
+        else_body = getattr(stmt, "ifFalse", None)
+    return then_body, else_body
+
+def get_case_item_body(item):
+    """Returns the statement of a case item (standard or default)."""
+    body = getattr(item, "clause", None)
+    if body is None:
+        body = getattr(item, "statement", getattr(item, "stmt", None))
+    if body is None:
+        body = getattr(item, "statements", None)
+    return body
+
+def is_default_case_item(item) -> bool:
+    """Default items have no match expressions."""
+    return item.__class__.__name__ == "DefaultCaseItemSyntax" or not getattr(item, "expressions", None)
+
+def case_qualifier(stmt) -> str:
+    """'unique', 'unique0' or 'priority' for a qualified case statement, '' otherwise.
+    Syntax nodes keep the keyword token, semantic CaseStatements a UniquePriorityCheck."""
+    token = getattr(stmt, "uniqueOrPriority", None)
+    if token is not None:
+        return str(token).strip()
+    check = str(getattr(stmt, "check", "")).rsplit(".", 1)[-1]
+    return check.lower() if check in ("Unique", "Unique0", "Priority") else ""
+
+def case_arms(stmt) -> list:
+    """The successors of a case statement as (item, body) pairs: the items with match
+    expressions in order, then default. Without a default there is a no-match arm
+    (None, None), except for unique and priority case statements, which promise a match."""
+    items, default = [], None
+    for item in getattr(stmt, "items", None) or []:
+        if is_default_case_item(item):
+            default = item
+        else:
+            items.append(item)
+    arms = [(item, get_case_item_body(item)) for item in items]
+    if getattr(stmt, "defaultCase", None) is not None:
+        # semantic CaseStatement: the default is a statement, not an item
+        arms.append((None, stmt.defaultCase))
+    elif default is not None:
+        arms.append((default, get_case_item_body(default)))
+    elif case_qualifier(stmt) not in ("unique", "priority") or not arms:
+        arms.append((None, None))
+    return arms
+
+def is_assertion_stmt(stmt) -> bool:
+    """Immediate or concurrent assertion, syntax or semantic node."""
+    return stmt is not None and "Assertion" in stmt.__class__.__name__
+
 class SlangSymbolVisitor:
     """Visits a Slang AST by each Symbol, counting branches and paths"""
 
@@ -628,7 +670,7 @@ class SymbolicDFS:
             if cond_expr:
                 self.path_condition.pop()
         elif stmt.kind == ps.StatementKind.List:
-            for s in stmt.body:
+            for s in stmt.list:
                 self.dfs_stmt(s)
 
     def dfs_expr(self, expr):
@@ -648,7 +690,7 @@ class SymbolicDFS:
         kind = expr.kind
 
         if kind == ps.ExpressionKind.NamedValue:
-            return s.store[m.curr_module].get(expr.symbol.name, init_symbol())
+            return signal_term(s, m, expr.symbol.name)
 
         elif kind == ps.ExpressionKind.BinaryOp:
             self.visit_expr(m, s, expr.left)
@@ -673,54 +715,27 @@ class SymbolicDFS:
             self.visit_expr(m, s, expr.left)
             self.visit_expr(m, s, expr.right)
 
-        elif kind == ps.SyntaxKind.AssignmentExpression:
+        elif kind in (ps.SyntaxKind.AssignmentExpression, ps.SyntaxKind.NonblockingAssignmentExpression):
             if hasattr(expr.left, "identifier"):
-                lhs_var = expr.left.identifier.value
-                # Check for simple var-to-var assignment first
-                if hasattr(expr.right, "identifier") and expr.right.identifier.value in s.store[m.curr_module]:
-                    s.store[m.curr_module][lhs_var] = s.store[m.curr_module][expr.right.identifier.value]
-                elif expr.right.kind == ps.SyntaxKind.ConcatenationExpression:
-                    # Handle concatenation on RHS
-                    parts = [str(operand.literal.value) for operand in expr.right.expressions if hasattr(operand, "literal")]
-                    s.store[m.curr_module][lhs_var] = "".join(parts)
-                elif hasattr(expr.right, "literal"):
-                    # Handle literal expressions (IntegerLiteralExpression, etc.)
-                    s.store[m.curr_module][lhs_var] = str(expr.right.literal.value)
-                else:
-                    # Handle complex RHS expressions (e.g., out + 1 + out_wire)
-                    # Convert RHS to string representation and substitute symbolic values
-                    rhs_str = conjunction_with_pointers(expr.right, s, m)
-                    rhs_with_symbols = substitute_symbols(rhs_str, s.store[m.curr_module])
-                    s.store[m.curr_module][lhs_var] = rhs_with_symbols
+                # the right-hand side's term, composed from the terms in the store; a mux
+                # (c ? a : b) is one If term and does not split the path
+                assign_term(m, s, expr.left.identifier.value, self.expr_to_z3(m, s, expr.right))
             else:
                 # LHS doesn't have an identifier attribute — skip for now
                 ...
 
-        elif kind == ps.SyntaxKind.NonblockingAssignmentExpression:
-            if hasattr(expr.left, "identifier"):
-                lhs_var = expr.left.identifier.value
-                # Check for simple var-to-var assignment first
-                if hasattr(expr.right, "identifier") and expr.right.identifier.value in s.store[m.curr_module]:
-                    s.store[m.curr_module][lhs_var] = s.store[m.curr_module][expr.right.identifier.value]
-                elif expr.right.kind == ps.SyntaxKind.ConcatenationExpression:
-                    # Handle concatenation on RHS
-                    concat_value = ""
-                    for operand in expr.right.expressions:
-                        if hasattr(operand, "value"):
-                            concat_value += str(operand.value)
-                    s.store[m.curr_module][lhs_var] = concat_value
-                elif hasattr(expr.right, "literal"):
-                    # Handle literal expressions
-                    s.store[m.curr_module][lhs_var] = str(expr.right.literal.value)
-                else:
-                    # Handle complex RHS expressions (e.g., out + 1 + out_wire)
-                    # Convert RHS to string representation and substitute symbolic values
-                    rhs_str = conjunction_with_pointers(expr.right, s, m)
-                    rhs_with_symbols = substitute_symbols(rhs_str, s.store[m.curr_module])
-                    s.store[m.curr_module][lhs_var] = rhs_with_symbols
+        elif kind == ps.ExpressionKind.Assignment:
+            # Semantic assignment (semantic CFG): the target is a resolved symbol, whose type
+            # gives the width the value is fitted to.
+            target = getattr(expr.left, "symbol", None)
+            if target is not None:
+                s.store[m.curr_module][target.name] = fit(self.expr_to_z3(m, s, expr.right), signal_width(target))
             else:
-                # LHS doesn't have an identifier attribute — skip for now
-                ...
+                # a select or concatenation on the left: whatever it names gets a fresh value
+                for sub in (getattr(expr.left, "value", None), *getattr(expr.left, "operands", ())):
+                    symbol = getattr(sub, "symbol", None)
+                    if symbol is not None:
+                        s.store[m.curr_module][symbol.name] = fresh_term(m, symbol.name, signal_width(symbol))
 
         elif kind ==ps.ExpressionKind.Concatenation:
             for e in expr.operands:
@@ -739,10 +754,13 @@ class SymbolicDFS:
             self.visit_expr(m, s, expr.left)
             self.visit_expr(m, s, expr.right)
 
+        elif kind == ps.ExpressionKind.Conversion:
+            # implicit and explicit casts (semantic expressions only) wrap their operand
+            self.visit_expr(m, s, expr.operand)
+
         elif kind in [ps.ExpressionKind.MemberAccess, ps.ExpressionKind.Streaming,
                     ps.ExpressionKind.Replication, ps.ExpressionKind.TaggedUnion,
-                    ps.ExpressionKind.Conversion, ps.ExpressionKind.CopyClass,
-                    ps.ExpressionKind.Streaming]:
+                    ps.ExpressionKind.CopyClass]:
             self.visit_expr(m, s, expr.value)
 
         elif kind in [ps.ExpressionKind.SimpleAssignmentPattern]:
@@ -800,12 +818,12 @@ class SymbolicDFS:
             self._handle_property_spec(m, s, stmt, modules, direction)
             return
 
-        if kind == ps.SyntaxKind.ExpressionStatement:
+        if kind == ps.SyntaxKind.ExpressionStatement or kind == ps.StatementKind.ExpressionStatement:
             self.visit_expr(m, s, stmt.expr)
 
         elif kind == ps.StatementKind.Block and hasattr(stmt, "body"):
-            for substmt in stmt.body:
-                self.visit_stmt(m, s, substmt, modules, direction)
+            # a semantic block has one body statement, a StatementList when it holds several
+            self.visit_stmt(m, s, stmt.body, modules, direction)
 
         elif kind == ps.StatementKind.Conditional or isinstance(stmt, ps.ConditionalStatementSyntax):
             m.branch_count += 1
@@ -816,30 +834,10 @@ class SymbolicDFS:
                 self.visit_expr(m, s, cond_expr)
                 s.pc.push()
                 s.assertion_counter += 1
-                cond_z3 = self.expr_to_z3(m, s, cond_expr)
-                if direction:
-                    key = str(cond_z3)
-                    self.branch = True
-                    if m.cache is not None and m.cache.exists(key):
-                        result = m.cache.get(key).decode()
-                    else:
-                        result = str(solve_pc(s.pc))
-                        if m.cache is not None:
-                            m.cache.set(str(cond_z3), str(solve_pc(s.pc)))
-                    s.pc.assert_and_track(cond_z3, f"p{s.assertion_counter}")
-                else:
-                    self.branch = False
-                    key = f"~{cond_z3}"
-                    if m.cache is not None and m.cache.exists(key):
-                        result = m.cache.get(key).decode()
-                    else:
-                        result = str(solve_pc(s.pc))
-                        if m.cache is not None:
-                            m.cache.set(f"~{cond_z3}", str(solve_pc(s.pc)))
-                    s.pc.assert_and_track(cond_z3, f"p{s.assertion_counter}")
-                if not solve_pc(s.pc):
-                    if m.cache is not None:
-                        m.cache.set(f"~{str(cond_z3)}", False)
+                cond_z3 = z3_to_bool(self.expr_to_z3(m, s, cond_expr))
+                self.branch = bool(direction)
+                s.pc.assert_and_track(cond_z3, f"p{s.assertion_counter}")
+                if not cached_solve(m, s.pc):
                     s.pc.pop()
                     m.abandon = True
                     m.ignore = True
@@ -857,7 +855,7 @@ class SymbolicDFS:
 
         elif kind == ps.StatementKind.List:
             
-            for s_sub in stmt.body:
+            for s_sub in stmt.list:
                 self.visit_stmt(m, s, s_sub, modules, direction)
 
         elif kind == ps.StatementKind.ForLoop:
@@ -877,31 +875,11 @@ class SymbolicDFS:
                 self.visit_expr(m, s, stmt.cond)
                 s.pc.push()
                 s.assertion_counter += 1
-                cond_z3 = self.expr_to_z3(m, s, stmt.cond)
-                if direction:
-                    key = str(cond_z3)
-                    self.branch = True
-                    if m.cache is not None and m.cache.exists(key):
-                        result = m.cache.get(key).decode()
-                    else:
-                        result = str(solve_pc(s.pc))
-                        if m.cache is not None:
-                            m.cache.set(str(cond_z3), str(solve_pc(s.pc)))
-                    s.pc.assert_and_track(cond_z3, f"p{s.assertion_counter}")
-                else:
-                    key = str(f"~{cond_z3}")
-                    self.branch = False
-                    if m.cache is not None and m.cache.exists(key):
-                        result = m.cache.get(key).decode()
-                    else:
-                        result = str(solve_pc(s.pc))
-                        if m.cache is not None:
-                            m.cache.set(f"~{str(cond_z3)}", str(solve_pc(s.pc)))
-                    s.pc.assert_and_track(~cond_z3, f"p{s.assertion_counter}")
-                if not solve_pc(s.pc):
+                cond_z3 = z3_to_bool(self.expr_to_z3(m, s, stmt.cond))
+                self.branch = bool(direction)
+                s.pc.assert_and_track(cond_z3 if direction else ~cond_z3, f"p{s.assertion_counter}")
+                if not cached_solve(m, s.pc):
                     s.pc.pop()
-                    if m.cache is not None:
-                        m.cache.set(str(cond_z3), False)
                     m.abandon = True
                     m.ignore = True
                     return
@@ -919,86 +897,26 @@ class SymbolicDFS:
                 self.visit_expr(m, s, stmt.cond)
 
         #elif kind == ps.StatementKind.Case:
-        elif stmt.__class__.__name__ == "CaseStatementSyntax":
-            # print("case")  # DEBUG
+        elif stmt.__class__.__name__ == "CaseStatementSyntax" or kind == ps.StatementKind.Case:
+            # An n-way branch in the CFG: direction is the index of the arm (see case_arms) this
+            # path takes, and the arm bodies are visited as its successor basic blocks.
             m.branch_count += 1
             self.visit_expr(m, s, stmt.expr)
-
-            cond_z3 = self.expr_to_z3(m, s, stmt.expr)
-
-            #for case in stmt.cases:
-            for case in getattr(stmt, "items", getattr(stmt, "case_items", [])):
-                exprs = getattr(case, "expressions", getattr(case, "exprs", []))
-                #for e in case.exprs:
-                for e in exprs:
-                    self.visit_expr(m, s, e)
-                    s.pc.push()
-                    s.assertion_counter += 1
-                    case_z3 = self.expr_to_z3(m, s, e)
-
-                    cond_expr = cond_z3 if isinstance(cond_z3, ExprRef) else None
-                    case_expr = case_z3 if isinstance(case_z3, ExprRef) else None
-
-                    if cond_expr is not None:
-                        if is_bool(cond_expr):
-                            match_guard = cond_expr
-                            mismatch_guard = Not(cond_expr)
-                        elif case_expr is not None:
-                            match_guard = cond_expr == case_expr
-                            mismatch_guard = cond_expr != case_expr
-                        elif isinstance(cond_expr, BitVecRef):
-                            zero = BitVecVal(0, cond_expr.size())
-                            match_guard = cond_expr != zero
-                            mismatch_guard = cond_expr == zero
-                        else:
-                            match_guard = BoolVal(True)
-                            mismatch_guard = BoolVal(True)
-                    else:
-                        match_guard = BoolVal(True)
-                        mismatch_guard = BoolVal(True)
-
-                    guard = match_guard if direction else mismatch_guard
-                    if not isinstance(guard, ExprRef) or not is_bool(guard):
-                        guard = BoolVal(True)
-
-                    key = str(guard)
-                    self.branch = bool(direction)
-                    if m.cache is not None and m.cache.exists(key):
-                        result = m.cache.get(key).decode()
-                    else:
-                        result = str(solve_pc(s.pc))
-                        if m.cache is not None:
-                            m.cache.set(key, result)
-                    s.pc.assert_and_track(guard, f"p{s.assertion_counter}")
-                    if not solve_pc(s.pc):
-                        s.pc.pop()
-                        if m.cache is not None:
-                            m.cache.set(key, str(False))
-                        m.abandon = True
-                        m.ignore = True
-                        return
-
-                    case_body = getattr(case, "statement", getattr(case, "stmt", None))
-                    if case_body is None and hasattr(case, "statements"):
-                        case_body = case.statements
-
-                    if case_body is None:
-                        s.pc.pop()
-                        continue
-
-                    if isinstance(case_body, (list, tuple)):
-                        body_iter = case_body
-                    elif hasattr(case_body, "__iter__") and not isinstance(case_body, ps.StatementSyntax):
-                        body_iter = list(case_body)
-                    else:
-                        body_iter = [case_body]
-
-                    for stmt_node in body_iter:
-                        if stmt_node is None:
-                            continue
-                        self.visit_stmt(m, s, stmt_node, modules, direction)
-
-                    s.pc.pop()
+            selector = self.expr_to_z3(m, s, stmt.expr)
+            arms = case_arms(stmt)
+            arm = min(int(direction), len(arms) - 1) if direction is not None else len(arms) - 1
+            guard = self._case_arm_guard(m, s, stmt, selector, arms, arm)
+            self.branch = arm
+            if guard is not None:
+                s.pc.push()
+                s.assertion_counter += 1
+                s.pc.assert_and_track(guard, f"p{s.assertion_counter}")
+                feasible = cached_solve(m, s.pc)
+                s.pc.pop()
+                if not feasible:
+                    m.abandon = True
+                    m.ignore = True
+                    return
 
         elif kind in [ps.StatementKind.ProceduralAssign]:
             self.visit_expr(m, s, stmt.left)
@@ -1006,10 +924,11 @@ class SymbolicDFS:
             if hasattr(stmt.left, 'symbol') and hasattr(stmt.right, 'symbol'):
                 lhs = stmt.left.symbol.name
                 rhs = stmt.right.symbol.name
-                s.store[m.curr_module][lhs] = s.store[m.curr_module].get(rhs, init_symbol())
+                store = s.store[m.curr_module]
+                store[lhs] = store[rhs] if rhs in store else fresh_term(m, lhs, signal_width(stmt.left.symbol))
             elif hasattr(stmt.left, 'symbol'):
                 lhs = stmt.left.symbol.name
-                s.store[m.curr_module][lhs] = init_symbol()
+                s.store[m.curr_module][lhs] = fresh_term(m, lhs, signal_width(stmt.left.symbol))
 
         # elif kind == ps.StatementKind.ProcedureCall:
         #     self.visit_expr(m, s, stmt.expr)
@@ -1060,6 +979,28 @@ class SymbolicDFS:
         elif kind == ps.StatementKind.ExpressionStatement:
             self.visit_expr(m, s, stmt.expr)
 
+    def _case_arm_guard(self, m: ExecutionManager, s: SymbolicState, stmt, selector, arms, arm):
+        """The condition under which a case statement takes arms[arm], or None if it cannot be
+        expressed. The first matching item wins, except in unique case statements, whose items
+        do not overlap. Only the labels of the items up to the taken arm are evaluated."""
+        unique = case_qualifier(stmt) in ("unique", "unique0")
+        earlier = []
+        for k, (item, _) in enumerate(arms):
+            if item is None or is_default_case_item(item):
+                return Not(Or(*earlier)) if earlier else None
+            matches = []
+            for e in item.expressions:
+                self.visit_expr(m, s, e)
+                match = case_match(selector, self.expr_to_z3(m, s, e))
+                if not isinstance(match, ExprRef) or not is_bool(match):
+                    return None
+                matches.append(match)
+            if k == arm:
+                guard = Or(*matches) if len(matches) > 1 else matches[0]
+                return And(guard, Not(Or(*earlier))) if earlier and not unique else guard
+            earlier += matches
+        return None
+
     def _handle_immediate_assertion(self, m: ExecutionManager, s: SymbolicState, stmt, modules, direction):
         """Handle ImmediateAssertionStatement (semantic node).
 
@@ -1,6 +1,5 @@
 """General utility functions used across the codebase"""
-import random
-import string
+import re
 
 
 def to_binary(i: int, digits: int = 128) -> str:
@@ -9,7 +8,22 @@ def to_binary(i: int, digits: int = 128) -> str:
     return  ("0" * padding_len) + num 
 
 
-def init_symbol() -> str:
-    """Initializes signal with random symbol."""
-    #TODO:change symbol length back to 16 or whatever or make this hash to guarantee good randomness
-    return ''.join(random.choice(string.ascii_uppercase + string.ascii_lowercase + string.digits) for _ in range(16))
+def symbol_name(instance: str, signal: str, cycle: int) -> str:
+    """Name of the fresh symbol a signal gets in a cycle: <instance>.<signal>@c<cycle>."""
+    return f"{instance}.{signal}@c{cycle}"
+
+
+# names made by symbol_name() (later ones carry a #k suffix), bare or |quoted| as in s-expressions
+SYMBOL = re.compile(r"\|[^|]*@c\d+(?:#\d+)?\||[\w$.]+@c\d+(?:#\d+)?")
+# assert_and_track literals, numbered by SymbolicState.assertion_counter
+TRACK = re.compile(r"\bp\d+\b")
+
+
+def canonicalize(text: str, names: dict, tracked: bool = False) -> str:
+    """text with fresh symbols renamed v0, v1, ... in order of first appearance, and with
+    tracked=True (path condition assertions) tracking literals without their counter.
+    names holds the renaming, to share it across texts."""
+    def rename(match) -> str:
+        return names.setdefault(match.group(0), f"v{len(names)}")
+    text = SYMBOL.sub(rename, text)
+    return TRACK.sub("p", text) if tracked else text
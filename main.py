@@ -16,6 +16,11 @@ from engine.execution_manager import ExecutionManager
 from engine.symbolic_state import SymbolicState
 from helpers.rvalue_parser import tokenize, parse_tokens, evaluate
 from engine.execution_engine import ExecutionEngine
+from engine.bmc_engine import BMCEngine
+from engine.parallel import run_parallel
+from engine.distributed import run_coordinator, run_worker
+from engine.search_strategy import STRATEGIES, make_strategy
+from engine.path_cache import PathCache, source_fingerprint
 import pyslang as ps
 from helpers.slang_helpers import SlangSymbolVisitor, SymbolicDFS
 # SlangNodeVisitor removed 
@@ -36,9 +41,12 @@ logging.debug("Starting over")
 INFO = "Verilog Symbolic Execution Engine"
 USAGE = "Usage: python3 -m main <num_cycles> <verilog_file>.v > out.txt"
     
-def timeout_exit():
+def timeout_exit(engine=None):
     """This only happens when the timer runs out."""
     print("Execution time limit exceeded. Exiting.")
+    if getattr(engine, "checkpointer", None) is not None:
+        engine.checkpointer.save()
+        print(f"Checkpoint saved to {engine.checkpointer.path}")
     sys.exit(1)
 
 def showVersion():
@@ -46,6 +54,240 @@ def showVersion():
     print(USAGE)
     sys.exit()
     
+def load_design(options, filelist, cache=None):
+    """Parses and elaborates the design with pyslang and returns (driver, compilation, modules),
+    where modules is the selected top instance followed by all its nested instances.
+    The driver and compilation must stay referenced while the symbols are in use.
+    With a path cache that saw these sources elaborate without any diagnostics, the
+    diagnostics pass is skipped."""
+    # 使用 Driver 简化文件加载（自动处理 .F filelist、include 路径等）
+    driver = ps.Driver()
+    driver.addStandardArgs()
+
+    # 设置 include 路径
+    if options.include:
+        for inc_path in options.include:
+            driver.sourceLoader.addSearchDirectories(inc_path)
+
+    # 加载源文件（Driver 自动处理 .F 文件列表）
+    input_file = filelist[0]
+    if not os.path.exists(input_file):
+        print(f"[Error] File not found: {input_file}")
+        exit(1)
+
+    if input_file.endswith('.F') or input_file.endswith('.f'):
+        # 使用 Driver 内置的 filelist 解析（支持 +incdir+, +define+ 等）
+        driver.processCommandFiles(input_file, True, False)
+    else:
+        driver.sourceLoader.addFiles(input_file)
+
+    driver.processOptions()
+    driver.parseAllSources()
+
+    # 创建 Compilation
+    compilation = driver.createCompilation()
+
+    # 获取模块
+    modules = list(compilation.getRoot().topInstances)
+
+    # Also collect all nested module instances
+    def collect_all_instances(symbol, collected):
+        """Recursively collect all module instances including nested ones"""
+        if symbol.kind == ps.SymbolKind.Instance:
+            collected.append(symbol)
+            # Recursively check children
+            for child in symbol.body:
+                collect_all_instances(child, collected)
+
+    # If user specified a top module with -t, find and use only that module
+    # Otherwise, use the first top instance
+    top_module = None
+    if options.topmodule and options.topmodule != "top":
+        # Find the module with the specified name (by instance name or definition name)
+        # First check top instances
+        for module in modules:
+            if module.name == options.topmodule or (hasattr(module.body, 'definition') and module.body.definition.name == options.topmodule):
+                top_module = module
+                break
+
+        # If not found in top instances, search nested instances
+        if not top_module:
+            for module in modules:
+                for child in module.body:
+                    if child.kind == ps.SymbolKind.Instance:
+                        if child.name == options.topmodule or (hasattr(child.body, 'definition') and child.body.definition.name == options.topmodule):
+                            top_module = child
+                            break
+                if top_module:
+                    break
+
+        if not top_module:
+            print(f"[Error] Specified top module '{options.topmodule}' not found")
+            print(f"Available modules: {[m.name for m in modules]}")
+            exit(1)
+    else:
+        # Use the first top instance
+        top_module = modules[0] if modules else None
+
+    # Only process the selected top module and its children
+    all_instances = []
+    if top_module:
+        collect_all_instances(top_module, all_instances)
+        modules = all_instances
+    else:
+        modules = []
+
+    if not modules:
+        print("No top instances found, searching syntax trees for definitions...")
+        syntax_trees = compilation.getSyntaxTrees()
+        for tree in syntax_trees:
+            for member in tree.root.members:
+                if hasattr(member, 'kind') and 'ModuleDeclaration' in str(member.kind):
+                    modules.append(member)
+
+    # 6. --- 关键修改：正确的错误打印逻辑 ---
+    # 获取所有诊断信息
+    if cache is not None and cache.clean:
+        print("[Info] Sources unchanged since they last compiled without diagnostics, skipping the diagnostics pass")
+        diags = []
+    else:
+        diags = compilation.getAllDiagnostics()
+    
+    # 创建诊断引擎和文本客户端（使用 Driver 的 sourceManager）
+    diag_engine = ps.DiagnosticEngine(driver.sourceManager)
+    client = ps.TextDiagnosticClient()
+    diag_engine.addClient(client)
+    
+    # 将诊断信息交给引擎处理
+    for d in diags:
+        diag_engine.issue(d)
+        
+    # 获取格式化后的错误信息字符串
+    report = client.getString()
+    
+    # 检查是否有 Error 级别的诊断
+    has_errors = any(d.isError() for d in diags)
+    
+    if report:
+        print("\n" + "="*40)
+        print("COMPILATION DIAGNOSTICS:")
+        print("="*40)
+        print(report)
+        print("="*40 + "\n")
+        
+    if has_errors:
+        print("[Fatal] Compilation failed with errors. See above.")
+        exit(1)
+    if cache is not None and not diags:
+        # only a design without any diagnostics skips the pass next time, so warnings keep showing
+        cache.mark_clean()
+        
+    if not modules:
+        print("[Error] No modules found in the design! (And no syntax errors reported?)")
+        exit(1)
+    else:
+        print(f"[Info] Found {len(modules)} top-level module instance(s):")
+        for mod in modules:
+            print(f"  - {mod.name}")
+
+    return driver, compilation, modules
+
+def make_visitor(num_cycles):
+    """The statement visitor used by every executor."""
+    my_visitor_for_symbol = SymbolicDFS(num_cycles)
+    # delegate method from z3Visitor
+    my_visitor_for_symbol.expr_to_z3 = lambda m, s, e: parse_expr_to_Z3(e, s, m)
+    return my_visitor_for_symbol
+
+def explore(engine, options, filelist, num_cycles):
+    """Compiles the design and runs symbolic execution (or BMC) on it with a configured engine."""
+    cache = None
+    if options.path_cache:
+        cache = PathCache(options.path_cache, source_fingerprint(filelist, options.include, options.define, options.topmodule))
+    driver, compilation, modules = load_design(options, filelist, cache)
+    engine.path_cache = cache
+    # 7. 编译成功，开始执行符号执行
+    engine.execute_sv(make_visitor(num_cycles), modules, None, num_cycles)
+    if cache is not None:
+        cache.save()
+
+def configure_engine(engine: ExecutionEngine, options) -> None:
+    """Applies the command line options to an engine (also used by --jobs workers)."""
+    if options.use_cache:
+        engine.cache = redis.Redis(host='localhost', port=6379, db=0)
+
+    if options.showdebug:
+        engine.debug = True
+
+    if options.prefix_sharing:
+        engine.prefix_sharing = True
+
+    if options.forking:
+        engine.forking = True
+
+    if options.merge:
+        engine.merge = True
+        engine.merge_paths = options.merge_paths
+        engine.merge_size = options.merge_size
+
+    if options.slice:
+        engine.slice = True
+
+    if options.ternary_mode == "split" and options.forking:
+        print("[Warning] --ternary_mode split is not supported with --forking, using ite")
+    else:
+        engine.ternary_mode = options.ternary_mode
+
+    if options.plan:
+        engine.plan = True
+
+    if options.max_paths:
+        if options.coordinator or options.worker:
+            print("[Warning] --max_paths is not enforced with --coordinator/--worker")
+        else:
+            engine.max_paths = options.max_paths
+            engine.over_budget = options.over_budget
+            engine.seed = options.seed
+
+    if options.decompose:
+        if options.forking or options.coordinator or options.worker:
+            print("[Warning] --decompose is not supported with --forking/--coordinator/--worker, ignoring it")
+        else:
+            engine.decompose = True
+
+    if options.memoize:
+        if options.forking:
+            print("[Warning] --memoize is not supported with --forking, ignoring it")
+        else:
+            engine.memoize = True
+            engine.memo_size = options.memo_size
+
+    if options.semantic_cfg:
+        if options.forking or options.decompose or options.slice or options.merge:
+            print("[Warning] --semantic_cfg is not supported with --forking/--decompose/--slice/--merge, ignoring it")
+        else:
+            engine.semantic_cfg = True
+
+    if options.unroll_limit < 0:
+        print("[Warning] --unroll_limit must not be negative, using 0 (no unrolling)")
+    engine.unroll_limit = max(options.unroll_limit, 0)
+
+    if options.checkpoint:
+        if options.prefix_sharing or options.forking or options.coordinator or options.worker:
+            print("[Warning] --checkpoint only covers the serial path loop, ignoring it")
+        else:
+            engine.checkpoint_path = options.checkpoint
+            engine.checkpoint_interval = options.checkpoint_interval
+            engine.resume = options.resume
+    elif options.resume:
+        print("[Warning] --resume needs --checkpoint, starting from scratch")
+
+    if options.strategy != "dfs":
+        if options.prefix_sharing or options.forking:
+            print(f"[Warning] --strategy {options.strategy} only orders the serial path loop, ignoring it")
+        else:
+            engine.search_strategy = make_strategy(options.strategy, options.seed)
+
 def main():
     """Entrypoint of the program."""
     engine: ExecutionEngine = ExecutionEngine()
@@ -82,6 +324,60 @@ def main():
     optparser.add_option("--use_cache", action="store_true", dest="use_cache",
                          default=False, help="Use the query caching, Default=False")
     optparser.add_option("--explore_time", help="Time to explore in seconds", dest="explore_time")
+    optparser.add_option("--prefix_sharing", action="store_true", dest="prefix_sharing",
+                         default=False, help="Share cycle prefixes between paths (trie exploration), Default=False")
+    optparser.add_option("--forking", action="store_true", dest="forking",
+                         default=False, help="Fork at branches, keeping only feasible successors, Default=False")
+    optparser.add_option("-j", "--jobs", dest="jobs", type='int',
+                         default=1, help="Worker processes exploring disjoint path shards, Default=1")
+    optparser.add_option("--coordinator", dest="coordinator",
+                         help="Lease path-prefix work units to workers on host:port or unix:/path")
+    optparser.add_option("--worker", dest="worker",
+                         help="Explore work units leased by the coordinator at host:port or unix:/path")
+    optparser.add_option("--local_workers", dest="local_workers", type='int',
+                         default=0, help="Worker processes the coordinator spawns on this machine, Default=0")
+    optparser.add_option("--lease_timeout", dest="lease_timeout", type='float',
+                         default=3600.0, help="Seconds before an unfinished work unit is re-issued, Default=3600")
+    optparser.add_option("--merge", action="store_true", dest="merge",
+                         default=False, help="Merge mux-style if/else statements into ITEs instead of splitting paths, Default=False")
+    optparser.add_option("--merge_paths", dest="merge_paths", type='int',
+                         default=1, help="Only merge always blocks that would split into more paths than this, Default=1")
+    optparser.add_option("--merge_size", dest="merge_size", type='int',
+                         default=64, help="Largest if/else (in tokens) that is merged, Default=64")
+    optparser.add_option("--ternary_mode", dest="ternary_mode", type='choice', choices=["ite", "split"],
+                         default="ite", help="Ternary (?:) assignments: ite keeps one If term per mux, split branches the path at them, Default=ite")
+    optparser.add_option("--bmc", action="store_true", dest="bmc",
+                         default=False, help="Bounded model checking: unroll the cycles into one SMT problem instead of enumerating paths, Default=False")
+    optparser.add_option("--strategy", dest="strategy", type='choice', choices=list(STRATEGIES),
+                         default="dfs", help="Path search order: " + ", ".join(STRATEGIES) + ", Default=dfs")
+    optparser.add_option("--seed", dest="seed", type='int',
+                         help="Seed for --strategy random (pass the same one to every --worker)")
+    optparser.add_option("--slice", action="store_true", dest="slice",
+                         default=False, help="Drop logic outside the assertions' cone of influence, Default=False")
+    optparser.add_option("--memoize", action="store_true", dest="memoize",
+                         default=False, help="Skip path suffixes from cycle-boundary states already explored, Default=False")
+    optparser.add_option("--memo_size", dest="memo_size", type='int',
+                         default=100000, help="Most cycle-boundary states remembered (LRU), Default=100000")
+    optparser.add_option("--unroll_limit", dest="unroll_limit", type='int',
+                         default=0, help="Unroll constant-bound for-loops up to this many iterations and summarize longer ones; 0 keeps loops as a single pass, Default=0")
+    optparser.add_option("--semantic_cfg", action="store_true", dest="semantic_cfg",
+                         default=False, help="Build CFGs from elaborated (semantic) statements instead of syntax nodes, Default=False")
+    optparser.add_option("--path_cache", dest="path_cache",
+                         help="Directory caching the CFG paths of always blocks across runs on unchanged sources; the design is still parsed and elaborated every run")
+    optparser.add_option("--checkpoint", dest="checkpoint",
+                         help="Save exploration progress to this file (one file per --jobs worker)")
+    optparser.add_option("--checkpoint_interval", dest="checkpoint_interval", type='float',
+                         default=60.0, help="Seconds between checkpoints, Default=60")
+    optparser.add_option("--resume", action="store_true", dest="resume",
+                         default=False, help="Continue from the --checkpoint file, Default=False")
+    optparser.add_option("--plan", action="store_true", dest="plan",
+                         default=False, help="Count the paths per module and cycle and exit without exploring, Default=False")
+    optparser.add_option("--max_paths", dest="max_paths", type='int',
+                         default=0, help="Path budget checked before exploring, 0 for none, Default=0")
+    optparser.add_option("--over_budget", dest="over_budget", type='choice', choices=["refuse", "merge", "sample"],
+                         default="refuse", help="Over --max_paths: refuse to start, rebuild with --merge, or explore a random sample, Default=refuse")
+    optparser.add_option("--decompose", action="store_true", dest="decompose",
+                         default=False, help="Explore always blocks that share no signals as separate groups, Default=False")
     (options, args) = optparser.parse_args()
 
 
@@ -90,19 +386,22 @@ def main():
 
     if options.showversion:
         showVersion()
+
+    if options.bmc:
+        engine = BMCEngine()
+
+    if (options.strategy == "random" or options.over_budget == "sample") and options.seed is None:
+        # --jobs workers must agree on the permutation, so fix the seed before they fork
+        options.seed = random.randrange(2**32)
+        print(f"Search seed: {options.seed}")
     
-    if options.use_cache:
-        engine.cache = redis.Redis(host='localhost', port=6379, db=0)
+    configure_engine(engine, options)
 
     timer = None
     if options.explore_time:
-        timer = threading.Timer(int(options.explore_time), timeout_exit)
+        timer = threading.Timer(int(options.explore_time), timeout_exit, args=(engine,))
         timer.start()
 
-    if options.showdebug:
-        engine.debug = True
-
-
     for f in filelist:
         if not os.path.exists(f):
             raise IOError("file not found: " + f)
@@ -121,143 +420,27 @@ def main():
     if options.sv:
         start = time.process_time()
 
-        # 使用 Driver 简化文件加载（自动处理 .F filelist、include 路径等）
-        driver = ps.Driver()
-        driver.addStandardArgs()
-
-        # 设置 include 路径
-        if options.include:
-            for inc_path in options.include:
-                driver.sourceLoader.addSearchDirectories(inc_path)
-
-        # 加载源文件（Driver 自动处理 .F 文件列表）
-        input_file = filelist[0]
-        if not os.path.exists(input_file):
-            print(f"[Error] File not found: {input_file}")
-            exit(1)
-
-        if input_file.endswith('.F') or input_file.endswith('.f'):
-            # 使用 Driver 内置的 filelist 解析（支持 +incdir+, +define+ 等）
-            driver.processCommandFiles(input_file, True, False)
+        if options.bmc:
+            if options.jobs > 1 or options.coordinator or options.worker:
+                print("[Warning] --bmc runs a single solver, ignoring --jobs/--coordinator/--worker")
+            explore(engine, options, filelist, num_cycles)
+        elif options.plan:
+            # a dry run is cheap, one process is enough
+            explore(engine, options, filelist, num_cycles)
+        elif options.coordinator:
+            run_coordinator(options.coordinator, explore, configure_engine, options, filelist, num_cycles,
+                            local_workers=options.local_workers, lease_timeout=options.lease_timeout)
+        elif options.worker:
+            run_worker(options.worker, explore, configure_engine, options, filelist, num_cycles)
+        elif options.jobs > 1:
+            if options.forking:
+                print("[Warning] --jobs is not supported with --forking, running a single process")
+                explore(engine, options, filelist, num_cycles)
+            else:
+                run_parallel(explore, configure_engine, options, filelist, num_cycles, options.jobs)
         else:
-            driver.sourceLoader.addFiles(input_file)
-
-        driver.processOptions()
-        driver.parseAllSources()
-
-        # 创建 Compilation
-        compilation = driver.createCompilation()
-
-        # 获取模块
-        modules = list(compilation.getRoot().topInstances)
-
-        # Also collect all nested module instances
-        def collect_all_instances(symbol, collected):
-            """Recursively collect all module instances including nested ones"""
-            if symbol.kind == ps.SymbolKind.Instance:
-                collected.append(symbol)
-                # Recursively check children
-                for child in symbol.body:
-                    collect_all_instances(child, collected)
-
-        # If user specified a top module with -t, find and use only that module
-        # Otherwise, use the first top instance
-        top_module = None
-        if options.topmodule and options.topmodule != "top":
-            # Find the module with the specified name (by instance name or definition name)
-            # First check top instances
-            for module in modules:
-                if module.name == options.topmodule or (hasattr(module.body, 'definition') and module.body.definition.name == options.topmodule):
-                    top_module = module
-                    break
+            explore(engine, options, filelist, num_cycles)
 
-            # If not found in top instances, search nested instances
-            if not top_module:
-                for module in modules:
-                    for child in module.body:
-                        if child.kind == ps.SymbolKind.Instance:
-                            if child.name == options.topmodule or (hasattr(child.body, 'definition') and child.body.definition.name == options.topmodule):
-                                top_module = child
-                                break
-                    if top_module:
-                        break
-
-            if not top_module:
-                print(f"[Error] Specified top module '{options.topmodule}' not found")
-                print(f"Available modules: {[m.name for m in modules]}")
-                exit(1)
-        else:
-            # Use the first top instance
-            top_module = modules[0] if modules else None
-
-        # Only process the selected top module and its children
-        all_instances = []
-        if top_module:
-            collect_all_instances(top_module, all_instances)
-            modules = all_instances
-        else:
-            modules = []
-
-        if not modules:
-            print("No top instances found, searching syntax trees for definitions...")
-            syntax_trees = compilation.getSyntaxTrees()
-            for tree in syntax_trees:
-                for member in tree.root.members:
-                    if hasattr(member, 'kind') and 'ModuleDeclaration' in str(member.kind):
-                        modules.append(member)
-
-        # 6. --- 关键修改：正确的错误打印逻辑 ---
-        # 获取所有诊断信息
-        diags = compilation.getAllDiagnostics()
-        
-        # 创建诊断引擎和文本客户端（使用 Driver 的 sourceManager）
-        diag_engine = ps.DiagnosticEngine(driver.sourceManager)
-        client = ps.TextDiagnosticClient()
-        diag_engine.addClient(client)
-        
-        # 将诊断信息交给引擎处理
-        for d in diags:
-            diag_engine.issue(d)
-            
-        # 获取格式化后的错误信息字符串
-        report = client.getString()
-        
-        # 检查是否有 Error 级别的诊断
-        has_errors = any(d.isError() for d in diags)
-        
-        if report:
-            print("\n" + "="*40)
-            print("COMPILATION DIAGNOSTICS:")
-            print("="*40)
-            print(report)
-            print("="*40 + "\n")
-            
-        if has_errors:
-            print("[Fatal] Compilation failed with errors. See above.")
-            exit(1)
-            
-        if not modules:
-            print("[Error] No modules found in the design! (And no syntax errors reported?)")
-            exit(1)
-        else:
-            print(f"[Info] Found {len(modules)} top-level module instance(s):")
-            for mod in modules:
-                print(f"  - {mod.name}")
-
-        # 7. 编译成功，开始执行符号执行
-        successful_compilation = not has_errors
-        
-        if successful_compilation:
-            my_visitor_for_symbol = SymbolicDFS(num_cycles)
-            # delegate method from z3Visitor
-            my_visitor_for_symbol.expr_to_z3 = lambda m, s, e: parse_expr_to_Z3(e, s, m)
-
-            symbol_visitor = SlangSymbolVisitor() 
-            engine.execute_sv(my_visitor_for_symbol, modules, None, num_cycles)
-            #symbol_visitor.visit(modules)
-            #print(f"symbol_visitor.branch_points: {symbol_visitor.branch_points}")
-            #print(f"symbol_visitor.paths: {symbol_visitor.paths}")
-            
         end = time.process_time()
         print(f"Elapsed time {end - start}")
         if timer:
@@ -0,0 +1,84 @@
+"""Fork cost and snapshot memory of the symbolic store: dict-of-dicts copies vs engine.store.Store.
+
+Builds a store shaped like an elaborated design (default: or1200-sized, 60 instances and
+4800 signals) and measures
+  - fork: one snapshot of the whole store,
+  - step: a snapshot followed by an always block's worth of writes into one instance,
+    what the prefix-sharing executor does at every trie level,
+  - memory: the bytes held by `--snapshots` live snapshots, each taken after such a step.
+
+Signal values are shared placeholder objects, as Z3 terms are, so only the store's own
+structure is measured. Run from the repository root:
+
+    python scripts/bench_store.py [--instances N] [--signals N] [--writes N] [--snapshots N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from engine.store import Store
+
+
+def build(instances: int, signals: int) -> dict:
+    per_instance = max(signals // instances, 1)
+    term = object()
+    return {f"top.u{i}": {f"sig{j}": term for j in range(per_instance)} for i in range(instances)}
+
+
+def dict_fork(store: dict) -> dict:
+    # what PrefixSharingExecutor.checkpoint and ForkingExecutor.copy_store used to do
+    return {name: dict(signals) for name, signals in store.items()}
+
+
+def store_fork(store: Store) -> Store:
+    return store.fork()
+
+
+def step(store, fork, instance: str, writes: int, value):
+    snapshot = fork(store)
+    signals = store[instance]
+    for j in range(writes):
+        signals[f"sig{j}"] = value
+    return snapshot
+
+
+def snapshot_memory(store, fork, instances, writes: int, count: int) -> int:
+    value = object()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [step(store, fork, instances[k % len(instances)], writes, value) for k in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return used
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--instances", type=int, default=60)
+    parser.add_argument("--signals", type=int, default=4800, help="signals over all instances")
+    parser.add_argument("--writes", type=int, default=8, help="signals an always block writes")
+    parser.add_argument("--snapshots", type=int, default=1000, help="live snapshots for the memory figure")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    modules = build(args.instances, args.signals)
+    names = list(modules)
+    plain = dict_fork(modules)
+    cow = Store(dict_fork(modules))
+    value = object()
+    print(f"{args.instances} instances, {args.signals} signals, {args.writes} writes per step")
+    print(f"{'':8}{'fork (us)':>12}{'step (us)':>12}{'memory (KiB)':>14}")
+    for label, store, fork in (("dict", plain, dict_fork), ("Store", cow, store_fork)):
+        fork_us = timeit.timeit(lambda: fork(store), number=args.repeat) / args.repeat * 1e6
+        step_us = timeit.timeit(lambda: step(store, fork, names[0], args.writes, value), number=args.repeat) / args.repeat * 1e6
+        memory = snapshot_memory(store, fork, names, args.writes, args.snapshots) / 1024
+        print(f"{label:8}{fork_us:12.2f}{step_us:12.2f}{memory:14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Shared helpers: run the command line entry point on the designs in designs/test-designs.
+
+Run from the repository root: python -m pytest -q tests"""
+
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DESIGNS = os.path.join(ROOT, "designs", "test-designs")
+sys.path.insert(0, ROOT)
+
+
+def design(name: str) -> str:
+    return os.path.join(DESIGNS, name)
+
+
+def count(output: str, label: str) -> int:
+    """The number printed after `label:` (last occurrence), as in "Paths explored: 9"."""
+    found = re.findall(rf"^{re.escape(label)}: (\d+)", output, re.M)
+    assert found, f"no '{label}' in the output:\n{output[-2000:]}"
+    return int(found[-1])
+
+
+@pytest.fixture
+def run_main():
+    """run_main(num_cycles, design, *options, check=True) -> stdout of `python -m main`."""
+    pytest.importorskip("pyslang")
+    pytest.importorskip("z3")
+
+    def run(num_cycles, path, *options, check=True, timeout=600):
+        result = subprocess.run([sys.executable, "-m", "main", str(num_cycles), path, "--sv", *options],
+                                cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, timeout=timeout)
+        if check:
+            assert result.returncode == 0, result.stdout[-4000:]
+        return result.stdout
+
+    return run
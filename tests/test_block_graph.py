@@ -0,0 +1,51 @@
+"""BlockGraph path counting and unranking agree with its depth-first enumeration.
+
+Run from the repository root: python -m pytest -q tests"""
+
+from engine.block_graph import BlockGraph, PathList, START, END
+
+
+def case_chain() -> BlockGraph:
+    # 0: if, 1/2: arms, 3: case with arms 4, 5, 6 joining at 7
+    graph = BlockGraph(8)
+    graph.add_edge(START, 0, 1)
+    graph.add_edge(0, 1, 1)
+    graph.add_edge(0, 2, 0)
+    graph.add_edge(1, 3, 1)
+    graph.add_edge(2, 3, 1)
+    for arm, direction in ((4, 0), (5, 1), (6, 2)):
+        graph.add_edge(3, arm, direction)
+        graph.add_edge(arm, 7, 1)
+    graph.add_edge(7, END, 1)
+    graph.add_edge(0, END, 2)
+    return graph
+
+
+def test_count_and_unrank_match_enumeration():
+    graph = case_chain()
+    enumerated = list(graph.paths(START, END))
+    assert graph.count_paths() == len(enumerated) == 7
+    counts = graph.suffix_counts(END)
+    for k, (path, directions) in enumerate(enumerated):
+        assert graph.path_at(k, counts) == (path, directions)
+        assert graph.path_directions(path) == directions
+
+
+def test_path_list_indexes_like_a_list():
+    graph = case_chain()
+    enumerated = [path for path, _ in graph.paths(START, END)]
+    paths = PathList(graph)
+    assert paths.listed is None
+    assert len(paths) == len(enumerated)
+    assert list(paths) == enumerated
+    assert [paths[k] for k in range(len(paths))] == enumerated
+    assert paths[-1] == enumerated[-1]
+    assert paths[1:5:2] == enumerated[1:5:2]
+
+
+def test_path_list_lists_simple_paths_with_a_back_edge():
+    graph = case_chain()
+    graph.add_edge(7, 0, 3)
+    paths = PathList(graph)
+    assert paths.listed is not None
+    assert list(paths) == [path for path, _ in graph.paths(START, END)]
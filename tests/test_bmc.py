@@ -0,0 +1,42 @@
+"""--bmc agrees with symbolic execution on assertions that depend on declared widths.
+
+Run from the repository root: python -m pytest -q tests"""
+
+import pytest
+
+from conftest import design
+
+COUNTER = """module wrap (
+  input  CLK,
+  input  RST,
+  output reg [1:0] count
+);
+  always @(posedge CLK) begin
+    if (RST) begin
+      count <= 0;
+    end
+    else begin
+      count <= count + 1;
+    end
+    assert ({condition});
+  end
+endmodule
+"""
+
+
+@pytest.mark.parametrize("condition, violated", [
+    # a 2-bit register never exceeds 3, but a 32-bit one could
+    ("count <= 3", False),
+    # count + 1 wraps to 0 at 3
+    ("count + 2'd1 != 0", True),
+])
+def test_bmc_matches_symbolic_execution_on_widths(run_main, tmp_path, condition, violated):
+    path = tmp_path / "wrap.v"
+    path.write_text(COUNTER.format(condition=condition))
+    assert ("Assertion violation" in run_main(3, str(path))) == violated
+    assert ("Assertion violation" in run_main(3, str(path), "--bmc")) == violated
+
+
+def test_bmc_finds_the_assertion_violation(run_main):
+    out = run_main(3, design("test_2.v"), "--bmc")
+    assert "Assertion violation" in out
@@ -0,0 +1,61 @@
+"""Case statements branch n ways in the CFG, one path per item plus the default (or the
+no-match path), and every arm whose labels the selector can match is feasible.
+
+Run from the repository root: python -m pytest -q tests"""
+
+import pytest
+
+from conftest import count
+
+CASES = """module cases (
+  input  CLK,
+  input  [1:0] sel,
+  output reg [3:0] y
+);
+  always @(posedge CLK) begin
+    case (sel)
+      2'd0: y = 1;
+      2'd1: y = 2;
+      2'd2: begin
+        y = 4;
+        assert (y != 4);
+      end
+      default: y = 8;
+    endcase
+  end
+endmodule
+"""
+
+# no default: the no-match path is the fourth, infeasible since the labels cover every value
+NO_DEFAULT = """module cases (
+  input  CLK,
+  input  [1:0] sel,
+  output reg [3:0] y
+);
+  always @(posedge CLK) begin
+    case (sel)
+      2'd0, 2'd3: y = 1;
+      2'd1: y = 2;
+      2'h2: y = 4;
+    endcase
+  end
+endmodule
+"""
+
+
+@pytest.mark.parametrize("options", [(), ("--semantic_cfg",)])
+def test_case_items_are_separate_paths(run_main, tmp_path, options):
+    path = tmp_path / "cases.v"
+    path.write_text(CASES)
+    assert count(run_main(1, str(path), "--plan", *options), "  Total paths") == 4
+    # reached only if the sized label 2'd2 is matched as 2
+    assert "Assertion violation" in run_main(1, str(path), *options)
+
+
+@pytest.mark.parametrize("options", [(), ("--semantic_cfg",)])
+def test_only_the_no_match_path_is_infeasible(run_main, tmp_path, options):
+    path = tmp_path / "cases.v"
+    path.write_text(NO_DEFAULT)
+    out = run_main(1, str(path), *options)
+    assert count(out, "Paths explored") == 4
+    assert count(out, "Infeasible paths") == 1
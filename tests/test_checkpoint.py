@@ -0,0 +1,47 @@
+"""--checkpoint/--resume: a resumed run explores exactly the ranks the checkpoint had not
+reached, and a finished run or a found violation is reported again instead of re-run.
+
+Run from the repository root: python -m pytest -q tests"""
+
+import json
+
+import pytest
+
+from conftest import count, design
+
+
+@pytest.mark.parametrize("strategy", ["dfs", "random"])
+def test_resume_explores_the_remaining_ranks(run_main, tmp_path, strategy):
+    checkpoint = str(tmp_path / "progress.json")
+    options = ("--strategy", strategy, "--seed", "5", "--checkpoint", checkpoint)
+    full = run_main(2, design("updowncounter.v"), *options)
+    assert count(full, "Paths explored") == 9
+
+    # rewind the final record to 4 of the 9 ranks run, keeping the fingerprint and strategy state
+    with open(checkpoint) as f:
+        record = json.load(f)
+    record.update(source=0, done=4, paths=4, branches=0, finished=False)
+    with open(checkpoint, "w") as f:
+        json.dump(record, f)
+
+    resumed = run_main(2, design("updowncounter.v"), *options, "--resume")
+    assert "Resuming from" in resumed
+    assert count(resumed, "Paths explored") == 9
+    assert 0 < count(resumed, "Branch points explored") < count(full, "Branch points explored")
+
+
+def test_finished_run_is_not_explored_again(run_main, tmp_path):
+    checkpoint = str(tmp_path / "progress.json")
+    full = run_main(2, design("updowncounter.v"), "--checkpoint", checkpoint)
+    again = run_main(2, design("updowncounter.v"), "--checkpoint", checkpoint, "--resume")
+    assert "Checkpoint says the exploration already finished" in again
+    assert count(again, "Paths explored") == count(full, "Paths explored")
+    assert count(again, "Branch points explored") == count(full, "Branch points explored")
+
+
+def test_violation_is_reported_from_the_checkpoint(run_main, tmp_path):
+    checkpoint = str(tmp_path / "progress.json")
+    assert "Assertion violation" in run_main(2, design("test_2.v"), "--checkpoint", checkpoint)
+    again = run_main(2, design("test_2.v"), "--checkpoint", checkpoint, "--resume")
+    assert "Checkpoint holds an assertion violation found earlier" in again
+    assert "Assertion violation" in again
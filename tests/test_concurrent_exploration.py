@@ -0,0 +1,80 @@
+"""Two explorations in one process, on separate threads, must match running each alone.
+
+SymbolicState and ExecutionManager used to keep their solver, store and bookkeeping as
+class attributes, so a second engine in the same process read and wrote the first one's.
+Run from the repository root: python -m pytest -q tests"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+ps = pytest.importorskip("pyslang")
+pytest.importorskip("z3")
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from engine.execution_engine import ExecutionEngine
+from helpers.slang_helpers import SymbolicDFS
+from helpers.rvalue_to_z3 import parse_expr_to_Z3
+
+DESIGN = os.path.join(ROOT, "designs", "test-designs", "test_2.v")
+NUM_CYCLES = 3
+
+
+def load(path: str):
+    """(compilation, [top instance and its nested instances]); the compilation keeps the
+    symbols alive."""
+    compilation = ps.Compilation()
+    compilation.addSyntaxTree(ps.SyntaxTree.fromFile(path))
+    instances = []
+
+    def collect(symbol):
+        if symbol.kind == ps.SymbolKind.Instance:
+            instances.append(symbol)
+            for child in symbol.body:
+                collect(child)
+
+    collect(list(compilation.getRoot().topInstances)[0])
+    return compilation, instances
+
+
+def explore(path: str, num_cycles: int) -> dict:
+    compilation, modules = load(path)
+    engine = ExecutionEngine()
+    engine.debug = False
+    visitor = SymbolicDFS(num_cycles)
+    visitor.expr_to_z3 = lambda m, s, e: parse_expr_to_Z3(e, s, m)
+    engine.execute_sv(visitor, modules, None, num_cycles)
+    m = engine.manager
+    return {
+        "paths": m.path_count,
+        "branches": m.branch_count,
+        "violation": m.assertion_violation,
+        "violated": len(getattr(m, "violated_assertions", None) or []),
+    }
+
+
+def test_concurrent_explorations_match_solo_runs():
+    solo = [explore(DESIGN, NUM_CYCLES), explore(DESIGN, NUM_CYCLES + 1)]
+
+    results = [None, None]
+    errors = []
+
+    def run(i: int, num_cycles: int) -> None:
+        try:
+            results[i] = explore(DESIGN, num_cycles)
+        except Exception as e:  # reported below, a thread cannot fail the test itself
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(0, NUM_CYCLES)),
+               threading.Thread(target=run, args=(1, NUM_CYCLES + 1))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors, errors
+    assert results == solo
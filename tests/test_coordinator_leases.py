@@ -0,0 +1,13 @@
+"""A worker that runs several leased ranges explores each of them from its start.
+
+Run from the repository root: python -m pytest -q tests"""
+
+from conftest import count, design
+
+
+def test_coordinator_explores_every_leased_range(run_main, tmp_path):
+    serial = count(run_main(2, design("updowncounter.v")), "Paths explored")
+    # one prefix per work unit, so each worker runs several leases
+    out = run_main(2, design("updowncounter.v"), "--coordinator", f"unix:{tmp_path / 'c.sock'}", "--local_workers", "2")
+    assert "split into 9 work units" in out
+    assert count(out, "Paths explored") == serial == 9
@@ -0,0 +1,60 @@
+"""--decompose explores always blocks that share no signals as separate groups, and still
+finds the violations the full product finds.
+
+Run from the repository root: python -m pytest -q tests"""
+
+from conftest import count, design
+
+# the first and last blocks are linked through a continuous assign, the middle one is independent
+LINKED = """module linked (
+  input  CLK,
+  input  go,
+  input  other,
+  output reg [1:0] a,
+  output reg [1:0] c
+);
+  wire [1:0] b;
+  assign b = a;
+  reg d;
+  always @(posedge CLK) begin
+    if (go)
+      a <= 2;
+    else
+      a <= 1;
+  end
+  always @(posedge CLK) begin
+    if (other)
+      d <= 1;
+    else
+      d <= 0;
+  end
+  always @(posedge CLK) begin
+    if (b == 2)
+      c <= 3;
+    else
+      c <= 0;
+    assert (c != 3);
+  end
+endmodule
+"""
+
+
+def test_groups_explore_the_sum_of_their_products(run_main):
+    out = run_main(1, design("xmas.v"), "--decompose")
+    assert "Independent always-block groups: 2, 18 paths instead of 81" in out
+    assert count(out, "Paths explored") == 18
+
+
+def test_decomposition_keeps_assign_linked_blocks_together(run_main, tmp_path):
+    path = tmp_path / "linked.v"
+    path.write_text(LINKED)
+    full = run_main(2, str(path))
+    split = run_main(2, str(path), "--decompose")
+    # (a, c) blocks: 4 paths per cycle over 2 cycles, plus the d block: 2 per cycle
+    assert "Independent always-block groups: 2, 20 paths instead of 64" in split
+    assert "Assertion violation" in full
+    assert "Assertion violation" in split
+
+
+def test_decomposition_finds_the_assertion_violation(run_main):
+    assert "Assertion violation" in run_main(2, design("test_2.v"), "--decompose")
@@ -0,0 +1,73 @@
+"""--unroll_limit lays a constant-bound for-loop out once per iteration, with the bounds of
+each instance's own parameter values, and summarizes loops over the limit.
+
+Run from the repository root: python -m pytest -q tests"""
+
+import pytest
+
+pytest.importorskip("pyslang")
+pytest.importorskip("z3")
+
+from engine.loop_unroll import clog2, const_eval
+
+# y == N * x holds only if the body runs exactly N times; the instance overrides N to 2
+LOOPS = """module wrapper (
+  input  CLK,
+  input  [1:0] x,
+  output [3:0] y
+);
+  loops #(.N(2)) u (
+    .CLK (CLK),
+    .x   (x),
+    .y   (y)
+  );
+endmodule
+
+module loops #(parameter N = 3) (
+  input  CLK,
+  input  [1:0] x,
+  output reg [3:0] y
+);
+  integer i;
+  always @(posedge CLK) begin
+    y = 0;
+    for (i = 0; i < N; i = i + 1) begin
+      y = y + x;
+    end
+    assert (y == N * x);
+  end
+endmodule
+"""
+
+
+def write_design(tmp_path) -> str:
+    path = tmp_path / "loops.v"
+    path.write_text(LOOPS)
+    return str(path)
+
+
+def test_unrolled_loop_runs_once_per_iteration(run_main, tmp_path):
+    path = write_design(tmp_path)
+    # overridden parameter (2 iterations) and default one (3)
+    assert "Assertion violation" not in run_main(1, path, "--unroll_limit", "8")
+    assert "Assertion violation" not in run_main(1, path, "--unroll_limit", "8", "-t", "loops")
+    assert "Assertion violation" not in run_main(1, path, "--unroll_limit", "8", "--semantic_cfg")
+
+
+def test_loops_are_kept_or_summarized_without_unrolling(run_main, tmp_path):
+    path = write_design(tmp_path)
+    # the body runs once
+    assert "Assertion violation" in run_main(1, path)
+    summarized = run_main(1, path, "--unroll_limit", "1")
+    assert "Loop over the unroll limit of 1, summarizing it" in summarized
+    assert "Assertion violation" in summarized
+
+
+def test_text_fallback_evaluates_constant_expressions():
+    assert const_eval("$clog2(W) + 1", {"W": 16}) == 5
+    assert const_eval("8'hF0 >> 4", {}) == 15
+    assert const_eval("-7 / 2", {}) == -3
+    assert const_eval("N < 4 && N != 0", {"N": 3}) == 1
+    assert const_eval("foo(1)", {}) is None
+    assert const_eval("M", {}) is None
+    assert [clog2(n) for n in (0, 1, 2, 5, 8)] == [0, 0, 1, 3, 3]
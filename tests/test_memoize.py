@@ -0,0 +1,26 @@
+"""--memoize skips path suffixes from cycle-boundary states it has already explored, without
+changing the number of paths accounted for or the violations found.
+
+Run from the repository root: python -m pytest -q tests"""
+
+import re
+
+import pytest
+
+from conftest import count, design
+
+
+@pytest.mark.parametrize("options", [(), ("--prefix_sharing",)])
+def test_memo_hits_reuse_explored_suffixes(run_main, options):
+    plain = run_main(3, design("updowncounter.v"), *options)
+    memo = run_main(3, design("updowncounter.v"), "--memoize", *options)
+    hits = re.search(r"State memo: (\d+) hits", memo)
+    assert hits and int(hits.group(1)) > 0
+    assert count(memo, "Paths reused from explored states") > 0
+    assert count(memo, "Paths explored") == count(plain, "Paths explored") == 27
+    assert count(memo, "Branch points explored") < count(plain, "Branch points explored")
+
+
+@pytest.mark.parametrize("options", [(), ("--prefix_sharing",)])
+def test_memoized_run_finds_the_assertion_violation(run_main, options):
+    assert "Assertion violation" in run_main(3, design("test_2.v"), "--memoize", *options)
@@ -0,0 +1,18 @@
+"""--jobs N splits the path indices into shards, and together the workers explore exactly
+the paths the serial loop does.
+
+Run from the repository root: python -m pytest -q tests"""
+
+from conftest import count, design
+
+
+def test_shards_explore_every_path_once(run_main):
+    serial = run_main(2, design("updowncounter.v"))
+    parallel = run_main(2, design("updowncounter.v"), "-j", "3")
+    assert "Started 3 workers" in parallel
+    assert count(parallel, "Paths explored") == count(serial, "Paths explored") == 9
+    assert count(parallel, "Branch points explored") == count(serial, "Branch points explored")
+
+
+def test_a_worker_reports_the_assertion_violation(run_main):
+    assert "Assertion violation" in run_main(2, design("test_2.v"), "-j", "3")
@@ -0,0 +1,36 @@
+"""--path_cache: a second run on unchanged sources reuses the CFGs and explores the same
+paths, and only sources without any diagnostics skip the diagnostics pass.
+
+Run from the repository root: python -m pytest -q tests"""
+
+from conftest import count, design
+
+TRUNCATING = """module warn (
+  input  CLK,
+  input  [3:0] a,
+  output reg [1:0] out
+);
+  always @(posedge CLK) begin
+    out <= a;
+  end
+endmodule
+"""
+
+
+def test_cached_run_explores_the_same_paths(run_main, tmp_path):
+    cache = str(tmp_path / "cache")
+    first = run_main(2, design("updowncounter.v"), "--path_cache", cache)
+    second = run_main(2, design("updowncounter.v"), "--path_cache", cache)
+    assert "Loaded path cache" in second
+    assert "skipping the diagnostics pass" in second
+    assert count(second, "Paths explored") == count(first, "Paths explored") == 9
+
+
+def test_warnings_are_reported_on_every_run(run_main, tmp_path):
+    path = tmp_path / "warn.v"
+    path.write_text(TRUNCATING)
+    cache = str(tmp_path / "cache")
+    for _ in range(2):
+        out = run_main(1, str(path), "--path_cache", cache)
+        assert "warning: implicit conversion truncates" in out
+        assert "skipping the diagnostics pass" not in out
@@ -0,0 +1,42 @@
+"""PathSource walks the multi-cycle, multi-module path product lazily, in the order of the
+eager `product` it replaced.
+
+Run from the repository root: python -m pytest -q tests"""
+
+from itertools import product
+
+from engine.path_source import PathSource
+
+# module -> cfg index -> CFG paths (stand-ins for block-index tuples)
+MAPPED = {"top": {0: ["a", "b"], 1: ["c", "d", "e"]}, "child": {0: ["x", "y"]}}
+NUM_CYCLES = 2
+
+
+def eager_paths():
+    """The old execute_sv enumeration: per module a product over cycles of a product over
+    always blocks, then the product over modules."""
+    per_module = {name: list(product(product(*[cfgs[i] for i in sorted(cfgs)]), repeat=NUM_CYCLES))
+                  for name, cfgs in MAPPED.items()}
+    return [dict(zip(per_module, [list(cycles) for cycles in combo])) for combo in product(*per_module.values())]
+
+
+def test_order_matches_the_eager_product():
+    source = PathSource(MAPPED, list(MAPPED), NUM_CYCLES)
+    expected = eager_paths()
+    assert source.total == len(expected) == (2 * 3) ** 2 * 2 ** 2
+    assert list(source) == expected
+    assert [source[i] for i in range(source.total)] == expected
+
+
+def test_encode_inverts_decode():
+    source = PathSource(MAPPED, list(MAPPED), NUM_CYCLES)
+    for index in range(source.total):
+        assert source.encode(source.decode(index)) == index
+    assert source.decode(-1) == [radix - 1 for radix in source.radices]
+
+
+def test_ranges_and_shards_cover_the_product_once():
+    source = PathSource(MAPPED, list(MAPPED), NUM_CYCLES)
+    assert list(source.iter_range(5, 17)) == eager_paths()[5:17]
+    shards = [source.shard_range(k, 3) for k in range(3)]
+    assert [i for start, stop in shards for i in range(start, stop)] == list(range(source.total))
@@ -0,0 +1,31 @@
+"""--plan counts paths without enumerating them, and its totals match what exploration
+actually runs; --max_paths enforces the budget.
+
+Run from the repository root: python -m pytest -q tests"""
+
+import pytest
+
+from conftest import count, design
+
+CASES = [
+    (2, "updowncounter.v", ()),
+    (1, "xmas.v", ()),
+    (1, "demo2.v", ()),
+    (1, "test_nested_ifs.v", ()),
+    (1, "mini_daio.v", ()),
+    (1, "mini_daio.v", ("--semantic_cfg",)),
+]
+
+
+@pytest.mark.parametrize("num_cycles, name, options", CASES)
+def test_plan_matches_explored_paths(run_main, num_cycles, name, options):
+    planned = count(run_main(num_cycles, design(name), "--plan", *options), "  Total paths")
+    assert count(run_main(num_cycles, design(name), *options), "Paths explored") == planned
+
+
+def test_budget_refuses_or_samples(run_main):
+    refused = run_main(2, design("xmas.v"), "--max_paths", "100")
+    assert "Refusing to start" in refused
+    assert "Paths explored" not in refused
+    sampled = run_main(2, design("xmas.v"), "--max_paths", "100", "--over_budget", "sample")
+    assert count(sampled, "Paths explored") == 100
@@ -0,0 +1,38 @@
+"""Every --strategy is a bijection on the path space: it reorders the paths, but explores
+each of them once and finds the same violations.
+
+Run from the repository root: python -m pytest -q tests"""
+
+import pytest
+
+from conftest import count, design
+
+pytest.importorskip("pyslang")
+pytest.importorskip("z3")
+
+from engine.path_source import PathSource
+from engine.search_strategy import STRATEGIES, make_strategy
+
+MAPPED = {"top": {0: ["a", "b", "c"], 1: ["d", "e"]}, "child": {0: ["x", "y", "z", "w"]}}
+
+
+@pytest.mark.parametrize("name", ["dfs", "bfs", "random"])
+def test_static_orders_permute_every_range(name):
+    source = PathSource(MAPPED, list(MAPPED), 2)
+    strategy = make_strategy(name, seed=7)
+    strategy.prepare(source, {})
+    assert sorted(strategy.order(source, 0, source.total)) == list(range(source.total))
+    # ranges partition the ranks, so shards of the same order still cover the space once
+    halves = list(strategy.order(source, 0, 50)) + list(strategy.order(source, 50, source.total))
+    assert halves == list(strategy.order(source, 0, source.total))
+
+
+@pytest.mark.parametrize("name", sorted(STRATEGIES))
+def test_strategies_explore_every_path(run_main, name):
+    out = run_main(2, design("updowncounter.v"), "--strategy", name, "--seed", "3")
+    assert count(out, "Paths explored") == 9
+
+
+@pytest.mark.parametrize("name", sorted(STRATEGIES))
+def test_strategies_find_the_assertion_violation(run_main, name):
+    assert "Assertion violation" in run_main(2, design("test_2.v"), "--strategy", name)
@@ -0,0 +1,31 @@
+"""--semantic_cfg explores the test designs, and agrees with the syntax CFGs where both split
+the same branches.
+
+Run from the repository root: python -m pytest -q tests"""
+
+import pytest
+
+from conftest import count, design
+
+# designs whose always blocks the two builders lay out alike
+SAME_PATHS = ["updowncounter.v", "xmas.v", "test_3.v", "demo2.v", "comb_loop.v"]
+# the syntax builder keeps nested ifs inside begin/end arms as one block, the semantic one splits them
+MORE_PATHS = ["test_nested_ifs.v", "mini_daio.v"]
+
+
+@pytest.mark.parametrize("name", SAME_PATHS)
+def test_semantic_cfg_matches_syntax_cfg(run_main, name):
+    syntax = count(run_main(1, design(name)), "Paths explored")
+    assert count(run_main(1, design(name), "--semantic_cfg"), "Paths explored") == syntax
+
+
+@pytest.mark.parametrize("name", MORE_PATHS)
+def test_semantic_cfg_explores(run_main, name):
+    syntax = count(run_main(1, design(name)), "Paths explored")
+    assert count(run_main(1, design(name), "--semantic_cfg"), "Paths explored") >= syntax
+
+
+def test_semantic_cfg_finds_the_assertion_violation(run_main):
+    # test_2.v asserts out <= 2, which the design does not guarantee
+    assert "Assertion violation" in run_main(2, design("test_2.v"))
+    assert "Assertion violation" in run_main(2, design("test_2.v"), "--semantic_cfg")
@@ -0,0 +1,53 @@
+"""SignalTable: dense ids in discovery order, declared widths and symbols per (instance,
+signal), filled once and read by every later path.
+
+Run from the repository root: python -m pytest -q tests"""
+
+from conftest import count, design
+from engine.signal_table import SignalTable
+
+
+class Symbol:
+    def __init__(self, name, width):
+        self.name = name
+        self.width = width
+
+
+def table() -> SignalTable:
+    signals = SignalTable()
+    signals.add_instance("top", {"clk": Symbol("clk", 1), "count": Symbol("count", 8)}, lambda s: s.width)
+    signals.add_instance("top.u0", {"count": Symbol("count", 4)}, lambda s: s.width)
+    return signals
+
+
+def test_ids_are_dense_and_in_discovery_order():
+    signals = table()
+    assert len(signals) == 3
+    assert [signals.id("top", "clk"), signals.id("top", "count"), signals.id("top.u0", "count")] == [0, 1, 2]
+    assert signals.names[2] == ("top.u0", "count")
+    assert signals.id("top", "missing") is None and signals.id("other", "clk") is None
+    assert "top.u0" in signals and "other" not in signals
+
+
+def test_widths_and_symbols_per_instance():
+    signals = table()
+    assert signals.width("top", "count") == 8
+    assert signals.width("top.u0", "count") == 4
+    assert signals.width("top", "missing") == 32
+    assert signals.width("top", "missing", None) is None
+    assert [name for name, _ in signals.signals("top")] == ["clk", "count"]
+    assert [symbol.width for _, symbol in signals.signals("top.u0")] == [4]
+
+
+def test_adding_an_instance_again_keeps_its_ids():
+    signals = table()
+    signals.add_instance("top", {"count": Symbol("count", 16), "extra": Symbol("extra", 2)}, lambda s: s.width)
+    assert signals.id("top", "count") == 1 and signals.width("top", "count") == 8
+    assert signals.id("top", "extra") == 3
+
+
+def test_later_paths_seed_their_stores_from_the_table(run_main):
+    # two instances of one definition, each seeded on every path without another DFS
+    out = run_main(2, design("test_2.v"))
+    assert "Assertion violation" in out
+    assert count(run_main(3, design("updowncounter.v")), "Paths explored") == 27
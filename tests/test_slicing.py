@@ -0,0 +1,56 @@
+"""--slice drops the always blocks outside the assertions' cone of influence and still finds
+the same violations.
+
+Run from the repository root: python -m pytest -q tests"""
+
+from conftest import count, design
+
+# c depends on a through the continuous assign of b; d is outside the assertion's cone
+LINKED = """module linked (
+  input  CLK,
+  input  go,
+  input  other,
+  output reg [1:0] a,
+  output reg [1:0] c
+);
+  wire [1:0] b;
+  assign b = a;
+  reg d;
+  always @(posedge CLK) begin
+    if (go)
+      a <= 2;
+    else
+      a <= 1;
+  end
+  always @(posedge CLK) begin
+    if (other)
+      d <= 1;
+    else
+      d <= 0;
+  end
+  always @(posedge CLK) begin
+    if (b == 2)
+      c <= 3;
+    else
+      c <= 0;
+    assert (c != 3);
+  end
+endmodule
+"""
+
+
+def test_slicing_drops_blocks_outside_the_cone(run_main, tmp_path):
+    path = tmp_path / "linked.v"
+    path.write_text(LINKED)
+    full = run_main(2, str(path))
+    sliced = run_main(2, str(path), "--slice")
+    assert "Slicing linked: 1 of 3 always blocks are outside the cone" in sliced
+    assert count(full, "Total paths to explore") == 64
+    assert count(sliced, "Total paths to explore") == 16
+    assert "Assertion violation" in full
+    assert "Assertion violation" in sliced
+
+
+def test_slicing_finds_the_assertion_violation(run_main):
+    assert "Assertion violation" in run_main(2, design("test_2.v"), "--slice")
+    assert "Assertion violation" in run_main(2, design("test_2.v"), "--slice", "--bmc")
@@ -0,0 +1,50 @@
+"""Store forks are independent copies: writes on either side after a fork are not seen by
+the other, and instances neither side touched stay shared.
+
+Run from the repository root: python -m pytest -q tests"""
+
+from conftest import count, design
+from engine.store import Store
+
+
+def test_fork_is_independent_both_ways():
+    store = Store({"top": {"a": 1}, "u0": {"b": 2}})
+    child = store.fork()
+    child["top"]["a"] = 10
+    store["u0"]["b"] = 20
+    store["top"]["c"] = 3
+    assert dict(child["top"]) == {"a": 10}
+    assert dict(child["u0"]) == {"b": 2}
+    assert dict(store["top"]) == {"a": 1, "c": 3}
+    assert dict(store["u0"]) == {"b": 20}
+
+
+def test_untouched_instances_stay_shared():
+    store = Store({"top": {"a": 1}, "u0": {"b": 2}})
+    child = store.fork()
+    child["top"]["a"] = 5
+    assert store._modules["u0"] is child._modules["u0"]
+    assert store._modules["top"] is not child._modules["top"]
+
+
+def test_nested_forks_and_instance_replacement():
+    root = Store({"top": {"a": 0}})
+    first = root.fork()
+    second = first.fork()
+    second["top"]["a"] = 2
+    first["top"] = {"a": 1}
+    second["new"] = {}
+    del first["top"]
+    assert dict(root["top"]) == {"a": 0}
+    assert "top" not in first and "new" not in first
+    assert dict(second["top"]) == {"a": 2}
+    assert set(second) == {"top", "new"} and len(second) == 2
+    assert second.get("missing") is None
+
+
+def test_executors_that_fork_the_store_match_the_serial_loop(run_main):
+    serial = run_main(3, design("updowncounter.v"))
+    trie = run_main(3, design("updowncounter.v"), "--prefix_sharing")
+    assert count(trie, "Paths explored") == count(serial, "Paths explored") == 27
+    for options in (("--prefix_sharing",), ("--forking",)):
+        assert "Assertion violation" in run_main(2, design("test_2.v"), *options)
@@ -0,0 +1,45 @@
+"""--ternary_mode: ite keeps an assignment of a ternary on one path, split branches once
+per condition, and both modes find the same violations.
+
+Run from the repository root: python -m pytest -q tests"""
+
+import pytest
+
+from conftest import count
+
+# y splits in 2, the chained z in 3; the assertion after them fails only for sel, a == 2
+TERNARIES = """module tern (
+  input  CLK,
+  input  sel,
+  input  [3:0] a,
+  output reg [3:0] y,
+  output reg [3:0] z
+);
+  always @(posedge CLK) begin
+    y = sel ? 4'd3 : a;
+    z = (a > 4'd8) ? 4'd1 : (a == 4'd2 ? 4'd2 : 4'd0);
+    assert (y + z != 5);
+  end
+endmodule
+"""
+
+
+def write_design(tmp_path, condition: str = "y + z != 5") -> str:
+    path = tmp_path / "tern.v"
+    path.write_text(TERNARIES.replace("y + z != 5", condition))
+    return str(path)
+
+
+@pytest.mark.parametrize("mode, paths", [("ite", 1), ("split", 6)])
+@pytest.mark.parametrize("options", [(), ("--semantic_cfg",)])
+def test_path_counts(run_main, tmp_path, mode, paths, options):
+    path = write_design(tmp_path)
+    assert count(run_main(1, path, "--ternary_mode", mode, "--plan", *options), "  Total paths") == paths
+    assert "Assertion violation" in run_main(1, path, "--ternary_mode", mode, *options)
+
+
+@pytest.mark.parametrize("mode", ["ite", "split"])
+def test_no_violation_when_the_assertion_holds(run_main, tmp_path, mode):
+    out = run_main(1, write_design(tmp_path, "z <= 2"), "--ternary_mode", mode)
+    assert "Assertion violation" not in out
+    assert count(out, "Paths explored") == (1 if mode == "ite" else 6)
@@ -0,0 +1,59 @@
+"""The symbolic store holds Z3 terms of the signals' declared widths: assignments truncate
+and extend the way Verilog does, so wraparound and comparisons are exact.
+
+Run from the repository root: python -m pytest -q tests"""
+
+import pytest
+
+pytest.importorskip("pyslang")
+z3 = pytest.importorskip("z3")
+
+from helpers.rvalue_to_z3 import fit, literal_width, match_widths, z3_to_bool
+
+# low keeps the 4 low bits of d, so it is never above 15; c wraps from 15 to 0
+WIDTHS = """module widths (
+  input  CLK,
+  input  [7:0] d,
+  output reg [3:0] c,
+  output reg [3:0] low
+);
+  always @(posedge CLK) begin
+    low = d;
+    c = c + 1;
+    assert (low <= 15);
+    assert (c != 0);
+  end
+endmodule
+"""
+
+
+def test_fit_truncates_and_extends():
+    assert fit(z3.BitVecVal(0x1F, 8), 4).size() == 4
+    assert z3.simplify(fit(z3.BitVecVal(0x1F, 8), 4)).as_long() == 0xF
+    assert z3.simplify(fit(z3.BitVecVal(3, 2), 8)).as_long() == 3
+    # a Bool is one bit, then extended
+    assert fit(z3.BoolVal(True), 4).size() == 4
+    assert fit(7, 3).size() == 3
+
+
+def test_operands_are_widened_to_the_wider_one():
+    a, b = match_widths(z3.BitVec("a", 4), z3.BitVec("b", 12))
+    assert a.size() == b.size() == 12
+    x, y = match_widths(z3.Bool("x"), z3.Bool("y"))
+    assert z3.is_bool(x) and z3.is_bool(y)
+    v = z3.BitVec("v", 3)
+    assert z3.is_bool(z3_to_bool(v))
+    assert z3.simplify(z3.substitute(z3_to_bool(v), (v, z3.BitVecVal(4, 3)))).sexpr() == "true"
+
+
+def test_literal_widths():
+    assert [literal_width(text) for text in ("8'hFF", "1'b0", "'d3", "42")] == [8, 1, 32, 32]
+
+
+def test_assignments_keep_declared_widths(run_main, tmp_path):
+    path = tmp_path / "widths.v"
+    path.write_text(WIDTHS)
+    out = run_main(1, str(path))
+    assert "Assertion violation" in out
+    assert "condition:  (c != 0)" in out
+    assert "condition:  (low <= 15)" not in out